@@ -0,0 +1,70 @@
+"""Import time of the grand_match package, checked against a budget.
+
+Each import runs in a fresh interpreter; the median of several runs is
+compared to its budget and the heavy modules it loaded are listed. Exits
+non-zero when an import goes over budget.
+
+    python benchmarks/import_benchmark.py [--runs N] [--output FILE]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("numpy", "pandas", "openpyxl", "pyarrow")
+
+# import statement -> budget in milliseconds
+BUDGETS = {
+    "import grand_match": 20,
+    "from grand_match import Triang, GrandparentSegment, SiblingOverlap, CompactTriang": 50,
+    "from grand_match import OverlapCalculator": 50,
+    "from grand_match import GrandMatch": 250,
+    "from grand_match.excel_importer import ExcelImporter": 250,
+}
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def time_import(statement: str) -> tuple:
+    """Seconds `statement` took in a fresh interpreter, and the heavy modules it loaded."""
+    output = subprocess.run([sys.executable, "-c", PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+                            cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.split()
+    return float(output[0]), output[1].split(",") if len(output) > 1 else []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = {}
+    over_budget = False
+    for statement, budget_ms in BUDGETS.items():
+        runs = [time_import(statement) for _ in range(args.runs)]
+        median_ms = statistics.median(seconds for seconds, _ in runs) * 1000
+        loaded = runs[0][1]
+        over = median_ms > budget_ms
+        over_budget |= over
+        results[statement] = {"median_ms": round(median_ms, 1), "budget_ms": budget_ms, "loaded": loaded}
+        print(f"{median_ms:8.1f} ms  (budget {budget_ms:>4} ms){'  OVER BUDGET' if over else ''}  {statement}"
+              f"{'  [' + ', '.join(loaded) + ']' if loaded else ''}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Memory benchmark for the model classes and a full matching run.
+
+Reports the bytes allocated per instance of each model (the __dict__-based
+dataclass, and its Compact __slots__ variant) and the peak RSS of running the
+pipeline on the bundled `inputfiles` data.
+
+    python benchmarks/memory_benchmark.py [--workbook PATH] [--triangulation-dir DIR]
+"""
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grand_match import (ChromosomeMatch, CompactChromosomeMatch, CompactGedMatchSegment, CompactGrandparentSegment,
+                         CompactSiblingOverlap, CompactTriang, GedMatchSegment, Grandparent, GrandparentSegment,
+                         SiblingOverlap, Triang)
+from grand_match.excel_importer import ExcelImporter
+from grand_match.grand_match import GrandMatch
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_SIZE = 20000
+
+# Constructor arguments of one representative instance per model; numbers above 256 so each row
+# owns its int objects, as parsed data does
+SAMPLES = {
+    Triang: lambda i: (1, "kit-x", "Name", "x@example.com", "kit-y", "Other", "y@example.com",
+                       10_000_000 + i, 20_000_000 + i, "11.8"),
+    GrandparentSegment: lambda i: (1, "Alice", "kit-A", "Smith", 10_000_000 + i, 20_000_000 + i),
+    GedMatchSegment: lambda i: ("kit-A", "kit-x", 1, 10_000_000 + i, 20_000_000 + i, 11.8 + i, 1000 + i,
+                                "Name", "F", "x@example.com"),
+    SiblingOverlap: lambda i: (1, "Smith", 10_000_000 + i, 20_000_000 + i),
+    ChromosomeMatch: lambda i: ("Name", "kit-x", "Smith", 1, "Ancestry", "Alice|Bob"),
+}
+
+
+COMPACT_VARIANTS = {
+    Triang: CompactTriang,
+    GrandparentSegment: CompactGrandparentSegment,
+    GedMatchSegment: CompactGedMatchSegment,
+    SiblingOverlap: CompactSiblingOverlap,
+    ChromosomeMatch: CompactChromosomeMatch,
+}
+
+
+def bytes_per_object(cls, sample) -> float:
+    objects = [None] * SAMPLE_SIZE
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(SAMPLE_SIZE):
+        objects[i] = cls(*sample(i))
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return allocated / SAMPLE_SIZE
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where it can't be read."""
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    except ImportError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def model_sizes():
+    sizes = {}
+    for cls, sample in SAMPLES.items():
+        sizes[cls.__name__] = {"dict": round(bytes_per_object(cls, sample), 1),
+                               "compact": round(bytes_per_object(COMPACT_VARIANTS[cls], sample), 1)}
+    return sizes
+
+
+def run_pipeline(workbook: str, triangulation_dir: str):
+    excel_importer = ExcelImporter(workbook)
+    excel_importer.importExcel()
+
+    grand_match = GrandMatch()
+    grand_match.siblingsByKit = excel_importer.siblingsByKit
+    grand_match.siblingsByName = excel_importer.siblingsByName
+    grand_match.grandparentsByKit = excel_importer.grandparentsByKit
+    grand_match.grandparentsByName = excel_importer.grandparentsByName or {"Unknown": Grandparent(name="Unknown")}
+    grand_match.cousinByName = excel_importer.cousinByName
+    grand_match.cousinByKit = excel_importer.cousinByKit
+    grand_match.grandparent_segments = excel_importer.grandparent_segments
+    grand_match.kit_registry = excel_importer.kit_registry
+
+    enabled_chromosomes = {chr_num for chr_num, setting in excel_importer.chromosome_settings_by_chr.items()
+                           if setting.mode.strip().lower() == "yes"}
+    grand_match.get_triangulation(triangulation_dir, enabled_chromosomes)
+    grand_match.create_chromosome_models(excel_importer.chromosome_settings_by_chr)
+    grand_match.LoopOnChromosomeData()
+    matches = grand_match.match_chromosomes()
+    # exporters build every matched row, so do the same here
+    triangs = [match.to_triang() for match in matches]
+
+    return {
+        "triangulation_rows": grand_match.triang_graph.row_count(),
+        "overlaps": sum(len(overlaps) for model in grand_match.chromosome_models.values()
+                        for overlaps in model.overlapsByGrandparent.values()),
+        "matches": len(triangs),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workbook", default=os.path.join(REPO_ROOT, "inputfiles", "visualphasing2026.xlsx"))
+    parser.add_argument("--triangulation-dir", default=os.path.join(REPO_ROOT, "inputfiles"))
+    args = parser.parse_args()
+
+    report = {"bytes_per_object": model_sizes()}
+    report["pipeline"] = run_pipeline(args.workbook, args.triangulation_dir)
+    report["pipeline"]["peak_rss_bytes"] = peak_rss_bytes()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Stage timings of the pipeline on synthetic families of increasing size.
+
+Generates a family for each scale (see `synthetic_family.py`), runs the
+pipeline on it and times each stage separately. The results are written as
+JSON; pass an earlier results file with --compare to print the change per
+stage and flag regressions.
+
+    python benchmarks/pipeline_benchmark.py [--scale NAME ...] [--repeat N] [--output FILE] [--compare FILE]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime
+from typing import Callable, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grand_match.excel_importer import ExcelImporter
+from grand_match.grand_match import GrandMatch
+from synthetic_family import GENERATOR_VERSION, FamilyFiles, FamilySpec, generate_family
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_VERSION = 1
+
+SCALES = {
+    "small": FamilySpec(siblings=5, cousins=20, rows_per_sibling=5_000, segments_per_chromosome=3),
+    "medium": FamilySpec(siblings=8, cousins=100, rows_per_sibling=50_000, segments_per_chromosome=5),
+    "large": FamilySpec(siblings=12, cousins=400, rows_per_sibling=200_000, segments_per_chromosome=8),
+    "xlarge": FamilySpec(siblings=20, cousins=1_000, rows_per_sibling=500_000, segments_per_chromosome=12),
+}
+STAGES = ["excel_import", "get_triangulation", "overlaps", "match_chromosomes", "cluster_cousins", "extract_kits",
+          "export_overlaps"]
+# a stage this much slower than in the compared results is reported as a regression
+REGRESSION_RATIO = 1.2
+# ...and at least this many seconds slower, so timer noise on very short stages isn't reported
+REGRESSION_SECONDS = 0.05
+
+
+def timed(timings: Dict[str, float], stage: str, run: Callable):
+    start = time.perf_counter()
+    result = run()
+    timings[stage] = time.perf_counter() - start
+    return result
+
+
+def run_pipeline(files: FamilyFiles, output_dir: str) -> Dict[str, object]:
+    """Run every stage once on a generated family and return its timings and result counts."""
+    timings: Dict[str, float] = {}
+    excel_importer = ExcelImporter(files.workbook)
+    timed(timings, "excel_import", excel_importer.importExcel)
+
+    grand_match = GrandMatch()
+    grand_match.siblingsByKit = excel_importer.siblingsByKit
+    grand_match.siblingsByName = excel_importer.siblingsByName
+    grand_match.grandparentsByKit = excel_importer.grandparentsByKit
+    grand_match.grandparentsByName = excel_importer.grandparentsByName
+    grand_match.cousinByName = excel_importer.cousinByName
+    grand_match.cousinByKit = excel_importer.cousinByKit
+    grand_match.grandparent_segments = excel_importer.grandparent_segments
+    grand_match.kit_registry = excel_importer.kit_registry
+
+    enabled_chromosomes = {chr_num for chr_num, setting in excel_importer.chromosome_settings_by_chr.items()
+                           if setting.mode.strip().lower() == "yes"}
+    timed(timings, "get_triangulation",
+          lambda: grand_match.get_triangulation(files.triangulation_dir, enabled_chromosomes))
+    # building the chromosome models is part of deriving the overlaps
+    timed(timings, "overlaps", lambda: (grand_match.create_chromosome_models(excel_importer.chromosome_settings_by_chr),
+                                        grand_match.LoopOnChromosomeData()))
+    matches = timed(timings, "match_chromosomes", grand_match.match_chromosomes)
+    timed(timings, "cluster_cousins", grand_match.cluster_cousins)
+    timed(timings, "extract_kits",
+          lambda: grand_match.extract_kits(matches, output_dir, matches_directory=files.matches_dir))
+    timed(timings, "export_overlaps", lambda: grand_match.export_overlaps(output_dir, layout="consolidated"))
+
+    return {
+        "stages": {stage: round(timings[stage], 4) for stage in STAGES},
+        "total": round(sum(timings.values()), 4),
+        "counts": {
+            "triangulation_rows": grand_match.triang_graph.row_count(),
+            "grandparent_segments": len(grand_match.grandparent_segments),
+            "overlaps": sum(len(overlaps) for model in grand_match.chromosome_models.values()
+                            for overlaps in model.overlapsByGrandparent.values()),
+            "matches": len(matches),
+        },
+    }
+
+
+def benchmark_scale(spec: FamilySpec, repeat: int, work_dir: str) -> Dict[str, object]:
+    family_dir = os.path.join(work_dir, "family")
+    files = generate_family(spec, family_dir)
+    runs = [run_pipeline(files, os.path.join(work_dir, f"out{run}")) for run in range(repeat)]
+    # the fastest of the runs per stage is the least disturbed by the rest of the machine
+    return {
+        "spec": dict(asdict(spec), generator=GENERATOR_VERSION),
+        "stages": {stage: min(run["stages"][stage] for run in runs) for stage in STAGES},
+        "total": min(run["total"] for run in runs),
+        "counts": runs[0]["counts"],
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous: Dict[str, object], current: Dict[str, object]) -> bool:
+    """Print each stage's time against `previous`; returns True when any stage regressed."""
+    regressed = False
+    for name, result in current["scales"].items():
+        before = previous.get("scales", {}).get(name)
+        if before is None:
+            continue
+        if before["spec"] != result["spec"]:
+            print(f"{name}: skipped, the scale's family changed")
+            continue
+        print(f"{name} ({previous.get('commit')} -> {current.get('commit')})")
+        for stage in STAGES + ["total"]:
+            old = before["total"] if stage == "total" else before["stages"].get(stage)
+            new = result["total"] if stage == "total" else result["stages"][stage]
+            if not old:
+                continue
+            ratio = new / old
+            flag = "  REGRESSION" if ratio > REGRESSION_RATIO and new - old > REGRESSION_SECONDS else ""
+            regressed |= bool(flag) and stage != "total"
+            print(f"  {stage:<18} {old:>9.3f}s {new:>9.3f}s {ratio:>6.2f}x{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", action="append", choices=list(SCALES),
+                        help="scale to run, may be repeated (default: small and medium)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scale; the fastest time per stage is kept")
+    parser.add_argument("--output", default=os.path.join(REPO_ROOT, "benchmarks", "results",
+                                                         f"{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.json"))
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--work-dir", help="where the families are generated (default: a temporary directory)")
+    args = parser.parse_args()
+
+    results = {
+        "version": RESULTS_VERSION,
+        "commit": git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scales": {},
+    }
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name in args.scale or ["small", "medium"]:
+            work_dir = os.path.join(args.work_dir or temp_dir, name)
+            print(f"Running {name}: {SCALES[name]}")
+            results["scales"][name] = benchmark_scale(SCALES[name], args.repeat, work_dir)
+            print(json.dumps(results["scales"][name]["stages"]))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            previous = json.load(f)
+        if compare(previous, results):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Synthetic visual-phasing families for benchmarking the pipeline.
+
+Writes the three inputs `main_grand_match.py` reads: a workbook with the
+chromosomes, Siblings, Cousins, Grandparents and GrandparentSegments sheets,
+one GEDmatch triangulation CSV per sibling kit, and a GEDmatch segment match
+CSV per sibling. The data is random but deterministic for a given spec.
+
+    python benchmarks/synthetic_family.py DIRECTORY [--siblings N] [--cousins N] [--rows-per-sibling N]
+                                                    [--segments-per-chromosome N] [--seed N]
+"""
+import argparse
+import csv
+import os
+import random
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Tuple
+
+import openpyxl
+
+# bump when the generated data changes, so results from different generators aren't compared
+GENERATOR_VERSION = 1
+GRANDPARENTS_BY_SIDE = {"paternal": ("PP", "PM"), "maternal": ("M1", "M2")}
+TRIANG_HEADER = ["Chr", "Kit1 Number", "Kit1 Name", "Kit1 Email", "Kit2 Number", "Kit2 Name", "Kit2 Email",
+                 "B37 Start", "B37 End", "cM"]
+MATCH_HEADER = ["PrimaryKit", "MatchedKit", "chr", "B37Start", "B37End", "Segment cM", "SNPs", "MatchedName",
+                "Matched Sex", "MatchedEmail"]
+# kit prefixes of the platforms extract_kits recognises
+KIT_PREFIXES = "AFTGHMW"
+# every triangulating match other than a cousin is one of this many strangers per cousin
+STRANGERS_PER_COUSIN = 4
+MIN_SEGMENT_LENGTH = 2_000_000
+MAX_SEGMENT_LENGTH = 30_000_000
+
+
+@dataclass(frozen=True)
+class FamilySpec:
+    siblings: int = 5
+    cousins: int = 20
+    rows_per_sibling: int = 5_000
+    # grandparent segments per side (paternal and maternal) of each sibling's chromosome
+    segments_per_chromosome: int = 3
+    chromosomes: int = 23
+    seed: int = 0
+
+
+@dataclass(frozen=True)
+class FamilyFiles:
+    workbook: str
+    triangulation_dir: str
+    matches_dir: str
+
+
+def chromosome_length(chr_number: int) -> int:
+    # roughly the B37 lengths: chromosome 1 is the longest, X (23) is about the size of 7
+    if chr_number == 23:
+        return 155_000_000
+    return 249_000_000 - (chr_number - 1) * 8_500_000
+
+
+def kit_number(rng: random.Random, serial: int) -> str:
+    return f"{rng.choice(KIT_PREFIXES)}{serial:07d}"
+
+
+def generate_family(spec: FamilySpec, directory: str) -> FamilyFiles:
+    """Write a synthetic family for `spec` under `directory` and return where its inputs are."""
+    rng = random.Random(spec.seed)
+    chromosomes = range(1, spec.chromosomes + 1)
+
+    siblings = [(f"Sibling{n + 1}", kit_number(rng, n)) for n in range(spec.siblings)]
+    grandparents = [name for names in GRANDPARENTS_BY_SIDE.values() for name in names]
+    cousins = [(f"Cousin{n + 1}", kit_number(rng, 1_000_000 + n), rng.choice(grandparents)) for n in range(spec.cousins)]
+    strangers = [(f"Match{n + 1}", kit_number(rng, 5_000_000 + n))
+                 for n in range(max(spec.cousins, 1) * STRANGERS_PER_COUSIN)]
+
+    segments = _grandparent_segments(rng, spec, siblings, chromosomes)
+
+    files = FamilyFiles(workbook=os.path.join(directory, "visualphasing.xlsx"), triangulation_dir=directory,
+                        matches_dir=os.path.join(directory, "gedmatch", "matches"))
+    os.makedirs(files.matches_dir, exist_ok=True)
+    _write_workbook(files.workbook, chromosomes, siblings, cousins, grandparents, segments)
+
+    for sibling_name, sibling_kit in siblings:
+        rows = _triangulation_rows(rng, spec, sibling_kit, siblings, cousins, strangers, segments, chromosomes)
+        _write_csv(os.path.join(files.triangulation_dir, f"{sibling_kit}.csv"), TRIANG_HEADER, rows)
+        _write_csv(os.path.join(files.matches_dir, f"{sibling_kit}.csv"), MATCH_HEADER,
+                   _match_rows(rng, sibling_kit, rows))
+    return files
+
+
+def _grandparent_segments(rng: random.Random, spec: FamilySpec, siblings: List[Tuple[str, str]],
+                          chromosomes: range) -> List[tuple]:
+    """Each side of each sibling's chromosome is cut at random points into alternating grandparents."""
+    segments = []
+    for chr_number in chromosomes:
+        length = chromosome_length(chr_number)
+        for sibling_name, sibling_kit in siblings:
+            for names in GRANDPARENTS_BY_SIDE.values():
+                cuts = sorted(rng.sample(range(1, length), spec.segments_per_chromosome - 1))
+                grandparent = rng.randrange(2)
+                for start, end in zip([0] + cuts, cuts + [length]):
+                    segments.append((chr_number, sibling_name, sibling_kit, names[grandparent], start, end))
+                    grandparent = 1 - grandparent
+    return segments
+
+
+def _triangulation_rows(rng: random.Random, spec: FamilySpec, sibling_kit: str, siblings: List[Tuple[str, str]],
+                        cousins: List[Tuple[str, str, str]], strangers: List[Tuple[str, str]],
+                        segments: List[tuple], chromosomes: range) -> List[list]:
+    """Rows where a match (Kit1) triangulates with this sibling and third parties (Kit2).
+
+    Half the rows are a cousin on one of the sibling's segments of the cousin's
+    grandparent, triangulating with every other sibling who inherited the same
+    region from that grandparent. The rest are strangers at random positions
+    with random third parties. Each Kit1/region comes as a group of rows, one per
+    third party, the way GEDmatch reports them.
+    """
+    segmentsByGrandparent: Dict[tuple, List[tuple]] = {}
+    for chr_number, _, kit, grandparent, start, end in segments:
+        segmentsByGrandparent.setdefault((chr_number, kit, grandparent), []).append((start, end))
+    others = [(name, kit) for name, kit in siblings if kit != sibling_kit]
+    rows = []
+    while len(rows) < spec.rows_per_sibling:
+        chr_number = rng.choice(chromosomes)
+        length = rng.randint(MIN_SEGMENT_LENGTH, MAX_SEGMENT_LENGTH)
+        third_parties = rng.sample(strangers, rng.randint(0, 2))
+        cousin = rng.choice(cousins) if cousins and rng.random() < 0.5 else None
+        # with few segments per chromosome the sibling may not have the cousin's grandparent here at all
+        own_segments = segmentsByGrandparent.get((chr_number, sibling_kit, cousin[2]), []) if cousin else []
+        if own_segments:
+            kit1_name, kit1, grandparent = cousin
+            segment_start, segment_end = rng.choice(own_segments)
+            length = min(length, segment_end - segment_start)
+            start = rng.randrange(segment_start, segment_end - length + 1)
+            third_parties += [(name, kit) for name, kit in others
+                              if any(s <= start and start + length <= e
+                                     for s, e in segmentsByGrandparent.get((chr_number, kit, grandparent), []))]
+        else:
+            kit1_name, kit1 = rng.choice(strangers)
+            start = rng.randrange(0, chromosome_length(chr_number) - length)
+            third_parties += rng.sample(others, rng.randint(0, len(others)))
+        cm = round(length / 1_000_000 * rng.uniform(0.8, 1.4), 1)
+        for kit2_name, kit2 in third_parties:
+            if kit2 == kit1 or len(rows) == spec.rows_per_sibling:
+                continue
+            rows.append([chr_number, kit1, f"*{kit1_name}", f"{kit1.lower()}@example.com", kit2, kit2_name,
+                         f"{kit2.lower()}@example.com", start, start + length, cm])
+    # GEDmatch lists the rows by chromosome
+    rows.sort(key=lambda row: row[0])
+    for row in rows:
+        if row[0] == 23:
+            row[0] = "X"
+    return rows
+
+
+def _match_rows(rng: random.Random, sibling_kit: str, triangulation_rows: List[list]) -> List[list]:
+    """One segment match per (Kit1, chromosome, region) the sibling triangulates on."""
+    segments: Dict[tuple, list] = {}
+    for chr_field, kit1, name1, email1, _, _, _, start, end, cm in triangulation_rows:
+        key = (kit1, chr_field, start)
+        if key not in segments:
+            segments[key] = [sibling_kit, kit1, chr_field, start, end, cm, rng.randint(500, 5000), name1.lstrip("*"),
+                             rng.choice("MF"), email1]
+    return list(segments.values())
+
+
+def _write_csv(file_path: str, header: List[str], rows: List[list]):
+    with open(file_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _write_workbook(file_path: str, chromosomes: range, siblings: List[Tuple[str, str]],
+                    cousins: List[Tuple[str, str, str]], grandparents: List[str], segments: List[tuple]):
+    workbook = openpyxl.Workbook(write_only=True)
+    sheets = {
+        "chromosomes": (["Chr", "Mode"], [(chr_number, "Yes") for chr_number in chromosomes]),
+        "Siblings": (["Name", "Kit", "Order"], [(name, kit, order + 1) for order, (name, kit) in enumerate(siblings)]),
+        "Cousins": (["Name", "Kit", "Grandparent"], cousins),
+        "Grandparents": (["Name", "Mode"], [(name, "Yes") for name in grandparents]),
+        "GrandparentSegments": (["Chr", "Sibling", "Kit", "Grandparent", "B37 Start", "B37 End"], segments),
+    }
+    for title, (header, rows) in sheets.items():
+        sheet = workbook.create_sheet(title)
+        sheet.append(header)
+        for row in rows:
+            sheet.append(list(row))
+    workbook.save(file_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory")
+    defaults = FamilySpec()
+    for name, value in asdict(defaults).items():
+        parser.add_argument("--" + name.replace("_", "-"), type=int, default=value)
+    args = parser.parse_args()
+
+    spec = FamilySpec(**{name: getattr(args, name) for name in asdict(defaults)})
+    files = generate_family(spec, args.directory)
+    print(f"Wrote {files.workbook}, triangulations in {files.triangulation_dir}, matches in {files.matches_dir}")
+
+
+if __name__ == "__main__":
+    main()
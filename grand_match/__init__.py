@@ -1,21 +1,66 @@
+"""Models, importers and the matching pipeline.
+
+Names are imported on first use (PEP 562), so importing a model or the
+OverlapCalculator doesn't load NumPy or the importers' dependencies.
+"""
+import importlib
+
 # has no dependencies
-from grand_match.models.chromosome_match import ChromosomeMatch
-from grand_match.models.triang import Triang
-from grand_match.models.grandparent_segment import GrandparentSegment
-from grand_match.models.grandparent import Grandparent
-from grand_match.models.chromosome_setting import ChromosomeSetting
-from grand_match.models.cousin import Cousin
-from grand_match.models.ged_match_segment import GedMatchSegment
-from grand_match.models.milestone_type import MilestoneType
-from grand_match.models.sibling_match import SiblingMatch
-from grand_match.models.sibling import Sibling
+_LAZY_IMPORTS = {
+    "ChromosomeMatch": "grand_match.models.chromosome_match",
+    "CompactChromosomeMatch": "grand_match.models.chromosome_match",
+    "ClusterMember": "grand_match.models.cluster_member",
+    "Triang": "grand_match.models.triang",
+    "CompactTriang": "grand_match.models.triang",
+    "GrandparentSegment": "grand_match.models.grandparent_segment",
+    "CompactGrandparentSegment": "grand_match.models.grandparent_segment",
+    "Grandparent": "grand_match.models.grandparent",
+    "ChromosomeSetting": "grand_match.models.chromosome_setting",
+    "Cousin": "grand_match.models.cousin",
+    "GedMatchSegment": "grand_match.models.ged_match_segment",
+    "CompactGedMatchSegment": "grand_match.models.ged_match_segment",
+    "SiblingMatch": "grand_match.models.sibling_match",
+    "Sibling": "grand_match.models.sibling",
+    "StringPool": "grand_match.models.string_pool",
+    "RunReport": "grand_match.run_report",
+    "StageReport": "grand_match.run_report",
+}
 
 # has dependencies
-from grand_match.models.sibling_overlap import SiblingOverlap
-from grand_match.models.milestone import Milestone
-from grand_match.models.triang_group import TriangGroup
-from grand_match.triang_importer import TriagImporter
-from grand_match.models.chromosome_model import ChromosomeModel
-from grand_match.overlap_calculator import OverlapCalculator
-from grand_match.ged_match_segment_importer import GedMatchSegmentImporter
-from grand_match.grand_match import GrandMatch
+_LAZY_IMPORTS.update({
+    "KitRegistry": "grand_match.models.kit_registry",
+    "GedMatchSegmentIndex": "grand_match.models.ged_match_segment_index",
+    "SiblingOverlap": "grand_match.models.sibling_overlap",
+    "CompactSiblingOverlap": "grand_match.models.sibling_overlap",
+    "TriangTable": "grand_match.models.triang_table",
+    "TriangTableBuilder": "grand_match.models.triang_table",
+    "TriangGraph": "grand_match.models.triang_graph",
+    "TriangGraphIndex": "grand_match.models.triang_graph",
+    "CousinClusters": "grand_match.models.cousin_clusters",
+    "TriangMatch": "grand_match.models.triang_match",
+    "TriagImporter": "grand_match.triang_importer",
+    "TriangFilter": "grand_match.triang_importer",
+    "TriangCache": "grand_match.triang_cache",
+    "UnitStateStore": "grand_match.unit_state",
+    "TableExporter": "grand_match.table_export",
+    "ChromosomeModel": "grand_match.models.chromosome_model",
+    "OverlapCalculator": "grand_match.overlap_calculator",
+    "GedMatchSegmentImporter": "grand_match.ged_match_segment_importer",
+    "GrandMatch": "grand_match.grand_match",
+})
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name: str):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    # cache it, so later lookups don't come back here
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,202 @@
+import os
+import pickle
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+
+from grand_match import GedMatchSegmentImporter, GedMatchSegmentIndex, GrandMatch, KitRegistry, RunReport, StringPool
+from grand_match import TriangGraph, TriangTable
+from grand_match.excel_importer import ExcelImporter
+from grand_match.grand_match import _load_triangulation
+from grand_match.models.triang_table import TRIANG_COLUMNS
+
+SHARED_INPUTS_VERSION = 3
+
+
+@dataclass
+class FamilyConfig:
+    """One workbook to run. Families may point at the same triangulation and matches folders."""
+    workbook: str
+    output_directory: str
+    triangulation_directory: str
+    matches_directory: str
+    excel_cache_directory: str = None
+    # each family needs its own state folder, if any
+    state_dir: str = None
+    export_layout: str = "legacy"
+    export_format: str = "csv"
+
+
+@dataclass
+class SharedInputs:
+    """The workbooks, triangulation tables and GEDmatch segment indexes of a batch, each loaded once.
+
+    Everything is interned into one string pool and kit registry, and the
+    triangulation files are deduplicated into one graph, so a family's
+    GrandMatch builds its graph over the same edges. For worker processes the
+    graph is saved as .npy files and memory-mapped read-only, so the OS shares
+    one copy of the pages between the workers; its edges are in chromosome
+    order, so each family's chromosome parts stay views of the mapped files.
+    """
+    strings: StringPool = field(default_factory=StringPool)
+    kits: KitRegistry = field(default_factory=KitRegistry)
+    # ExcelImporter per absolute workbook path
+    workbooks: Dict[str, ExcelImporter] = field(default_factory=dict)
+    # every whole triangulation file, its edge_rows keyed by absolute CSV path
+    triang_graph: TriangGraph = None
+    # segment index per absolute matches directory
+    segment_indexes: Dict[str, GedMatchSegmentIndex] = field(default_factory=dict)
+
+    def load(self, families: List[FamilyConfig], cache_dir: str = None, workers: int = 1):
+        """Import every distinct workbook, triangulation CSV and matches directory the families use."""
+        file_paths: List[str] = []
+        for family in families:
+            workbook = os.path.abspath(family.workbook)
+            if workbook not in self.workbooks:
+                importer = ExcelImporter(workbook, kit_registry=self.kits, cache_dir=family.excel_cache_directory)
+                importer.importExcel()
+                self.workbooks[workbook] = importer
+            for sibling in self.workbooks[workbook].siblingsByName.values():
+                file_path = os.path.abspath(os.path.join(family.triangulation_directory, sibling.kit.strip() + ".csv"))
+                loaded = self.triang_graph is not None and file_path in self.triang_graph.edge_rows
+                if not loaded and file_path not in file_paths:
+                    file_paths.append(file_path)
+        if file_paths or self.triang_graph is None:
+            self.triang_graph = TriangGraph.build(self._load_tables(file_paths, cache_dir, workers), self.strings, self.kits)
+
+        for family in families:
+            directory = os.path.abspath(family.matches_directory)
+            if directory not in self.segment_indexes:
+                self.segment_indexes[directory] = GedMatchSegmentImporter(kit_registry=self.kits).importIndex(directory)
+
+    def _load_tables(self, file_paths: List[str], cache_dir: str, workers: int) -> Dict[str, TriangTable]:
+        """The rows already in the graph followed by the given files, whole so families with different enabled
+        chromosomes can share them."""
+        tables: Dict[str, TriangTable] = {}
+        if self.triang_graph is not None:
+            tables = {file_path: self.triang_graph.sibling_table(file_path) for file_path in self.triang_graph.edge_rows}
+        if workers is not None and workers > 1 and len(file_paths) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(file_paths))) as executor:
+                futures = {file_path: executor.submit(_load_triangulation, file_path, None, cache_dir)
+                           for file_path in file_paths}
+                for file_path, future in futures.items():
+                    tables[file_path] = future.result().rebind(self.strings, self.kits)
+        else:
+            for file_path in file_paths:
+                tables[file_path] = _load_triangulation(file_path, None, cache_dir, False, self.strings, self.kits)
+        return tables
+
+    def save(self, directory: str):
+        """Write the graph's edge columns and each file's edge rows as .npy files and everything else as one pickle."""
+        os.makedirs(directory, exist_ok=True)
+        for name in TRIANG_COLUMNS:
+            np.save(os.path.join(directory, f"edges.{name}.npy"), getattr(self.triang_graph.edges, name))
+        file_numbers: Dict[str, int] = {}
+        for number, (file_path, rows) in enumerate(self.triang_graph.edge_rows.items()):
+            np.save(os.path.join(directory, f"{number}.edge_rows.npy"), rows)
+            file_numbers[file_path] = number
+        shared = {"version": SHARED_INPUTS_VERSION, "strings": self.strings, "kits": self.kits,
+                  "workbooks": self.workbooks, "files": file_numbers, "segment_indexes": self.segment_indexes}
+        with open(os.path.join(directory, "shared.pickle"), 'wb') as f:
+            pickle.dump(shared, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def open(cls, directory: str) -> "SharedInputs":
+        """Open inputs written by `save`, with the graph's edges and edge rows memory-mapped read-only."""
+        with open(os.path.join(directory, "shared.pickle"), 'rb') as f:
+            shared = pickle.load(f)
+        if shared["version"] != SHARED_INPUTS_VERSION:
+            raise ValueError(f"{directory} holds shared inputs version {shared['version']}, expected {SHARED_INPUTS_VERSION}")
+        strings, kits = shared["strings"], shared["kits"]
+        edges = TriangTable(strings, kits, **{name: np.load(os.path.join(directory, f"edges.{name}.npy"), mmap_mode='r')
+                                              for name in TRIANG_COLUMNS})
+        edge_rows = {file_path: np.load(os.path.join(directory, f"{number}.edge_rows.npy"), mmap_mode='r')
+                     for file_path, number in shared["files"].items()}
+        return cls(strings=strings, kits=kits, workbooks=shared["workbooks"],
+                   triang_graph=TriangGraph.from_edge_rows(edges, edge_rows), segment_indexes=shared["segment_indexes"])
+
+
+def run_family(family: FamilyConfig, shared: SharedInputs, report: RunReport = None) -> RunReport:
+    """Run the pipeline for one family against the shared inputs and write its results and run report."""
+    report = report if report is not None else RunReport()
+    excel_importer = shared.workbooks[os.path.abspath(family.workbook)]
+
+    grand_match = GrandMatch(string_pool=shared.strings, kit_registry=shared.kits)
+    grand_match.siblingsByKit = excel_importer.siblingsByKit
+    grand_match.siblingsByName = excel_importer.siblingsByName
+    grand_match.grandparentsByKit = excel_importer.grandparentsByKit
+    grand_match.grandparentsByName = excel_importer.grandparentsByName
+    grand_match.cousinByName = excel_importer.cousinByName
+    grand_match.cousinByKit = excel_importer.cousinByKit
+    grand_match.grandparent_segments = excel_importer.grandparent_segments
+    grand_match.state_dir = family.state_dir
+    grand_match.loaded_triangulations = shared.triang_graph
+    grand_match.segment_index = shared.segment_indexes[os.path.abspath(family.matches_directory)]
+
+    enabled_chromosomes = {chr_num for chr_num, setting in excel_importer.chromosome_settings_by_chr.items()
+                           if setting.mode.strip().lower() == "yes"}
+    with report.stage("triangulation_import") as stage:
+        grand_match.get_triangulation(family.triangulation_directory, enabled_chromosomes)
+        stage.rows_out = grand_match.triang_graph.row_count()
+    with report.stage("model_build"):
+        grand_match.create_chromosome_models(excel_importer.chromosome_settings_by_chr)
+    with report.stage("overlaps") as stage:
+        grand_match.LoopOnChromosomeData()
+        stage.rows_out = sum(len(overlaps) for chrome in grand_match.chromosome_models.values()
+                             for overlaps in chrome.overlapsByGrandparent.values())
+    with report.stage("matching") as stage:
+        matches = grand_match.match_chromosomes()
+        stage.rows_out = len(matches)
+    with report.stage("clustering", rows_in=len(grand_match.triang_graph)) as stage:
+        stage.rows_out = grand_match.cluster_cousins().cluster_count()
+    with report.stage("export_matches", rows_in=len(matches)):
+        grand_match.export_triangs_to_csv(matches, family.output_directory)
+    with report.stage("extract_kits", rows_in=len(matches)) as stage:
+        stage.rows_out = len(grand_match.extract_kits(matches, family.output_directory, family.matches_directory))
+    with report.stage("export_overlaps"):
+        grand_match.export_overlaps(family.output_directory, layout=family.export_layout, file_format=family.export_format)
+
+    report.write(os.path.join(family.output_directory, "run_report.json"))
+    return report
+
+
+# Inputs of a batch worker process, memory-mapped once by _init_batch_worker
+_batch_worker_shared: SharedInputs = None
+
+
+def _init_batch_worker(shared_dir: str):
+    global _batch_worker_shared
+    _batch_worker_shared = SharedInputs.open(shared_dir)
+
+
+def _run_family_in_worker(family: FamilyConfig) -> RunReport:
+    return run_family(family, _batch_worker_shared)
+
+
+def run_batch(families: List[FamilyConfig], workers: int = 1, cache_dir: str = None,
+              shared_dir: str = None) -> List[RunReport]:
+    """Load the families' inputs once, then run each family, in `workers` processes when more than one.
+
+    Worker processes memory-map the shared inputs from `shared_dir` (a temporary
+    folder, removed afterwards, when not given). Reports are returned in family order.
+    """
+    shared = SharedInputs()
+    shared.load(families, cache_dir, workers)
+    if workers is None or workers <= 1 or len(families) <= 1:
+        return [run_family(family, shared) for family in families]
+
+    temporary = shared_dir is None
+    shared_dir = tempfile.mkdtemp(prefix="grand_match_batch_") if temporary else shared_dir
+    try:
+        shared.save(shared_dir)
+        with ProcessPoolExecutor(max_workers=min(workers, len(families)), initializer=_init_batch_worker,
+                                 initargs=(shared_dir,)) as executor:
+            futures = [executor.submit(_run_family_in_worker, family) for family in families]
+            return [future.result() for future in futures]
+    finally:
+        if temporary:
+            shutil.rmtree(shared_dir, ignore_errors=True)
@@ -0,0 +1,109 @@
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+INDEX_VERSION = 1
+
+
+@dataclass
+class ChromosomeOffsetIndex:
+    """Byte ranges of each chromosome's rows in a triangulation CSV.
+
+    Consecutive rows on the same chromosome are coalesced into one range. The
+    index is stored as a JSON sidecar (`{csv}.chrindex.json`) and is rebuilt
+    whenever the CSV's size or mtime no longer match.
+    """
+    size: int
+    mtime_ns: int
+    header_end: int
+    ranges: Dict[int, List[Tuple[int, int]]] = field(default_factory=dict)
+
+    @staticmethod
+    def sidecar_path(file_path: str) -> str:
+        return file_path + ".chrindex.json"
+
+    @classmethod
+    def build(cls, file_path: str) -> Optional["ChromosomeOffsetIndex"]:
+        """Scan the CSV once, reading only the leading Chr field of each line.
+
+        Returns None when a row spans several lines (a quoted field with an
+        embedded newline), since line offsets can't describe such a file, and
+        when Chr isn't the first column or doesn't parse; the caller then
+        parses the whole file.
+        """
+        stat = os.stat(file_path)
+        ranges: Dict[int, List[Tuple[int, int]]] = {}
+        with open(file_path, 'rb') as f:
+            header = f.readline()
+            if header.count(b'"') % 2:
+                return None
+            if header.split(b',', 1)[0].strip().strip(b'"') != b"Chr":
+                return None
+            header_end = position = len(header)
+            current_chr = None
+            for line in f:
+                end = position + len(line)
+                if line.count(b'"') % 2:
+                    return None
+                chr_field = line.split(b',', 1)[0].strip().strip(b'"')
+                if chr_field:
+                    try:
+                        chr_int = 23 if chr_field == b"X" else int(chr_field)
+                    except ValueError:
+                        return None
+                    chr_ranges = ranges.setdefault(chr_int, [])
+                    if chr_int == current_chr:
+                        chr_ranges[-1] = (chr_ranges[-1][0], end)
+                    else:
+                        chr_ranges.append((position, end))
+                    current_chr = chr_int
+                position = end
+        return cls(size=stat.st_size, mtime_ns=stat.st_mtime_ns, header_end=header_end, ranges=ranges)
+
+    @classmethod
+    def load(cls, file_path: str) -> Optional["ChromosomeOffsetIndex"]:
+        """Return the sidecar index if it still describes the CSV, otherwise None."""
+        sidecar = cls.sidecar_path(file_path)
+        if not os.path.exists(sidecar):
+            return None
+        try:
+            with open(sidecar, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        stat = os.stat(file_path)
+        if data.get("version") != INDEX_VERSION or data["size"] != stat.st_size or data["mtime_ns"] != stat.st_mtime_ns:
+            return None
+        ranges = {int(chr): [tuple(r) for r in chr_ranges] for chr, chr_ranges in data["ranges"].items()}
+        return cls(size=data["size"], mtime_ns=data["mtime_ns"], header_end=data["header_end"], ranges=ranges)
+
+    @classmethod
+    def load_or_build(cls, file_path: str) -> Optional["ChromosomeOffsetIndex"]:
+        index = cls.load(file_path)
+        if index is None:
+            index = cls.build(file_path)
+            if index is not None:
+                index.save(file_path)
+        return index
+
+    def save(self, file_path: str):
+        data = {"version": INDEX_VERSION, "size": self.size, "mtime_ns": self.mtime_ns,
+                "header_end": self.header_end, "ranges": self.ranges}
+        try:
+            with open(self.sidecar_path(file_path), 'w') as f:
+                json.dump(data, f)
+        except OSError:
+            # a read-only input folder just means the index is rebuilt next time
+            pass
+
+    def ranges_for(self, chromosomes: Iterable[int]) -> List[Tuple[int, int]]:
+        """Byte ranges covering the given chromosomes, in file order with touching ranges merged."""
+        selected = sorted(r for chr in chromosomes for r in self.ranges.get(chr, []))
+        merged: List[Tuple[int, int]] = []
+        for start, end in selected:
+            if merged and merged[-1][1] == start:
+                merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((start, end))
+        return merged
@@ -1,7 +1,22 @@
 from dataclasses import dataclass, field
-from typing import Dict, List
-import pandas as pd
-from grand_match import ChromosomeSetting, Cousin, Grandparent, GrandparentSegment, Sibling
+import hashlib
+import os
+import pickle
+from typing import Any, Dict, Iterator, List
+from grand_match import ChromosomeSetting, Cousin, Grandparent, GrandparentSegment, KitRegistry, Sibling
+
+SNAPSHOT_VERSION = 2
+
+# Fields restored from a cached snapshot of a previous import of the same workbook
+SNAPSHOT_FIELDS = ["siblingsByName", "siblingsByKit", "grandparentsByName", "grandparentsByKit", "cousinByName",
+                   "cousinByKit", "grandparent_segments", "chromosome_settings_by_chr"]
+
+
+def _cell(value: Any) -> Any:
+    # Excel stores every number as a float; whole numbers come back as ints, like pandas does
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
 
 
 @dataclass()
@@ -15,43 +30,66 @@ class ExcelImporter:
     cousinByKit: Dict[str, Cousin] = field(default_factory=dict)
     grandparent_segments: List[GrandparentSegment] = field(default_factory=list)
     chromosome_settings_by_chr: Dict[int, ChromosomeSetting] = field(default_factory=dict)
+    kit_registry: KitRegistry = field(default_factory=KitRegistry)
+    # When set, the imported configuration is pickled here and reused while the workbook is unchanged
+    cache_dir: str = None
 
     def importExcel(self):
-        self.import_chromosome_settings()
-        self.importSiblings()
-        self.importCousins()
-        self.importGrandparents()
-        self.importGrandparentSegments()
-
-    def import_chromosome_settings(self):
-        siblings_df = pd.read_excel(self.excel_file_full_path, sheet_name='chromosomes', header=0, engine='openpyxl')
-
-        for index, row in siblings_df.iterrows():
+        if self.cache_dir is not None and self.load_snapshot():
+            return
+
+        # imported here so a run served from the snapshot never loads openpyxl
+        import openpyxl
+        # read_only streams the sheets instead of building the whole workbook in memory
+        workbook = openpyxl.load_workbook(self.excel_file_full_path, read_only=True, data_only=True)
+        try:
+            self.import_chromosome_settings(self.sheet_rows(workbook, 'chromosomes'))
+            self.importSiblings(self.sheet_rows(workbook, 'Siblings'))
+            self.importCousins(self.sheet_rows(workbook, 'Cousins'))
+            self.importGrandparents(self.sheet_rows(workbook, 'Grandparents'))
+            self.importGrandparentSegments(self.sheet_rows(workbook, 'GrandparentSegments'))
+        finally:
+            workbook.close()
+
+        if self.cache_dir is not None:
+            self.save_snapshot()
+
+    def sheet_rows(self, workbook, sheet_name: str) -> Iterator[Dict[str, Any]]:
+        """Yield each non-empty row of a sheet as a dict keyed by the header row."""
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [(index, name) for index, name in enumerate(header) if name is not None]
+        for values in rows:
+            row = {name: _cell(values[index]) if index < len(values) else None for index, name in columns}
+            if any(value is not None for value in row.values()):
+                yield row
+
+    def import_chromosome_settings(self, rows: Iterator[Dict[str, Any]]):
+        for row in rows:
             chr_as_str = row['Chr']
             chr: int = int(chr_as_str)
 
             mode = row['Mode'].strip()
-      
+
             if chr not in self.chromosome_settings_by_chr:
                 setting = ChromosomeSetting(chr=chr, mode=mode)
                 self.chromosome_settings_by_chr[chr] = setting
 
-    def importCousins(self):
-        siblings_df = pd.read_excel(self.excel_file_full_path, sheet_name='Cousins', header=0, engine='openpyxl')
-
-        for index, row in siblings_df.iterrows():
+    def importCousins(self, rows: Iterator[Dict[str, Any]]):
+        for row in rows:
             name = row['Name'].strip()
             kit = row['Kit'].strip()
             grandparent = row["Grandparent"]
 
+            self.kit_registry.intern(kit)
             cousin = Cousin(name=name,kit=kit, grandparent=grandparent)
             self.cousinByName.setdefault(name, cousin)
             self.cousinByKit.setdefault(kit,cousin)
 
-    def importGrandparents(self):
-        siblings_df = pd.read_excel(self.excel_file_full_path, sheet_name='Grandparents', header=0, engine='openpyxl')
-
-        for index, row in siblings_df.iterrows():
+    def importGrandparents(self, rows: Iterator[Dict[str, Any]]):
+        for row in rows:
             name = row['Name'].strip()
             mode = str(row.get('Mode', 'Yes')).strip()
             if mode.lower() != 'yes':
@@ -60,28 +98,62 @@ class ExcelImporter:
             grandparent = Grandparent(name=name)
             self.grandparentsByName.setdefault(name, grandparent)
 
-    def importSiblings(self):
-        siblings_df = pd.read_excel(self.excel_file_full_path, sheet_name='Siblings', header=0, engine='openpyxl')
-
-        for index, row in siblings_df.iterrows():
+    def importSiblings(self, rows: Iterator[Dict[str, Any]]):
+        for row in rows:
             name = row['Name'].strip()
             kit = row['Kit'].strip()
             order = int(row.get('Order', 0) or 0)
 
+            self.kit_registry.intern(kit)
             sibling = Sibling(name=name, kit=kit, order=order)
             self.siblingsByName.setdefault(name, sibling)
             self.siblingsByKit.setdefault(kit, sibling)
 
-    def importGrandparentSegments(self):
-        siblings_df = pd.read_excel(self.excel_file_full_path, sheet_name='GrandparentSegments', header=0, engine='openpyxl')
-
-        for index, row in siblings_df.iterrows():
+    def importGrandparentSegments(self, rows: Iterator[Dict[str, Any]]):
+        for row in rows:
             chromosome = row['Chr']
             sibling = row['Sibling']
             kit = row['Kit']
             grandparent = row['Grandparent']
             start = int(row['B37 Start'])
             end = int(row['B37 End'])
+            self.kit_registry.intern(kit)
             segment = GrandparentSegment(chromosome, sibling, kit, grandparent, start, end)
 
-            self.grandparent_segments.append(segment)   
+            self.grandparent_segments.append(segment)
+
+    def snapshot_path(self) -> str:
+        source = os.path.abspath(self.excel_file_full_path)
+        key = hashlib.sha1(source.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{os.path.basename(source)}.{key}.pickle")
+
+    def load_snapshot(self) -> bool:
+        """Restore a previous import of this workbook if its size and mtime are unchanged."""
+        path = self.snapshot_path()
+        if not os.path.exists(path):
+            return False
+        stat = os.stat(self.excel_file_full_path)
+        try:
+            with open(path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return False
+        if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("size") != stat.st_size \
+                or snapshot.get("mtime_ns") != stat.st_mtime_ns:
+            return False
+        for name in SNAPSHOT_FIELDS:
+            setattr(self, name, snapshot[name])
+        # intern into the existing registry so one shared with other importers keeps working
+        self.kit_registry.ids(snapshot["kits"])
+        return True
+
+    def save_snapshot(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        stat = os.stat(self.excel_file_full_path)
+        snapshot = {"version": SNAPSHOT_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        snapshot.update({name: getattr(self, name) for name in SNAPSHOT_FIELDS})
+        snapshot["kits"] = list(self.kit_registry.values)
+        path = self.snapshot_path()
+        with open(path + ".tmp", 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
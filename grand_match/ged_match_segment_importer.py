@@ -1,40 +1,57 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import csv
 import os
 import fnmatch
-from typing import List
+from typing import Iterator, List, Set
 
-from grand_match import GedMatchSegment
+from grand_match import CompactGedMatchSegment, GedMatchSegment, GedMatchSegmentIndex, KitRegistry
 
 @dataclass
 class GedMatchSegmentImporter:
+    kit_registry: KitRegistry = field(default_factory=KitRegistry)
+
     def importCsv(self, directory: str)-> List[GedMatchSegment]:
-        segment_list: List[GedMatchSegment] = []
+        return list(self.iterSegments(directory))
+
+    def importIndex(self, directory: str, kits: Set[str] = None) -> GedMatchSegmentIndex:
+        """Stream every CSV under `directory` into an index by matched kit and chromosome.
+
+        When `kits` is given, rows for any other matched kit are skipped before a segment is built.
+        The index holds CompactGedMatchSegment objects, which don't carry a `__dict__` each.
+        """
+        index = GedMatchSegmentIndex()
+        for segment in self.iterSegments(directory, kits, CompactGedMatchSegment):
+            index.add(segment)
+        return index
+
+    def iterSegments(self, directory: str, kits: Set[str] = None, model: type = GedMatchSegment) -> Iterator[GedMatchSegment]:
         for root, dirs, files in os.walk(directory):
             for filename in fnmatch.filter(files, '*.csv'):
                 file_path: str = os.path.join(root, filename)
-                sibling_segments = self.createList(file_path)
-                segment_list.extend(sibling_segments)
-        return segment_list
+                yield from self.iterFile(file_path, kits, model)
 
     def createList(self, file_path: str) -> List[GedMatchSegment]:
-        segment_list = []
+        return list(self.iterFile(file_path))
+
+    def iterFile(self, file_path: str, kits: Set[str] = None, model: type = GedMatchSegment) -> Iterator[GedMatchSegment]:
+        intern = self.kit_registry.intern
         with open(file_path, 'r') as csvfile:
             reader = csv.DictReader(csvfile)
             for row in reader:
-                PrimaryKit = row["PrimaryKit"]
                 MatchedKit	= row["MatchedKit"]
+                if kits is not None and MatchedKit not in kits:
+                    continue
+                PrimaryKit = row["PrimaryKit"]
                 chr	= row["chr"]
                 if chr == "X":
                     chr = 23
-                B37Start	= row["B37Start"]
-                B37End	= row["B37End"]
-                Segment = row["Segment cM"]
-                SNPs	= row["SNPs"]
+                B37Start	= int(row["B37Start"])
+                B37End	= int(row["B37End"])
+                Segment = float(row["Segment cM"])
+                SNPs	= int(row["SNPs"])
                 MatchedName	= row["MatchedName"]
                 matched_sex = row["Matched Sex"]
                 MatchedEmail= row["MatchedEmail"]
 
-                segment = GedMatchSegment(b37_end=B37End, b37_start=B37Start, chromosome=int(chr), matched_email=MatchedEmail, matched_kit=MatchedKit, matched_name=MatchedName, matched_sex=matched_sex, snps=SNPs, segment_cm=Segment, primary_kit=PrimaryKit)
-                segment_list.append(segment)
-        return segment_list
\ No newline at end of file
+                yield model(b37_end=B37End, b37_start=B37Start, chromosome=int(chr), matched_email=MatchedEmail, matched_kit=MatchedKit, matched_name=MatchedName, matched_sex=matched_sex, snps=SNPs, segment_cm=Segment, primary_kit=PrimaryKit,
+                                      primary_kit_id=intern(PrimaryKit), matched_kit_id=intern(MatchedKit))
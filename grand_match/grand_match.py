@@ -1,18 +1,44 @@
-import copy
-from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
 import os
-from typing import Dict, List
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple
 
+import numpy as np
 from grand_match import Sibling, Cousin, Grandparent, ChromosomeModel, GrandparentSegment, SiblingOverlap
-from grand_match import Triang, ChromosomeSetting, OverlapCalculator, TriangGroup, TriagImporter, ChromosomeMatch
-from grand_match import GedMatchSegmentImporter, GedMatchSegment, SiblingMatch
-import pandas as pd
+from grand_match import Triang, ChromosomeSetting, OverlapCalculator, TriagImporter, ChromosomeMatch, ClusterMember
+from grand_match import GedMatchSegmentImporter, SiblingMatch, StringPool, TriangTable, TriangCache
+from grand_match import KitRegistry, GedMatchSegmentIndex, TriangGraph, TriangGraphIndex, TriangMatch, UnitStateStore
+from grand_match import CousinClusters
+from grand_match import TableExporter, TriangFilter
+from grand_match.unit_state import fingerprint, table_fingerprint
+from grand_match.models.triang_table import TRIANG_COLUMNS
+from grand_match.table_export import Columns, write_models_csv
+
+# get_triangulation only starts a process pool for at least this many bytes of CSVs to parse: about
+# three seconds of serial parsing, well above what starting the workers costs on Windows
+PARALLEL_IMPORT_MIN_BYTES = 64 * 1024 * 1024
 
 KIT_PLATFORM = {
     'A': 'Ancestry', 'F': 'FamilyTreeDNA', 'T': 'FamilyTreeDNA',
     'G': 'GenesForGood', 'H': 'MyHeritage', 'M': '23andMe', 'W': 'WeGene',
 }
 
+
+def _columns_from_rows(names: List[str], rows: List[tuple]) -> Columns:
+    return {name: [row[i] for row in rows] for i, name in enumerate(names)}
+
+
+def _model_columns(models: list, exclude: tuple = ()) -> Columns:
+    """Columns of a list of models, like a DataFrame built from their rows (no columns at all when empty)."""
+    if not models:
+        return {}
+    names = [f.name for f in fields(models[0]) if f.name not in exclude]
+    return {name: [getattr(model, name) for model in models] for name in names}
+
+
+def _table_columns(table: TriangTable) -> Columns:
+    return {name: values.tolist() for name, values in table.columns().items()}
+
 @dataclass()
 class GrandMatch:
 
@@ -26,7 +52,49 @@ class GrandMatch:
     cousinByName: Dict[str, Cousin] = field(default_factory=dict)
     cousinByKit: Dict[str, Cousin] = field(default_factory=dict)
     grandparent_segments: List[GrandparentSegment] = field(default_factory=list)
-    triangulationBySiblingKit: Dict[str, List[Triang]] = field(default_factory=dict)
+    # Triangulations handed over as TriangTables or lists of Triang, not yet folded into triang_graph
+    triangulationBySiblingKit: Dict[str, TriangTable] = field(default_factory=dict)
+    string_pool: StringPool = field(default_factory=StringPool)
+    kit_registry: KitRegistry = field(default_factory=KitRegistry)
+    # When set, each (chromosome, grandparent) unit's overlaps and matches are kept here and
+    # only recomputed when the unit's inputs change
+    state_dir: str = None
+    # Whole triangulation files already loaded into one graph, its edge_rows keyed by absolute CSV path (a batch
+    # shares it between families); get_triangulation takes the siblings' rows of it instead of parsing the CSVs
+    loaded_triangulations: TriangGraph = None
+    # An already loaded GEDmatch segment index; extract_kits uses it instead of importing the matches directory
+    segment_index: GedMatchSegmentIndex = None
+    # Every sibling's triangulation rows deduplicated into one graph: the stored form of the triangulations
+    triang_graph: TriangGraph = None
+    # Non-sibling kits triangulating with each other in the same region, built by cluster_cousins
+    cousin_clusters: CousinClusters = None
+
+    def build_triang_graph(self) -> TriangGraph:
+        """Fold the triangulations in triangulationBySiblingKit into triang_graph and drop them from there."""
+        self.triang_graph = TriangGraph.build(self._pending_tables(), self.string_pool, self.kit_registry)
+        return self.triang_graph
+
+    def _pending_tables(self) -> Dict[str, TriangTable]:
+        """Every sibling's rows, those already in triang_graph first, as tables bound to this GrandMatch's
+        string pool and kit registry; a plain list of Triang is converted.
+
+        Empties triangulationBySiblingKit, so the returned dict holds the only references TriangGraph.build drops.
+        """
+        tables = {}
+        if self.triang_graph is not None:
+            tables = {kit: self.triang_graph.sibling_table(kit) for kit in self.triang_graph.edge_rows}
+        for sibling_kit, triangulation in self.triangulationBySiblingKit.items():
+            if not isinstance(triangulation, TriangTable):
+                triangulation = TriangTable.from_triangs(triangulation, self.string_pool, self.kit_registry)
+            tables[sibling_kit] = triangulation.rebind(self.string_pool, self.kit_registry)
+        self.triangulationBySiblingKit = {}
+        return tables
+
+    def triang_table(self, sibling_kit: str) -> TriangTable:
+        """Return a sibling's triangulation rows in file order, gathered from triang_graph."""
+        if self.triang_graph is None or self.triangulationBySiblingKit:
+            self.build_triang_graph()
+        return self.triang_graph.sibling_table(sibling_kit)
 
     def create_chromosome_models(self, chromosome_settings_by_chr: Dict[int, ChromosomeSetting]):
 
@@ -45,9 +113,21 @@ class GrandMatch:
                 chromosome_model.segmentsByGrandparent[segment.Grandparent].append(segment)
 
     def LoopOnChromosomeData(self):
+        # the graph's edges are in chromosome order, so each chromosome gets views of them
+        if self.triang_graph is None or self.triangulationBySiblingKit:
+            self.build_triang_graph()
+        graphsByChr: Dict[int, TriangGraph] = self.triang_graph.partition_by_chromosome(self.chromosome_models.keys())
+
+        store = UnitStateStore(self.state_dir) if self.state_dir is not None else None
         for chr_number in self.chromosome_models.keys():
             chromosome_model: ChromosomeModel = self.chromosome_models[chr_number]
             for grandparent in chromosome_model.segmentsByGrandparent.keys():
+                if store is not None:
+                    state = store.load(chr_number, grandparent)
+                    if state is not None and state["overlaps_fingerprint"] == self._overlaps_fingerprint(chr_number, grandparent):
+                        chromosome_model.overlapsByGrandparent[grandparent] = state["overlaps"]
+                        continue
+
                 segments = chromosome_model.segmentsByGrandparent[grandparent]
                 calculator = OverlapCalculator(segments)
                 overlaps = calculator.calculate_overlaps()
@@ -56,146 +136,350 @@ class GrandMatch:
                 chromosome_model.overlapsByGrandparent[grandparent] = overlaps
 
 
-            for sibling_kit in self.siblingsByKit.keys():
-                    sibling_triangulation = self.triangulationBySiblingKit[sibling_kit]
+            chromosome_model.triang_graph = graphsByChr[chr_number]
 
-                    # Create a dictionary for this sibling for just this chromosome
-                    for triang in sibling_triangulation:
-                        if triang.Chr == chr_number:
-                            if sibling_kit not in chromosome_model.triangBySibling:
-                                chromosome_model.triangBySibling[sibling_kit] = []
-                            chromosome_model.triangBySibling[sibling_kit].append(triang)
 
+    def matching_filter(self, min_cm: float = None) -> TriangFilter:
+        """A filter for get_triangulation dropping the rows matching can never keep, and those below `min_cm`.
 
-    def _evaluate_group(self, triangGroup: TriangGroup, overlap: SiblingOverlap,
-                        bestSiblingKit: str, cousinKitsToExclude: List[str]) -> List[Triang]:
-        """Evaluate a completed TriangGroup and return its triangs if it passes all filters."""
-        if len(triangGroup.triang_list) == 0:
+        Groups whose Kit1 is a sibling are always rejected, and a match lies
+        within an overlap, so within a grandparent segment. Matches are
+        unchanged (without `min_cm`), but the exported triangulations and the
+        cousin clusters only see the rows kept.
+        """
+        windows: Dict[int, List[Tuple[int, int]]] = {}
+        for segment in self.grandparent_segments:
+            windows.setdefault(segment.Chr, []).append((segment.B37_Start, segment.B37_End))
+        return TriangFilter(min_cm=min_cm, exclude_kit1={kit.strip() for kit in self.siblingsByKit}, windows=windows)
+
+    def cluster_cousins(self) -> CousinClusters:
+        """Cluster the kits of the triangulation graph; extract_kits adds the clusters to its outputs."""
+        self.cousin_clusters = CousinClusters.build(self.triang_graph, self.siblingsByKit.keys())
+        return self.cousin_clusters
+
+    def match_chromosomes(self, workers: int = 1) -> List[TriangMatch]:
+        """Match every overlap against the best sibling's triangulations.
+
+        Matches reference rows of the chromosome tables instead of copying them;
+        full `Triang` rows are only built when they are exported.
+        """
+        return list(self.iter_matches(workers))
+
+    def iter_matches(self, workers: int = 1) -> Iterator[TriangMatch]:
+        """Yield the matches of `match_chromosomes` unit by unit, as they are produced.
+
+        Each (chromosome, grandparent) pair is an independent unit of work. With
+        `workers` > 1 the units run in a process pool; their results are yielded
+        in the serial order, so the output is identical to a serial run.
+        """
+        registry = self.kit_registry
+        for chrome in self.chromosome_models.values():
+            for overlaps in chrome.overlapsByGrandparent.values():
+                for overlap in overlaps:
+                    registry.ids(overlap.sibling_kits)
+        # intern up front so every unit (and every worker) sees the same kit ids
+        registry.ids(cuz.kit for cuz in self.cousinByKit.values())
+        siblingBits = registry.bits(self.siblingsByKit.keys())
+        kit_ranks = registry.sort_ranks()
+
+        units = [(chr_number, gparent) for chr_number, chrome in self.chromosome_models.items()
+                 for gparent in self.grandparentsByName.keys() if gparent in chrome.overlapsByGrandparent]
+
+        # with a state_dir, reuse the matches of every unit whose inputs are unchanged
+        unit_matches: Dict[tuple, List[Tuple[str, np.ndarray]]] = {}
+        fingerprints: Dict[tuple, str] = {}
+        store = UnitStateStore(self.state_dir) if self.state_dir is not None else None
+        if store is not None:
+            partitionFingerprints: Dict[tuple, str] = {}
+            for chr_number, gparent in units:
+                fingerprints[(chr_number, gparent)] = self._matches_fingerprint(chr_number, gparent, partitionFingerprints)
+                state = store.load(chr_number, gparent)
+                if state is not None and state.get("matches_fingerprint") == fingerprints[(chr_number, gparent)]:
+                    unit_matches[(chr_number, gparent)] = state["matches"]
+        pending = [unit for unit in units if unit not in unit_matches]
+
+        executor = None
+        futures = {}
+        if workers is not None and workers > 1 and len(pending) > 1:
+            executor = ProcessPoolExecutor(max_workers=min(workers, len(pending)), initializer=_init_match_worker,
+                                           initargs=(self, kit_ranks, siblingBits))
+            futures = {unit: executor.submit(_match_unit_in_worker, *unit) for unit in pending}
+        # each chromosome's edges are sorted once and shared by all overlaps
+        indexes: Dict[int, TriangGraphIndex] = {}
+        try:
+            for chr_number, gparent in units:
+                matches = unit_matches.pop((chr_number, gparent), None)
+                if matches is None:
+                    if executor is not None:
+                        matches = futures.pop((chr_number, gparent)).result()
+                    else:
+                        matches = self._match_unit(chr_number, gparent, kit_ranks, siblingBits, indexes)
+                    if store is not None:
+                        store.save(chr_number, gparent, {
+                            "overlaps_fingerprint": self._overlaps_fingerprint(chr_number, gparent),
+                            "overlaps": self.chromosome_models[chr_number].overlapsByGrandparent[gparent],
+                            "matches_fingerprint": fingerprints[(chr_number, gparent)],
+                            "matches": matches,
+                        })
+                edges: TriangTable = self.chromosome_models[chr_number].triang_graph.edges
+                for bestSiblingKit, rows in matches:
+                    for i in rows.tolist():
+                        yield TriangMatch(edges, i, gparent, bestSiblingKit)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    def _overlaps_fingerprint(self, chr_number: int, gparent: str) -> str:
+        """Fingerprint of a unit's overlap inputs: its grandparent segments and the sibling order."""
+        segments = self.chromosome_models[chr_number].segmentsByGrandparent.get(gparent, [])
+        return fingerprint(chr_number, gparent, [vars(segment) for segment in segments],
+                           [(kit, sibling.order) for kit, sibling in self.siblingsByKit.items()])
+
+    def _matches_fingerprint(self, chr_number: int, gparent: str, partitionFingerprints: Dict[tuple, str]) -> str:
+        """Fingerprint of a unit's matching inputs: its overlaps, the excluded cousins and every sibling's rows on the chromosome.
+
+        `partitionFingerprints` caches each chromosome's graph fingerprint across units.
+        """
+        if chr_number not in partitionFingerprints:
+            graph: TriangGraph = self.chromosome_models[chr_number].triang_graph
+            partitionFingerprints[chr_number] = fingerprint(
+                table_fingerprint(graph.edges), [(kit, fingerprint(rows)) for kit, rows in graph.edge_rows.items()])
+        excluded = sorted(cuz.kit for cuz in self.cousinByKit.values() if cuz.grandparent != gparent)
+        return fingerprint(self._overlaps_fingerprint(chr_number, gparent), excluded, partitionFingerprints[chr_number])
+
+    def _match_unit(self, chr_number: int, gparent: str, kit_ranks: np.ndarray, siblingBits: np.ndarray,
+                    indexes: Dict[int, TriangGraphIndex]) -> List[Tuple[str, np.ndarray]]:
+        """Match one grandparent's overlaps on one chromosome.
+
+        Returns (best sibling kit, matched edges of the chromosome's graph) per overlap with matches.
+        `siblingBits` gives every sibling kit id its own bit (KitRegistry.bits); `indexes` caches
+        a TriangGraphIndex per chromosome.
+        """
+        registry = self.kit_registry
+        chrome: ChromosomeModel = self.chromosome_models[chr_number]
+        overlaps = chrome.overlapsByGrandparent[gparent]
+        edges: TriangTable = chrome.triang_graph.edges
+
+        cousinKitsToExclude: Set[str] = set()
+        for cuz in self.cousinByKit.values():
+            if gparent == cuz.grandparent:
+                pass
+            else:
+                cousinKitsToExclude.add(cuz.kit)
+        excludedKits = registry.mask(cousinKitsToExclude)
+        siblingKits = siblingBits != 0
+
+        # rows inside each overlap, already in (Kit1, start, end) order, plus the overlap's sibling bitmasks
+        matchedOverlaps: List[Tuple[str, np.ndarray]] = []
+        kit1_parts: List[np.ndarray] = []
+        kit2_parts: List[np.ndarray] = []
+        requiredBits = []
+        allowedBits = []
+        overlap:SiblingOverlap
+        for overlap in overlaps:
+
+            bestSiblingKit:str = overlap.sibling_kits[0]
+            if bestSiblingKit not in self.siblingsByKit:
+                continue
+            bestSiblingId = registry.intern(bestSiblingKit)
+            overlapKitIds: Set[int] = set(registry.ids(overlap.sibling_kits))
+            if chr_number not in indexes:
+                indexes[chr_number] = TriangGraphIndex(chrome.triang_graph, kit_ranks)
+
+            rows = indexes[chr_number].contained(bestSiblingKit, overlap.B37_Start, overlap.B37_End)
+            matchedOverlaps.append((bestSiblingKit, rows))
+            kit1_parts.append(edges.Kit1_Number[rows])
+            kit2_parts.append(edges.Kit2_Number[rows])
+
+            # a group needs every other overlap sibling as a Kit2 and no sibling outside the overlap
+            otherIds = [kit_id for kit_id in overlapKitIds if kit_id != bestSiblingId]
+            allowedBits.append(np.bitwise_or.reduce(siblingBits[list(overlapKitIds)]))
+            if all(siblingKits[kit_id] for kit_id in otherIds):
+                requiredBits.append(np.bitwise_or.reduce(siblingBits[otherIds]) if otherIds else siblingBits.dtype.type(0))
+            else:
+                # an overlap kit that isn't a sibling can never appear among a group's sibling Kit2s
+                requiredBits.append(None)
+
+        if not matchedOverlaps:
             return []
-
-        add_group: bool = True
-
-        #Make sure the rows contain at least 1 row for each overlap sibling
-        for overlapSiblingKit in overlap.sibling_kits:
-            if overlapSiblingKit != bestSiblingKit and overlapSiblingKit not in triangGroup.siblingKitCountGroup.keys():
-                add_group = False
-
-        # make sure group does not contain any NON overlap siblings
-        for groupSiblingKit in triangGroup.siblingKitCountGroup.keys():
-            if groupSiblingKit not in overlap.sibling_kits:
-                add_group = False
-
-        # If any triang within the Kit1_Number group is one of the "Excluded Cousin Kits", then remove the entire group
-        if triangGroup.groupContainsExcludedCousin == True:
-            add_group = False
-
-        if triangGroup.kit_Number in cousinKitsToExclude:
-            add_group = False
-
-        if triangGroup.kit_Number in self.siblingsByKit.keys():
-            add_group = False
-
-        if add_group == True:
-            return list(triangGroup.triang_list)
-        return []
-
-    def match_chromosomes(self) -> List[Triang]:
-        filteredTriang: List[Triang] = []
-        for chr_number in self.chromosome_models.keys():
-            chrome: ChromosomeModel = self.chromosome_models[chr_number]
-            for gparent in self.grandparentsByName.keys():
-
-                if gparent in chrome.overlapsByGrandparent:
-                    overlaps = chrome.overlapsByGrandparent[gparent]
-
-                    cousinKitsToExclude: List[int] =[]
-                    for cuz in self.cousinByKit.values():
-                        if gparent == cuz.grandparent:
-                            pass
-                        else:
-                            cousinKitsToExclude.append(cuz.kit)
-
-
-                    overlap:SiblingOverlap
-                    for overlap in overlaps:
-
-                        bestSiblingKit:str = overlap.sibling_kits[0]
-                        if bestSiblingKit not in chrome.triangBySibling:
-                            continue
-                        chr_triang_list: List[Triang] = chrome.triangBySibling[bestSiblingKit]
-                        sorted_list: List[Triang] = sorted(chr_triang_list, key=lambda t: (t.Kit1_Number, t.B37_Start, t.B37_End))
-
-                        triangGroup = TriangGroup()
-                        t: Triang
-                        for t in sorted_list:
-                            if triangGroup.kit_Number != t.Kit1_Number:
-                                # Evaluate the completed group before starting a new one
-                                filteredTriang += self._evaluate_group(triangGroup, overlap, bestSiblingKit, cousinKitsToExclude)
-                                triangGroup.reset(t.Kit1_Number, t.Chr)
-
-                            if t.B37_Start >= overlap.B37_Start and t.B37_Start <= overlap.B37_End and t.B37_End <= overlap.B37_End:
-                                t_copy = copy.copy(t)
-                                t_copy.grandparent = gparent
-                                t_copy.source_sibling = bestSiblingKit
-                                triangGroup.triang_list.append(t_copy)
-
-                                # if kit2 is one of the siblings
-                                if t.Kit2_Number in self.siblingsByKit:
-                                    #if kit2 has not already been added to group
-                                    if t.Kit2_Number not in triangGroup.siblingKitCountGroup.keys():
-                                        triangGroup.siblingKitCountGroup[t.Kit2_Number] = 1
-                                    else:
-                                        triangGroup.siblingKitCountGroup[t.Kit2_Number] +=1
-                                if t.Kit2_Number in cousinKitsToExclude:
-                                    triangGroup.groupContainsExcludedCousin = True
-
-                        # Evaluate the final group (Bug 1 fix)
-                        filteredTriang += self._evaluate_group(triangGroup, overlap, bestSiblingKit, cousinKitsToExclude)
-        return filteredTriang
-
-
-    def get_triangulation(self, directory: str, enabled_chromosomes: set = None):
+        passes = self._filter_groups(kit1_parts, kit2_parts, requiredBits, allowedBits, siblingBits, excludedKits)
+
+        matches: List[Tuple[str, np.ndarray]] = []
+        for (bestSiblingKit, rows), rowPasses in zip(matchedOverlaps, passes):
+            if rowPasses.any():
+                matches.append((bestSiblingKit, rows[rowPasses]))
+        return matches
+
+    @staticmethod
+    def _filter_groups(kit1_parts: List[np.ndarray], kit2_parts: List[np.ndarray], requiredBits: list, allowedBits: list,
+                       siblingBits: np.ndarray, excludedKits: np.ndarray) -> List[np.ndarray]:
+        """Decide every Kit1 group of a unit's overlaps at once; returns a row mask per overlap.
+
+        A group is a run of rows with the same Kit1 within one overlap. It passes when its Kit2
+        sibling bits include the overlap's `requiredBits` and nothing outside its `allowedBits`,
+        no Kit2 is an excluded cousin, and Kit1 is neither an excluded cousin nor a sibling.
+        """
+        sizes = [len(part) for part in kit1_parts]
+        kit1 = np.concatenate(kit1_parts)
+        kit2 = np.concatenate(kit2_parts)
+        overlap_of_row = np.repeat(np.arange(len(sizes)), sizes)
+        if len(kit1) == 0:
+            return [np.zeros(0, dtype=bool) for _ in sizes]
+
+        new_group = np.ones(len(kit1), dtype=bool)
+        new_group[1:] = (kit1[1:] != kit1[:-1]) | (overlap_of_row[1:] != overlap_of_row[:-1])
+        group_starts = np.flatnonzero(new_group)
+        group_overlap = overlap_of_row[group_starts]
+        group_kit1 = kit1[group_starts]
+
+        group_siblings = np.bitwise_or.reduceat(siblingBits[kit2], group_starts)
+        group_has_excluded = np.logical_or.reduceat(excludedKits[kit2], group_starts)
+
+        satisfiable = np.array([bits is not None for bits in requiredBits])
+        zero = siblingBits.dtype.type(0)
+        required = np.array([zero if bits is None else bits for bits in requiredBits], dtype=siblingBits.dtype)[group_overlap]
+        allowed = np.array(allowedBits, dtype=siblingBits.dtype)[group_overlap]
+
+        group_passes = (satisfiable[group_overlap]
+                        & ((group_siblings & required) == required)
+                        & ((group_siblings & ~allowed) == zero)
+                        & ~group_has_excluded
+                        & ~excludedKits[group_kit1]
+                        & ~(siblingBits[group_kit1] != zero))
+        row_passes = np.repeat(group_passes, np.diff(np.append(group_starts, len(kit1))))
+        return np.split(row_passes, np.cumsum(sizes)[:-1])
+
+
+    def get_triangulation(self, directory: str, enabled_chromosomes: set = None, cache_dir: str = None, workers: int = 1,
+                          use_index: bool = False, row_filter: TriangFilter = None,
+                          min_parallel_bytes: int = PARALLEL_IMPORT_MIN_BYTES):
+        """Load every sibling's triangulation CSV, optionally in `workers` parallel processes.
+
+        The process pool is only used for two or more CSVs totalling at least
+        `min_parallel_bytes`; smaller inputs parse faster than the pool starts.
+
+        With `use_index`, only the byte ranges of the enabled chromosomes are
+        parsed, located through a ChromosomeOffsetIndex sidecar; with a cache
+        this applies on a miss, and the entry then holds those chromosomes only.
+        Rows rejected by `row_filter` (see matching_filter) are not loaded.
+
+        Worker processes parse into their own string pools and send back the
+        compact tables; the parent re-codes them into `string_pool` in sibling order.
+        CSVs already in `loaded_triangulations` are not read again; when it holds
+        every sibling's CSV and shares `string_pool`, triang_graph is built over
+        its edges, which stay shared (and memory-mapped, in a batch worker).
+        """
+        file_paths: Dict[str, str] = {}
         for sibling in self.siblingsByName.values():
-            file_path: str = os.path.join(directory, sibling.kit.strip() + ".csv")
-            importer: TriagImporter = TriagImporter()
-            triang_list = importer.createList(file_path, enabled_chromosomes)
-            self.triangulationBySiblingKit.setdefault(sibling.kit.strip(), triang_list)
+            file_paths.setdefault(sibling.kit.strip(), os.path.join(directory, sibling.kit.strip() + ".csv"))
+
+        loaded = self.loaded_triangulations
+        loadedRows: Dict[str, np.ndarray] = {}
+        if loaded is not None:
+            usable = np.ones(len(loaded), dtype=bool)
+            if enabled_chromosomes is not None:
+                usable &= np.isin(loaded.edges.Chr, list(enabled_chromosomes))
+            if row_filter is not None:
+                usable &= row_filter.mask(loaded.edges)
+            for kit, file_path in file_paths.items():
+                rows = loaded.edge_rows.get(os.path.abspath(file_path))
+                if rows is not None:
+                    loadedRows[kit] = rows[usable[rows]]
+        pending = {kit: file_path for kit, file_path in file_paths.items() if kit not in loadedRows}
+        if (loaded is not None and not pending and self.triang_graph is None and not self.triangulationBySiblingKit
+                and loaded.edges.strings is self.string_pool and loaded.edges.kits is self.kit_registry):
+            self.triang_graph = TriangGraph.from_edge_rows(loaded.edges, loadedRows)
+            return
+
+        tables: Dict[str, TriangTable] = {kit: loaded.edges.take(rows).rebind(self.string_pool, self.kit_registry)
+                                          for kit, rows in loadedRows.items()}
+        del loadedRows
+
+        pending_bytes = sum(os.path.getsize(file_path) for file_path in pending.values() if os.path.exists(file_path))
+        if workers is not None and workers > 1 and len(pending) > 1 and pending_bytes >= min_parallel_bytes:
+            with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+                futures = {kit: executor.submit(_load_triangulation, file_path, enabled_chromosomes, cache_dir, use_index,
+                                                row_filter=row_filter)
+                           for kit, file_path in pending.items()}
+                for kit, future in futures.items():
+                    tables[kit] = future.result().rebind(self.string_pool, self.kit_registry)
+        else:
+            for kit, file_path in pending.items():
+                tables[kit] = _load_triangulation(file_path, enabled_chromosomes, cache_dir, use_index,
+                                                  self.string_pool, self.kit_registry, row_filter)
+
+        for kit in file_paths:
+            self.triangulationBySiblingKit.setdefault(kit, tables[kit])
+        del tables
+        self.build_triang_graph()
+
+    def export_overlaps(self, directory: str, layout: str = "legacy", file_format: str = "csv", workers: int = 1):
+        """Write the sibling triangulations, overlaps and grandparent segments.
+
+        The default "legacy" layout keeps the per sibling, chromosome and grandparent
+        files. The "consolidated" layout writes each table once (`triangulations`,
+        `overlaps` and `segments`), with Chr/Grandparent/sibling_kit as partition columns.
+        `file_format` is csv, parquet or feather (the latter two need pyarrow);
+        `workers` > 1 writes the files on a thread pool.
+        """
+        if layout == "consolidated":
+            tables = self._consolidated_tables()
+        elif layout == "legacy":
+            tables = self._legacy_tables()
+        else:
+            raise ValueError(f"Unknown export layout {layout!r}, expected 'consolidated' or 'legacy'")
+        TableExporter(file_format, workers).write_all(directory, tables)
+
+    def _export_units(self):
+        """(chromosome, grandparent) pairs with overlaps, in export order."""
+        return [(chr_number, gparent) for chr_number, chrome in self.chromosome_models.items()
+                for gparent in self.grandparentsByName.keys() if gparent in chrome.overlapsByGrandparent]
 
-    def export_overlaps(self, directory: str):
+    def _consolidated_tables(self) -> Dict[str, Callable[[], Columns]]:
+        def triangulations() -> Columns:
+            columns: Columns = {"sibling_kit": []}
+            for sibling_kit in self.siblingsByKit.keys():
+                table = self.triang_table(sibling_kit)
+                columns["sibling_kit"] += [sibling_kit] * len(table)
+                for name, values in table.columns().items():
+                    if name in TRIANG_COLUMNS:
+                        columns.setdefault(name, []).extend(values.tolist())
+            return columns
+
+        def overlaps() -> Columns:
+            rows = [(o.Chr, o.Grandparent, o.B37_Start, o.B37_End, "|".join(o.sibling_kits))
+                    for chr_number, gparent in self._export_units()
+                    for o in self.chromosome_models[chr_number].overlapsByGrandparent[gparent]]
+            return _columns_from_rows(["Chr", "Grandparent", "B37_Start", "B37_End", "sibling_kits"], rows)
+
+        def segments() -> Columns:
+            rows = [tuple(vars(segment).values())
+                    for chr_number, gparent in self._export_units()
+                    for segment in self.chromosome_models[chr_number].segmentsByGrandparent[gparent]]
+            return _columns_from_rows([f.name for f in fields(GrandparentSegment)], rows)
+
+        return {"triangulations": triangulations, "overlaps": overlaps, "segments": segments}
+
+    def _legacy_tables(self) -> Dict[str, Callable[[], Columns]]:
+        tables: Dict[str, Callable[[], Columns]] = {}
         for sibling_kit in self.siblingsByKit.keys():
-                sibling_triangulation = self.triangulationBySiblingKit[sibling_kit]
-                df = pd.DataFrame([vars(o) for o in sibling_triangulation])
-                out_directory = directory + f"\\triangs-{sibling_kit}.csv"
-                df.to_csv(out_directory, index=False)
+            tables[f"triangs-{sibling_kit}"] = lambda kit=sibling_kit: _table_columns(self.triang_table(kit))
 
         all_overlaps = []
-        for chr_number in self.chromosome_models.keys():
+        for chr_number, gparent in self._export_units():
             chrome: ChromosomeModel = self.chromosome_models[chr_number]
-            for gparent in self.grandparentsByName.keys():
-
-                if gparent in chrome.overlapsByGrandparent:
-                    overlaps = chrome.overlapsByGrandparent[gparent]
-                    all_overlaps.extend(overlaps)
-                    df = pd.DataFrame([vars(o) for o in overlaps])
-                    # drop the 'segments' column
-                    df = df.drop('segments', axis=1)
-                    out_directory = directory + f"\\overlaps-{chr_number}-{gparent}.csv"
-                    df.to_csv(out_directory, index=False)
-
-                    segments = chrome.segmentsByGrandparent[gparent]
-                    df = pd.DataFrame([vars(o) for o in segments])
-                    out_directory = directory + f"\\segments-{chr_number}-{gparent}.csv"
-                    df.to_csv(out_directory, index=False)
+            overlaps = chrome.overlapsByGrandparent[gparent]
+            all_overlaps.extend(overlaps)
+            tables[f"overlaps-{chr_number}-{gparent}"] = lambda overlaps=overlaps: _model_columns(overlaps, exclude=("segments",))
+            tables[f"segments-{chr_number}-{gparent}"] = lambda segments=chrome.segmentsByGrandparent[gparent]: _model_columns(segments)
 
+        for chr_number, chrome in self.chromosome_models.items():
             for sibling_kit in self.siblingsByKit:
-                    triangs = chrome.triangBySibling[sibling_kit]
-                    df = pd.DataFrame([vars(o) for o in triangs])
-                    out_directory = directory + f"\\triangs-{chr_number}-{sibling_kit}.csv"
-                    df.to_csv(out_directory, index=False)
+                tables[f"triangs-{chr_number}-{sibling_kit}"] = \
+                    lambda graph=chrome.triang_graph, kit=sibling_kit: _table_columns(graph.sibling_table(kit))
 
-        df = pd.DataFrame([vars(o) for o in all_overlaps])
-        out_directory = directory + f"\\all_overlaps.csv"
-        df.to_csv(out_directory, index=False)
+        tables["all_overlaps"] = lambda: _model_columns(all_overlaps)
+        return tables
 
     def make_out_folder(self, directory: str):
         # Check if the directory already exists
@@ -206,47 +490,133 @@ class GrandMatch:
         else:
             print(f"Directory '{directory}' already exists.")
 
-    def export_triangs_to_csv(self, triangs: List[Triang], directory: str):
+    def export_triangs_to_csv(self, triangs: Iterable[Triang], directory: str):
 
         self.make_out_folder(directory)
-        df = pd.DataFrame([vars(triang) for triang in triangs])
-        df.to_csv(f'{directory}\\matched_triangulations.csv', index=False)
+        # rows are streamed to the file; TriangMatch rows are materialized one at a time
+        rows = (triang.to_triang() if isinstance(triang, TriangMatch) else triang for triang in triangs)
+        write_models_csv(os.path.join(directory, 'matched_triangulations.csv'), rows)
 
-    def export_chromosome_matches_to_csv(self, chromosome_matches: List[ChromosomeMatch], directory: str):
+    def export_chromosome_matches_to_csv(self, chromosome_matches: Iterable[ChromosomeMatch], directory: str):
         self.make_out_folder(directory)
-        df = pd.DataFrame([vars(c) for c in chromosome_matches])
-        df.to_csv(f'{directory}\\chromosome_matches.csv', index=False)
+        write_models_csv(os.path.join(directory, 'chromosome_matches.csv'), chromosome_matches)
     
-    def extract_kits(self, triangs: List[Triang], directory: str):
+    def extract_kits(self, triangs: Iterable[Triang], directory: str, matches_directory: str = None) -> List[ChromosomeMatch]:
         matchesByKit: Dict[(str, int, str), ChromosomeMatch] = {}
         sibling_sets: Dict[(str, int, str), set] = {}
+        cluster_sets: Dict[(str, int, str), set] = {}
+        # grandparents each cousin was matched to, by (cluster, kit)
+        clusterGrandparents: Dict[(int, str), set] = {}
+        clusters = self.cousin_clusters
+        if clusters is None and self.triang_graph is not None:
+            clusters = self.cluster_cousins()
         for t in triangs:
             key = (t.Kit1_Number, t.Chr, t.grandparent)
             if key not in matchesByKit:
                 platform = KIT_PLATFORM.get(t.Kit1_Number[0], 'Unknown')
                 matchesByKit[key] = ChromosomeMatch(name=t.Kit1_Name,kit=t.Kit1_Number, grandparent=t.grandparent, chr=t.Chr, platform=platform)
                 sibling_sets[key] = set()
+                cluster_sets[key] = set()
             sibling_name = self.siblingsByKit[t.source_sibling].name if t.source_sibling in self.siblingsByKit else t.source_sibling
             sibling_sets[key].add(sibling_name)
+            if clusters is not None:
+                for cluster in clusters.clusters_of(t.Chr, t.Kit1_Number, t.B37_Start, t.B37_End):
+                    cluster_sets[key].add(cluster)
+                    clusterGrandparents.setdefault((cluster, t.Kit1_Number), set()).add(t.grandparent)
         for key, match in matchesByKit.items():
             match.siblings = "|".join(sorted(sibling_sets[key]))
+            match.clusters = "|".join(str(cluster) for cluster in sorted(cluster_sets[key]))
 
         self.export_chromosome_matches_to_csv(matchesByKit.values(), directory)
+        if clusters is not None:
+            write_models_csv(os.path.join(directory, 'cousin_clusters.csv'), self.cluster_members(clusterGrandparents))
 
-        gedmatch_importer = GedMatchSegmentImporter()
-        segment_list: List[GedMatchSegment] = gedmatch_importer.importCsv(directory=os.getcwd() + "\\inputfiles\\gedmatch\\matches")
+        if matches_directory is None:
+            matches_directory = os.getcwd() + "\\inputfiles\\gedmatch\\matches"
+        segment_index: GedMatchSegmentIndex = self.segment_index
+        if segment_index is None:
+            gedmatch_importer = GedMatchSegmentImporter(kit_registry=self.kit_registry)
+            segment_index = gedmatch_importer.importIndex(matches_directory, kits={key[0] for key in matchesByKit})
 
         other_matches: Dict[tuple, SiblingMatch] = {}
         for kit_chr in matchesByKit.keys():
             match = matchesByKit[kit_chr]
-            for s in segment_list:
-                if kit_chr[0] == s.matched_kit:
-                    key = (s.matched_kit, s.chromosome, match.grandparent)
-                    if key not in other_matches:
-                        sibling_name = self.siblingsByKit[s.primary_kit].name if s.primary_kit in self.siblingsByKit else s.primary_kit
-                        sibling_match = SiblingMatch(chr=s.chromosome, cousin_kit=s.matched_kit, cousin_name=s.matched_name, grandparent=match.grandparent, sibling_kit=s.primary_kit, sibling_name=sibling_name)
-                        other_matches[key] = sibling_match
-
-        df = pd.DataFrame([vars(c) for c in other_matches.values()])
-        df.to_csv(directory + f'\\other_matches.csv', index=False)
-            
\ No newline at end of file
+            # the first segment on each chromosome decides which sibling is reported
+            for segments in segment_index.by_chromosome(self.kit_registry.intern(kit_chr[0])).values():
+                s = segments[0]
+                key = (s.matched_kit, s.chromosome, match.grandparent)
+                if key not in other_matches:
+                    sibling_name = self.siblingsByKit[s.primary_kit].name if s.primary_kit in self.siblingsByKit else s.primary_kit
+                    sibling_match = SiblingMatch(chr=s.chromosome, cousin_kit=s.matched_kit, cousin_name=s.matched_name, grandparent=match.grandparent, sibling_kit=s.primary_kit, sibling_name=sibling_name)
+                    other_matches[key] = sibling_match
+
+        write_models_csv(os.path.join(directory, 'other_matches.csv'), other_matches.values())
+        return list(matchesByKit.values())
+
+    def cluster_members(self, clusterGrandparents: Dict[Tuple[int, str], set]) -> List[ClusterMember]:
+        """Every region of the clusters holding a matched cousin, ordered by cluster, start and kit.
+
+        `clusterGrandparents` holds the grandparents of the matched cousins by (cluster, kit);
+        the other members are kits linking them, without grandparents.
+        """
+        clusters = self.cousin_clusters
+        regions = np.flatnonzero(np.isin(clusters.cluster, [cluster for cluster, _ in clusterGrandparents]))
+        kit_ranks = self.kit_registry.sort_ranks()
+        regions = regions[np.lexsort((kit_ranks[clusters.Kit[regions]], clusters.B37_Start[regions], clusters.cluster[regions]))]
+
+        # a name for every kit, as a sibling's triangulation file spells it
+        names = np.full(len(self.kit_registry), "", dtype=object)
+        edges = self.triang_graph.edges
+        for sibling_kit in self.siblingsByKit.keys():
+            rows = self.triang_graph.edge_rows.get(sibling_kit, np.empty(0, dtype=np.int32))
+            names[edges.Kit2_Number[rows]] = self.string_pool.decode(edges.Kit2_Name[rows])
+            names[edges.Kit1_Number[rows]] = self.string_pool.decode(edges.Kit1_Name[rows])
+
+        members = []
+        kits = self.kit_registry.values
+        for region in regions.tolist():
+            cluster, kit = int(clusters.cluster[region]), kits[clusters.Kit[region]]
+            members.append(ClusterMember(cluster=cluster, chr=int(clusters.Chr[region]),
+                                         B37_Start=int(clusters.B37_Start[region]), B37_End=int(clusters.B37_End[region]),
+                                         kit=kit, name=names[clusters.Kit[region]],
+                                         grandparents="|".join(sorted(clusterGrandparents.get((cluster, kit), ())))))
+        return members
+
+
+def _load_triangulation(file_path: str, enabled_chromosomes: set = None, cache_dir: str = None,
+                        use_index: bool = False, strings: StringPool = None, kits: KitRegistry = None,
+                        row_filter: TriangFilter = None) -> TriangTable:
+    """Parse one sibling's triangulation CSV, going through the on-disk cache when `cache_dir` is set."""
+    if cache_dir is None:
+        importer: TriagImporter = TriagImporter(use_index=use_index, row_filter=row_filter)
+        return importer.createTable(file_path, enabled_chromosomes, strings, kits)
+
+    # the cache holds the unfiltered rows so it stays valid when the filter changes; with use_index a miss
+    # parses and caches only the enabled chromosomes, otherwise the whole file so other chromosome sets hit too
+    cache = TriangCache(cache_dir)
+    triang_table = cache.load(file_path, enabled_chromosomes, row_filter)
+    if triang_table is None:
+        parsed_chromosomes = enabled_chromosomes if use_index else None
+        triang_table = TriagImporter(use_index=use_index).createTable(file_path, parsed_chromosomes)
+        cache.store(file_path, triang_table, chromosomes=parsed_chromosomes)
+        if enabled_chromosomes is not None:
+            triang_table = triang_table.select_chromosomes(enabled_chromosomes)
+        if row_filter is not None:
+            triang_table = row_filter.apply(triang_table)
+    if strings is not None and kits is not None:
+        triang_table = triang_table.rebind(strings, kits)
+    return triang_table
+
+
+# State of a match_chromosomes() worker process, set once per process by _init_match_worker
+_match_worker_state: tuple = None
+
+
+def _init_match_worker(grand_match: GrandMatch, kit_ranks: np.ndarray, siblingBits: np.ndarray):
+    global _match_worker_state
+    _match_worker_state = (grand_match, kit_ranks, siblingBits, {})
+
+
+def _match_unit_in_worker(chr_number: int, gparent: str) -> List[Tuple[str, np.ndarray]]:
+    grand_match, kit_ranks, siblingBits, indexes = _match_worker_state
+    return grand_match._match_unit(chr_number, gparent, kit_ranks, siblingBits, indexes)
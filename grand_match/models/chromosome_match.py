@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 
+from grand_match.models.compact_model import compact_variant
+
 
 @dataclass
 class ChromosomeMatch:
@@ -8,4 +10,8 @@ class ChromosomeMatch:
     grandparent: str
     chr: int
     platform: str = ""
-    siblings: str = ""
\ No newline at end of file
+    siblings: str = ""
+    clusters: str = ""
+
+
+CompactChromosomeMatch = compact_variant(ChromosomeMatch)
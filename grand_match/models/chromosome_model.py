@@ -1,7 +1,7 @@
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Dict, List
 
-from grand_match import GrandparentSegment, SiblingOverlap, Triang
+from grand_match import GrandparentSegment, SiblingOverlap, TriangGraph
 
 if TYPE_CHECKING:
     from grand_match import GrandMatch
@@ -12,7 +12,8 @@ class ChromosomeModel:
     chr: int
     segmentsByGrandparent: Dict[str, List[GrandparentSegment]] = field(default_factory=dict)
     overlapsByGrandparent: Dict[str, List[SiblingOverlap]] = field(default_factory=dict)
-    triangBySibling: Dict[str, List[Triang]] = field(default_factory=dict)
+    # this chromosome's part of GrandMatch.triang_graph, holding every sibling's rows on it
+    triang_graph: TriangGraph = None
 
     def __post_init__(self):
         pass
\ No newline at end of file
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class ClusterMember:
+    cluster: int
+    chr: int
+    B37_Start: int
+    B37_End: int
+    kit: str
+    name: str
+    grandparents: str = ""
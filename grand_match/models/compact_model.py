@@ -0,0 +1,21 @@
+import dataclasses
+
+
+def compact_variant(model: type) -> type:
+    """A `__slots__` copy of a model dataclass, named `Compact{model}`, for holding many instances.
+
+    It has the same fields, defaults and attribute API, but no per-instance
+    `__dict__`, so `vars()` doesn't work on it; `dataclasses.fields()` and
+    `asdict()` work on both. Assign it to a module-level name in the model's
+    module so its instances pickle.
+    """
+    specs = []
+    for f in dataclasses.fields(model):
+        spec = dataclasses.field(default=f.default, default_factory=f.default_factory, repr=f.repr, compare=f.compare)
+        specs.append((f.name, f.type, spec))
+    name = f"Compact{model.__name__}"
+    variant = dataclasses.make_dataclass(name, specs, slots=True)
+    variant.__module__ = model.__module__
+    variant.__qualname__ = name
+    variant.__doc__ = f"{model.__name__} with __slots__ instead of a per-instance __dict__."
+    return variant
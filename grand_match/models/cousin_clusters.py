@@ -0,0 +1,116 @@
+from dataclasses import dataclass
+from typing import Iterable, List
+
+import numpy as np
+
+from grand_match import KitRegistry, TriangGraph
+
+
+@dataclass
+class CousinClusters:
+    """Kits that triangulate with each other in the same region, grouped into clusters.
+
+    On each chromosome, a kit's graph edges to other non-sibling kits whose
+    segments overlap make up one region of that kit. An edge joins the regions
+    of its two kits, and every connected group of regions is a cluster. Regions
+    are ordered by chromosome, kit id and start; cluster ids count from 1 in
+    order of the chromosome, start and kit number of each cluster's first region.
+    """
+    kits: KitRegistry
+    Chr: np.ndarray
+    Kit: np.ndarray
+    B37_Start: np.ndarray
+    B37_End: np.ndarray
+    cluster: np.ndarray
+    # Chr * kit_count + Kit of every region, for looking up a kit's regions
+    keys: np.ndarray
+    kit_count: int
+
+    @classmethod
+    def build(cls, graph: TriangGraph, exclude_kits: Iterable[str] = ()) -> "CousinClusters":
+        """Cluster the graph's reported edges, leaving out edges of the excluded (sibling) kits."""
+        table = graph.edges
+        excluded = table.kits.mask(exclude_kits)
+        kit_count = len(table.kits)
+        kit1, kit2 = table.Kit1_Number, table.Kit2_Number
+        edges = np.flatnonzero(~excluded[kit1] & ~excluded[kit2] & (kit1 != kit2) & (graph.reporters != 0))
+
+        # both ends of every edge, grouped by (chromosome, kit) and sorted by start within a group
+        chr = np.tile(table.Chr[edges].astype(np.int64), 2)
+        kit = np.concatenate([kit1[edges], kit2[edges]]).astype(np.int64)
+        start = np.tile(table.B37_Start[edges], 2)
+        end = np.tile(table.B37_End[edges], 2)
+        keys = chr * kit_count + kit
+        order = np.lexsort((start, keys))
+        keys, start, end = keys[order], start[order], end[order]
+
+        # a new region starts with each group and wherever a segment starts after the group's segments so far end
+        new_group = np.ones(len(keys), dtype=bool)
+        new_group[1:] = keys[1:] != keys[:-1]
+        # positions shifted into a band per group, so one running maximum doesn't carry over between groups
+        low_end = int(end.min()) if len(end) else 0
+        band = (np.cumsum(new_group) - 1) * (int(end.max()) - low_end + 1 if len(end) else 1)
+        reach = np.maximum.accumulate(band + end - low_end)
+        new_region = new_group.copy()
+        new_region[1:] |= band[1:] + start[1:] - low_end > reach[:-1]
+
+        region_of_end = np.empty(len(order), dtype=np.int64)
+        region_of_end[order] = np.cumsum(new_region) - 1
+        first = np.flatnonzero(new_region)
+        region_keys = keys[first]
+        component = _connected_components(len(first), region_of_end[:len(edges)], region_of_end[len(edges):])
+
+        Chr, Kit = region_keys // kit_count, region_keys % kit_count
+        B37_Start = start[first]
+        B37_End = np.maximum.reduceat(end, first) if len(first) else end[:0]
+
+        # number the clusters by their first region in (chromosome, start, kit number) order
+        by_position = np.lexsort((table.kits.sort_ranks()[Kit], B37_Start, Chr))
+        first_position = np.full(len(first), len(first), dtype=np.int64)
+        np.minimum.at(first_position, component[by_position], np.arange(len(first)))
+        roots = np.flatnonzero(first_position < len(first))
+        cluster_of_root = np.zeros(len(first), dtype=np.int64)
+        cluster_of_root[roots[np.argsort(first_position[roots])]] = np.arange(1, len(roots) + 1)
+        return cls(table.kits, Chr, Kit, B37_Start, B37_End, cluster_of_root[component], region_keys, kit_count)
+
+    def __len__(self) -> int:
+        return len(self.Chr)
+
+    def cluster_count(self) -> int:
+        return int(self.cluster.max()) if len(self.cluster) else 0
+
+    def clusters_of(self, chr: int, kit: str, start: int, end: int) -> List[int]:
+        """Ids of the clusters in which `kit` has a region on `chr` overlapping [start, end]."""
+        kit_id = self.kits.codes.get(kit)
+        if kit_id is None or kit_id >= self.kit_count:
+            return []
+        key = chr * self.kit_count + kit_id
+        low = np.searchsorted(self.keys, key, side='left')
+        high = np.searchsorted(self.keys, key, side='right')
+        # a kit's regions on a chromosome don't overlap, so their ends are sorted like their starts
+        first = low + np.searchsorted(self.B37_End[low:high], start, side='left')
+        last = low + np.searchsorted(self.B37_Start[low:high], end, side='right')
+        return sorted(set(self.cluster[first:last].tolist()))
+
+
+def _connected_components(count: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Union-find over `count` nodes joined by the edges (a[i], b[i]), labelling each node with its component's
+    smallest node.
+
+    Each round hooks the larger root of every edge whose ends are still apart to the
+    smallest root it is joined to, then compresses the paths until every node
+    points at its root; edges inside one component are dropped between rounds.
+    """
+    parent = np.arange(count)
+    while True:
+        root_a, root_b = parent[a], parent[b]
+        apart = root_a != root_b
+        if not apart.any():
+            return parent
+        a, b, root_a, root_b = a[apart], b[apart], root_a[apart], root_b[apart]
+        np.minimum.at(parent, np.maximum(root_a, root_b), np.minimum(root_a, root_b))
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
@@ -1,15 +1,22 @@
 from dataclasses import dataclass
 
+from grand_match.models.compact_model import compact_variant
+
 
 @dataclass
 class GedMatchSegment:
     primary_kit: str
     matched_kit: str
     chromosome: int
-    b37_start: str
-    b37_end: str
-    segment_cm: str
-    snps: str
+    b37_start: int
+    b37_end: int
+    segment_cm: float
+    snps: int
     matched_name: str
     matched_sex: str
-    matched_email: str
\ No newline at end of file
+    matched_email: str
+    primary_kit_id: int = -1
+    matched_kit_id: int = -1
+
+
+CompactGedMatchSegment = compact_variant(GedMatchSegment)
@@ -0,0 +1,25 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List
+
+from grand_match import GedMatchSegment
+
+
+@dataclass
+class GedMatchSegmentIndex:
+    """GEDmatch segments grouped by matched kit id, then by chromosome, in file order."""
+    segmentsByKit: Dict[int, Dict[int, List[GedMatchSegment]]] = field(default_factory=dict)
+
+    def add(self, segment: GedMatchSegment):
+        self.segmentsByKit.setdefault(segment.matched_kit_id, {}).setdefault(segment.chromosome, []).append(segment)
+
+    def by_chromosome(self, matched_kit_id: int) -> Dict[int, List[GedMatchSegment]]:
+        """Segments for one matched kit keyed by chromosome, in order of each chromosome's first appearance."""
+        return self.segmentsByKit.get(matched_kit_id, {})
+
+    def __len__(self) -> int:
+        return sum(len(segments) for by_chr in self.segmentsByKit.values() for segments in by_chr.values())
+
+    def __iter__(self) -> Iterator[GedMatchSegment]:
+        for by_chr in self.segmentsByKit.values():
+            for segments in by_chr.values():
+                yield from segments
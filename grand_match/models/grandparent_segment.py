@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 
+from grand_match.models.compact_model import compact_variant
+
 
 @dataclass
 class GrandparentSegment:
@@ -9,3 +11,6 @@ class GrandparentSegment:
     Grandparent: str  
     B37_Start: int
     B37_End: int
+
+
+CompactGrandparentSegment = compact_variant(GrandparentSegment)
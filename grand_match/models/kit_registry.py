@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+from typing import Iterable, List
+
+import numpy as np
+
+from grand_match import StringPool
+
+
+@dataclass
+class KitRegistry(StringPool):
+    """Interns kit numbers to dense integer ids shared by the importers, models and matching code."""
+
+    def ids(self, kits: Iterable[str]) -> List[int]:
+        return [self.intern(kit) for kit in kits]
+
+    def mask(self, kits: Iterable[str]) -> np.ndarray:
+        """Boolean array indexed by kit id that is True for the given kits."""
+        ids = self.ids(kits)
+        mask = np.zeros(len(self), dtype=bool)
+        mask[ids] = True
+        return mask
+
+
+    def bits(self, kits: Iterable[str]) -> np.ndarray:
+        """Array indexed by kit id holding a distinct bit (1 << n) for the n-th given kit and 0 for every other kit.
+
+        The bits are uint64 for up to 64 kits and Python ints beyond that.
+        """
+        ids = self.ids(kits)
+        bits = np.zeros(len(self), dtype=np.uint64 if len(ids) <= 64 else object)
+        for n, kit_id in enumerate(ids):
+            bits[kit_id] = 1 << n
+        return bits
@@ -1,6 +0,0 @@
-from enum import Enum
-
-
-class MilestoneType(Enum):
-    START = 1
-    END = 2
\ No newline at end of file
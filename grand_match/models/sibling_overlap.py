@@ -2,6 +2,7 @@ from dataclasses import dataclass, field
 from typing import List
 
 from grand_match import GrandparentSegment
+from grand_match.models.compact_model import compact_variant
 
 
 @dataclass
@@ -11,4 +12,7 @@ class SiblingOverlap:
     B37_Start: int
     B37_End: int
     sibling_kits: List[str] = field(default_factory=list)
-    segments: List[GrandparentSegment] = field(default_factory=list)
\ No newline at end of file
+    segments: List[GrandparentSegment] = field(default_factory=list)
+
+
+CompactSiblingOverlap = compact_variant(SiblingOverlap)
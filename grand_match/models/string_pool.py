@@ -0,0 +1,43 @@
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+
+
+@dataclass
+class StringPool:
+    """Interns strings to dense integer codes so columns can be stored as int arrays."""
+    values: List[str] = field(default_factory=list)
+    codes: Dict[str, int] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        if len(self.codes) != len(self.values):
+            self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def intern(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def lookup(self, code: int) -> str:
+        return self.values[code]
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Turn an array of codes back into an object array of strings."""
+        return np.array(self.values, dtype=object)[codes] if len(codes) else np.array([], dtype=object)
+
+    def remap_from(self, other: "StringPool") -> np.ndarray:
+        """Return an array mapping every code of `other` to the matching code in this pool."""
+        return np.array([self.intern(value) for value in other.values], dtype=np.int32)
+
+    def sort_ranks(self) -> np.ndarray:
+        """Rank of every code when the pool's strings are sorted, so codes can be sorted like strings."""
+        ranks = np.empty(len(self.values), dtype=np.int32)
+        ranks[np.argsort(np.array(self.values, dtype=object), kind="stable")] = np.arange(len(self.values), dtype=np.int32)
+        return ranks
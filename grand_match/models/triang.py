@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 
+from grand_match.models.compact_model import compact_variant
+
 
 @dataclass
 class Triang:
@@ -14,4 +16,7 @@ class Triang:
     B37_End: int
     cM: str
     grandparent: str = "Unknown"
-    source_sibling: str = "Unknown"
\ No newline at end of file
+    source_sibling: str = "Unknown"
+
+
+CompactTriang = compact_variant(Triang)
@@ -0,0 +1,211 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from grand_match import KitRegistry, StringPool, TriangTable
+from grand_match.models.triang_table import TRIANG_COLUMNS
+
+# What makes two rows the same edge, in the order edges are sorted by
+EDGE_COLUMNS = ["Chr", "B37_Start", "Kit1_Number", "Kit2_Number", "B37_End", "cM", "cM_Text",
+                "Kit1_Name", "Kit1_Email", "Kit2_Name", "Kit2_Email"]
+
+
+@dataclass
+class TriangGraph:
+    """Every sibling's triangulation rows, deduplicated across the sibling files: the stored form of the triangulations.
+
+    Kits are the nodes and each distinct row is an edge, kept once in `edges`
+    (ordered by chromosome and start). `reporters` holds a bit per sibling file
+    that reported the edge, the n-th bit for the n-th sibling of `edge_rows`,
+    and `edge_rows` maps each sibling's rows, in file order, to their edges.
+    """
+    edges: TriangTable
+    reporters: np.ndarray
+    edge_rows: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, tables: Dict[str, TriangTable], strings: StringPool = None, kits: KitRegistry = None) -> "TriangGraph":
+        """Deduplicate the siblings' tables, which must share one string pool and kit registry (`strings` and `kits`
+        when given).
+
+        The tables are only referenced until their rows are copied, so a caller handing over its last reference
+        doesn't hold both at once.
+        """
+        first = next(iter(tables.values()), None)
+        strings = strings if strings is not None else first.strings if first is not None else StringPool()
+        kits = kits if kits is not None else first.kits if first is not None else KitRegistry()
+        empty = TriangTable(strings, kits)
+        siblings, sizes = list(tables), [len(table) for table in tables.values()]
+        columns = {name: np.concatenate([getattr(empty, name)] + [getattr(table, name) for table in tables.values()])
+                   for name in TRIANG_COLUMNS}
+        del tables, first
+
+        order, new_edge = _grouping_order(columns)
+        edge_of_row = np.empty(len(order), dtype=np.int32)
+        edge_of_row[order] = np.cumsum(new_edge, dtype=np.int32) - 1
+        first_rows = order[new_edge]
+        del order, new_edge
+
+        edges = {name: columns.pop(name)[first_rows] for name in TRIANG_COLUMNS}
+        for name in ("B37_Start", "B37_End"):
+            edges[name] = _narrowed(edges[name])
+        edges = TriangTable(strings, kits, **edges)
+        return cls.from_edge_rows(edges, dict(zip(siblings, np.split(edge_of_row, np.cumsum(sizes)[:-1]))))
+
+    @classmethod
+    def from_edge_rows(cls, edges: TriangTable, edge_rows: Dict[str, np.ndarray]) -> "TriangGraph":
+        """A graph over existing edges (such as a larger graph's) holding the given siblings' rows.
+
+        Edges none of them reported are kept with no reporter bits set.
+        """
+        return cls(edges, _reporters(len(edges), edge_rows), edge_rows)
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+    def row_count(self) -> int:
+        """How many rows the sibling files hold together, counting every copy of an edge."""
+        return sum(len(rows) for rows in self.edge_rows.values())
+
+    def reporter_bit(self, sibling_kit: str):
+        """The sibling's bit in `reporters`, 0 when it reported no rows."""
+        siblings = list(self.edge_rows)
+        return self.reporters.dtype.type(1 << siblings.index(sibling_kit) if sibling_kit in siblings else 0)
+
+    def sibling_table(self, sibling_kit: str) -> TriangTable:
+        """The sibling's rows in file order (a copy gathered from the edges)."""
+        return self.edges.take(self.edge_rows.get(sibling_kit, np.empty(0, dtype=np.int32)))
+
+    def partition_by_chromosome(self, chromosomes: Iterable[int]) -> Dict[int, "TriangGraph"]:
+        """One graph per given chromosome (empty when it has no rows), whose edges are views of this graph's.
+
+        A part's `edge_rows` hold each sibling's rows on that chromosome, in file order.
+        """
+        chromosomes = list(chromosomes)
+        lows = np.searchsorted(self.edges.Chr, chromosomes, side='left').tolist()
+        highs = np.searchsorted(self.edges.Chr, chromosomes, side='right').tolist()
+
+        # each sibling's rows grouped by chromosome, still in file order within a chromosome
+        rowsBySibling = {}
+        for sibling_kit, rows in self.edge_rows.items():
+            row_chr = self.edges.Chr[rows]
+            by_chr = np.argsort(row_chr, kind='stable')
+            sorted_chr = row_chr[by_chr]
+            rowsBySibling[sibling_kit] = (rows[by_chr], np.searchsorted(sorted_chr, chromosomes, side='left').tolist(),
+                                          np.searchsorted(sorted_chr, chromosomes, side='right').tolist())
+
+        parts = {}
+        for i, chr_number in enumerate(chromosomes):
+            low, high = lows[i], highs[i]
+            edge_rows = {sibling_kit: rows[row_lows[i]:row_highs[i]] - low
+                         for sibling_kit, (rows, row_lows, row_highs) in rowsBySibling.items()}
+            parts[chr_number] = TriangGraph(self.edges.take(slice(low, high)), self.reporters[low:high], edge_rows)
+        return parts
+
+
+def _narrowed(positions: np.ndarray) -> np.ndarray:
+    if len(positions) == 0 or (positions.min() >= np.iinfo(np.int32).min and positions.max() <= np.iinfo(np.int32).max):
+        return positions.astype(np.int32)
+    return positions
+
+
+def _reporters(edge_count: int, edge_rows: Dict[str, np.ndarray]) -> np.ndarray:
+    """A bit per sibling for every edge its rows map to, in the smallest unsigned type that fits (Python ints beyond 64)."""
+    dtype = np.min_scalar_type((1 << len(edge_rows)) - 1) if edge_rows else np.dtype(np.uint8)
+    reporters = np.zeros(edge_count, dtype=dtype)
+    for n, rows in enumerate(edge_rows.values()):
+        reporters[rows] |= dtype.type(1 << n)
+    return reporters
+
+
+def _row_hashes(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    hashes = np.zeros(len(columns["Chr"]), dtype=np.uint64)
+    for name in EDGE_COLUMNS:
+        values = columns[name].view(np.uint64) if name == "cM" else columns[name].astype(np.uint64)
+        hashes ^= values
+        hashes *= np.uint64(0x100000001b3)
+        hashes ^= hashes >> np.uint64(29)
+    return hashes
+
+
+def _run_starts(columns: Dict[str, np.ndarray], order: np.ndarray) -> np.ndarray:
+    """Mask of the rows in `order` that differ from the row before them."""
+    new_edge = np.zeros(len(order), dtype=bool)
+    new_edge[:1] = True
+    for name in EDGE_COLUMNS:
+        values = columns[name][order]
+        new_edge[1:] |= values[1:] != values[:-1]
+    return new_edge
+
+
+def _grouping_order(columns: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """A stable order of the rows by (Chr, B37_Start) in which equal rows are adjacent, and where each run starts.
+
+    Sorts one key per row, the chromosome and start followed by hash bits of the
+    rest; when the positions don't fit or two different rows share a key, the
+    columns themselves are sorted.
+    """
+    chr, start = columns["Chr"], columns["B37_Start"]
+    if len(chr) and chr.min() >= 0 and chr.max() < 1 << 5 and start.min() >= 0 and start.max() < 1 << 28:
+        keys = ((chr.astype(np.uint64) << np.uint64(59)) | (start.astype(np.uint64) << np.uint64(31))
+                | (_row_hashes(columns) >> np.uint64(33)))
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        new_edge = np.ones(len(order), dtype=bool)
+        new_edge[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        # only rows with the key of the row before them need comparing
+        same = np.flatnonzero(~new_edge)
+        if all(np.array_equal(columns[name][order[same]], columns[name][order[same - 1]]) for name in EDGE_COLUMNS):
+            return order, new_edge
+    order = np.lexsort([columns[name] for name in reversed(EDGE_COLUMNS)])
+    return order, _run_starts(columns, order)
+
+
+@dataclass
+class TriangGraphIndex:
+    """Finds the edges a sibling reported inside an overlap through one chromosome's start-sorted edges.
+
+    Built once per chromosome and shared by the siblings. `kit_ranks` maps each kit id to its rank in
+    kit-number order (see StringPool.sort_ranks).
+    """
+    graph: TriangGraph
+    kit_ranks: np.ndarray
+    # per sibling kit: the first row of each edge in its file (-1 when not in its file), and any further rows
+    rowsByEdge: Dict[str, tuple] = field(default_factory=dict)
+
+    def contained(self, sibling_kit: str, start: int, end: int) -> np.ndarray:
+        """Edges the sibling reported with start in [start, end] and end <= end, ordered by (Kit1, B37_Start, B37_End)
+        and then file row; an edge in its file more than once is repeated."""
+        graph, edges = self.graph, self.graph.edges
+        low = np.searchsorted(edges.B37_Start, start, side='left')
+        high = np.searchsorted(edges.B37_Start, end, side='right')
+        reported = (graph.reporters[low:high] & graph.reporter_bit(sibling_kit)) != 0
+        found = np.arange(low, high)[reported & (edges.B37_End[low:high] <= end)]
+        if len(found) == 0:
+            return found
+
+        if sibling_kit not in self.rowsByEdge:
+            self.rowsByEdge[sibling_kit] = self._rows_by_edge(graph.edge_rows[sibling_kit])
+        row_of_edge, further_rows = self.rowsByEdge[sibling_kit]
+        rows = row_of_edge[found]
+        if further_rows:
+            more = [(edge, row) for edge in found.tolist() for row in further_rows.get(edge, [])]
+            if more:
+                found = np.append(found, [edge for edge, _ in more])
+                rows = np.append(rows, [row for _, row in more])
+        return found[np.lexsort((rows, edges.B37_End[found], edges.B37_Start[found], self.kit_ranks[edges.Kit1_Number[found]]))]
+
+    def _rows_by_edge(self, edge_rows: np.ndarray) -> tuple:
+        rows = np.arange(len(edge_rows))
+        row_of_edge = np.full(len(self.graph), -1, dtype=np.int32 if len(edge_rows) < 2 ** 31 else np.int64)
+        row_of_edge[edge_rows] = rows
+        further_rows: Dict[int, List[int]] = {}
+        if not np.array_equal(row_of_edge[edge_rows], rows):
+            # an edge in the file more than once: keep its first row, list the others
+            row_of_edge[edge_rows] = len(edge_rows)
+            np.minimum.at(row_of_edge, edge_rows, rows)
+            further = row_of_edge[edge_rows] != rows
+            for row, edge in zip(rows[further].tolist(), edge_rows[further].tolist()):
+                further_rows.setdefault(edge, []).append(row)
+        return row_of_edge, further_rows
@@ -0,0 +1,74 @@
+from grand_match import Triang, TriangTable
+
+
+class TriangMatch:
+    """A matched triangulation: a row of a sibling's TriangTable plus the grandparent and source sibling it matched for.
+
+    Reads like a `Triang` without copying the row; `to_triang()` builds the full
+    object when it is written out.
+    """
+    __slots__ = ("table", "row", "grandparent", "source_sibling")
+
+    def __init__(self, table: TriangTable, row: int, grandparent: str, source_sibling: str):
+        self.table = table
+        self.row = row
+        self.grandparent = grandparent
+        self.source_sibling = source_sibling
+
+    @property
+    def Chr(self) -> int:
+        return int(self.table.Chr[self.row])
+
+    @property
+    def Kit1_Number(self) -> str:
+        return self.table.kits.values[self.table.Kit1_Number[self.row]]
+
+    @property
+    def Kit1_Name(self) -> str:
+        return self.table.strings.values[self.table.Kit1_Name[self.row]]
+
+    @property
+    def Kit1_Email(self) -> str:
+        return self.table.strings.values[self.table.Kit1_Email[self.row]]
+
+    @property
+    def Kit2_Number(self) -> str:
+        return self.table.kits.values[self.table.Kit2_Number[self.row]]
+
+    @property
+    def Kit2_Name(self) -> str:
+        return self.table.strings.values[self.table.Kit2_Name[self.row]]
+
+    @property
+    def Kit2_Email(self) -> str:
+        return self.table.strings.values[self.table.Kit2_Email[self.row]]
+
+    @property
+    def B37_Start(self) -> int:
+        return int(self.table.B37_Start[self.row])
+
+    @property
+    def B37_End(self) -> int:
+        return int(self.table.B37_End[self.row])
+
+    @property
+    def cM(self) -> str:
+        return self.table.strings.values[self.table.cM_Text[self.row]]
+
+    def to_triang(self) -> Triang:
+        triang = self.table.row(self.row)
+        triang.grandparent = self.grandparent
+        triang.source_sibling = self.source_sibling
+        return triang
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TriangMatch):
+            other = other.to_triang()
+        if isinstance(other, Triang):
+            return self.to_triang() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"TriangMatch({self.to_triang()!r})"
@@ -0,0 +1,140 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List
+
+import numpy as np
+
+from grand_match import KitRegistry, StringPool, Triang
+
+# Columns holding ids into the table's KitRegistry and codes into its StringPool.
+KIT_COLUMNS = ["Kit1_Number", "Kit2_Number"]
+STRING_COLUMNS = ["Kit1_Name", "Kit1_Email", "Kit2_Name", "Kit2_Email", "cM_Text"]
+# cM is the numeric value used for filtering, cM_Text the text as the CSV spelled it ("11.0", "7.50")
+TRIANG_COLUMNS = ["Chr", "Kit1_Number", "Kit1_Name", "Kit1_Email", "Kit2_Number", "Kit2_Name", "Kit2_Email",
+                  "B37_Start", "B37_End", "cM", "cM_Text"]
+
+
+@dataclass
+class TriangTable:
+    """Column-oriented triangulation rows for one sibling.
+
+    Positions and cM are NumPy arrays, the kit columns are ids into `kits` and
+    the name, email and cM text columns are codes into `strings`. `Triang`
+    objects are only built on demand, with cM as its original text.
+    """
+    strings: StringPool = field(default_factory=StringPool)
+    kits: KitRegistry = field(default_factory=KitRegistry)
+    Chr: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int16))
+    Kit1_Number: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    Kit1_Name: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    Kit1_Email: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    Kit2_Number: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    Kit2_Name: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    Kit2_Email: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    B37_Start: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    B37_End: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    cM: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    cM_Text: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+
+    @classmethod
+    def from_triangs(cls, triangs: Iterable[Triang], strings: StringPool = None, kits: KitRegistry = None) -> "TriangTable":
+        builder = TriangTableBuilder(strings, kits)
+        for t in triangs:
+            builder.append(t.Chr, t.Kit1_Number, t.Kit1_Name, t.Kit1_Email, t.Kit2_Number, t.Kit2_Name, t.Kit2_Email,
+                           t.B37_Start, t.B37_End, float(t.cM), str(t.cM))
+        return builder.build()
+
+    def __len__(self) -> int:
+        return len(self.Chr)
+
+    def __iter__(self) -> Iterator[Triang]:
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def row(self, i: int) -> Triang:
+        values = self.strings.values
+        kits = self.kits.values
+        return Triang(int(self.Chr[i]),
+                      kits[self.Kit1_Number[i]], values[self.Kit1_Name[i]], values[self.Kit1_Email[i]],
+                      kits[self.Kit2_Number[i]], values[self.Kit2_Name[i]], values[self.Kit2_Email[i]],
+                      int(self.B37_Start[i]), int(self.B37_End[i]), values[self.cM_Text[i]])
+
+    def take(self, indices) -> "TriangTable":
+        """Return the rows at `indices` as a new table sharing this table's string pool and kit registry.
+
+        A `slice` gives a table of NumPy views rather than copies.
+        """
+        return TriangTable(self.strings, self.kits, **{name: getattr(self, name)[indices] for name in TRIANG_COLUMNS})
+
+    def select_chromosomes(self, chromosomes: set) -> "TriangTable":
+        """Return only the rows on the given chromosomes; the table itself when that is every row."""
+        selected = np.isin(self.Chr, list(chromosomes))
+        if selected.all():
+            return self
+        return self.take(np.flatnonzero(selected))
+
+    def rebind(self, strings: StringPool, kits: KitRegistry) -> "TriangTable":
+        """Return this table with its codes translated into another string pool and kit registry."""
+        if strings is self.strings and kits is self.kits:
+            return self
+        columns = {name: getattr(self, name) for name in TRIANG_COLUMNS}
+        for pool, own_pool, names in ((strings, self.strings, STRING_COLUMNS), (kits, self.kits, KIT_COLUMNS)):
+            if pool is not own_pool:
+                mapping = pool.remap_from(own_pool)
+                for name in names:
+                    columns[name] = mapping[columns[name]] if len(mapping) else columns[name]
+        return TriangTable(strings, kits, **columns)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Decoded columns in `Triang` field order, ready for a DataFrame or csv writer; cM is the original text."""
+        columns = {}
+        for name in TRIANG_COLUMNS:
+            if name == "cM_Text":
+                continue
+            if name in KIT_COLUMNS:
+                columns[name] = self.kits.decode(getattr(self, name))
+            elif name in STRING_COLUMNS:
+                columns[name] = self.strings.decode(getattr(self, name))
+            elif name == "cM":
+                columns[name] = self.strings.decode(self.cM_Text)
+            else:
+                columns[name] = getattr(self, name)
+        columns["grandparent"] = np.full(len(self), "Unknown", dtype=object)
+        columns["source_sibling"] = np.full(len(self), "Unknown", dtype=object)
+        return columns
+
+
+class TriangTableBuilder:
+    """Accumulates rows into compact typed buffers and produces a TriangTable."""
+
+    def __init__(self, strings: StringPool = None, kits: KitRegistry = None):
+        self.strings = strings if strings is not None else StringPool()
+        self.kits = kits if kits is not None else KitRegistry()
+        self.chr = array('h')
+        self.kit_ids: List[array] = [array('i') for _ in KIT_COLUMNS]
+        self.codes: List[array] = [array('i') for _ in STRING_COLUMNS]
+        self.start = array('q')
+        self.end = array('q')
+        self.cm = array('d')
+
+    def append(self, chr: int, kit1_number: str, kit1_name: str, kit1_email: str,
+               kit2_number: str, kit2_name: str, kit2_email: str, start: int, end: int, cm: float, cm_text: str):
+        intern = self.strings.intern
+        self.chr.append(chr)
+        self.kit_ids[0].append(self.kits.intern(kit1_number))
+        self.kit_ids[1].append(self.kits.intern(kit2_number))
+        for buffer, value in zip(self.codes, (kit1_name, kit1_email, kit2_name, kit2_email, cm_text)):
+            buffer.append(intern(value))
+        self.start.append(start)
+        self.end.append(end)
+        self.cm.append(cm)
+
+    def build(self) -> TriangTable:
+        columns = {name: np.frombuffer(buffer, dtype=np.int32).copy()
+                   for name, buffer in zip(KIT_COLUMNS + STRING_COLUMNS, self.kit_ids + self.codes)}
+        return TriangTable(self.strings, self.kits,
+                           Chr=np.frombuffer(self.chr, dtype=np.int16).copy(),
+                           B37_Start=np.frombuffer(self.start, dtype=np.int64).copy(),
+                           B37_End=np.frombuffer(self.end, dtype=np.int64).copy(),
+                           cM=np.frombuffer(self.cm, dtype=np.float64).copy(),
+                           **columns)
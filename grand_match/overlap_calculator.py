@@ -1,69 +1,42 @@
-from typing import List
+from typing import Dict, List
 from dataclasses import dataclass
 
-from grand_match import MilestoneType, Milestone, SiblingOverlap, GrandparentSegment
+from grand_match import SiblingOverlap, GrandparentSegment
 
 @dataclass
 class OverlapCalculator:
     segment_list: List[GrandparentSegment]
 
-    def calculate_overlaps(self):
-        non_active_milestones: List[Milestone] = []
-        smallest: int = 0
-        largest: int = 0
-        for segment in self.segment_list:
-            non_active_milestones.append(Milestone(segment= segment, milestone_type= MilestoneType.START,  event_number = segment.B37_Start, is_active=False))
-            non_active_milestones.append(Milestone(segment= segment, milestone_type= MilestoneType.END,  event_number = segment.B37_End, is_active=False))
-            largest = max(segment.B37_End, largest)
-            smallest = max(segment.B37_Start, smallest)
-
-        sorted_milestones = sorted(non_active_milestones, key=lambda m: (m.event_number))
-        overlaps = []
-
-        #determine what segments are active
-        activated_segments :List[GrandparentSegment] = []
-        active_event_number:int = 0
-        while active_event_number < largest:
-            for m in sorted_milestones:
-                if m.event_number > active_event_number:
-                    break
-                if m.is_active == False and m.event_number == active_event_number:
-                    m.is_active = True
-                    activated_segments.append(m.segment)
-
-
-            overlap_end: int
-            #find the first non-activated milestone
-            for m in sorted_milestones:
-                if m.is_active == False:
-                    overlap_end = m.event_number
-                    break
-            #if this milestone is Type=End, then lets remove the segment after creating overlap
-            milestones_to_deactivate: List[Milestone] = []
-            for m in sorted_milestones:
-                if m.milestone_type == MilestoneType.END and m.event_number == overlap_end:
-                    m.is_active = True
-                    milestones_to_deactivate.append(m)
-
-            if len(activated_segments) > 0:
-                overlap_start = max(seg.B37_Start for seg in activated_segments)
-                overlap_start = max(overlap_start, active_event_number)
-                chr = activated_segments[0].Chr
-                grandparent = activated_segments[0].Grandparent
-
-                overlap_segments = activated_segments[:]
-                sibling_keys : List[str] = []
-                for s in overlap_segments:
-                    sibling_keys.append(s.Kit)
-
-                overlap: SiblingOverlap = SiblingOverlap(segments=overlap_segments, B37_Start=overlap_start, B37_End=overlap_end, Chr=chr, Grandparent=grandparent, sibling_kits=sibling_keys)
-                overlaps.append(overlap)
-                #remove any segments where the end milestone were active
-                for m in milestones_to_deactivate:
-                    for seg in activated_segments:
-                        if seg == m.segment:
-                            activated_segments.remove(seg)
-
-            active_event_number = overlap_end
+    def calculate_overlaps(self) -> List[SiblingOverlap]:
+        """Sweep the sorted segment boundaries once, emitting an overlap for every span with active segments.
+
+        Each span between two consecutive boundaries lists the segments active in it, ordered by
+        start position and then by their position in `segment_list`.
+        """
+        segments = self.segment_list
+        by_start = sorted(range(len(segments)), key=lambda i: segments[i].B37_Start)
+        ending_at: Dict[int, List[int]] = {}
+        for i, segment in enumerate(segments):
+            ending_at.setdefault(segment.B37_End, []).append(i)
+        positions = sorted({segment.B37_Start for segment in segments} | ending_at.keys())
+
+        overlaps: List[SiblingOverlap] = []
+        # dicts keep insertion order, so the active segments stay ordered by start
+        active: Dict[int, GrandparentSegment] = {}
+        next_start = 0
+        for overlap_start, overlap_end in zip(positions, positions[1:]):
+            while next_start < len(by_start) and segments[by_start[next_start]].B37_Start == overlap_start:
+                active[by_start[next_start]] = segments[by_start[next_start]]
+                next_start += 1
+
+            if active:
+                overlap_segments = list(active.values())
+                first = overlap_segments[0]
+                overlaps.append(SiblingOverlap(segments=overlap_segments, B37_Start=overlap_start, B37_End=overlap_end,
+                                               Chr=first.Chr, Grandparent=first.Grandparent,
+                                               sibling_kits=[s.Kit for s in overlap_segments]))
+
+            for i in ending_at.get(overlap_end, ()):
+                active.pop(i, None)
 
         return overlaps
@@ -0,0 +1,295 @@
+import json
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Set
+from urllib.parse import parse_qs, urlparse
+
+from grand_match import ChromosomeMatch, GrandMatch, SiblingOverlap, TriangMatch
+from grand_match.grand_match import KIT_PLATFORM
+
+
+class QueryError(ValueError):
+    """A query the service can't answer, reported to the client as a 400."""
+
+
+@dataclass
+class MatchQueryIndex:
+    """A loaded GrandMatch, its matches and the indexes queries are answered from.
+
+    Built once per load and never changed afterwards, so request threads can read
+    it while a reload builds its replacement.
+    """
+    grand_match: GrandMatch
+    matches: List[TriangMatch]
+    load_seconds: float = 0.0
+    loaded_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    # the overlap each match was found in, by match position
+    matchOverlaps: List[SiblingOverlap] = field(default_factory=list)
+    matchesByKit: Dict[str, List[int]] = field(default_factory=dict)
+    matchesByUnit: Dict[tuple, List[int]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        # overlaps of a grandparent on a chromosome are disjoint, so a match lies in the last one starting before it
+        overlapsByBest: Dict[tuple, List[SiblingOverlap]] = {}
+        for chr_number, chrome in self.grand_match.chromosome_models.items():
+            for gparent, overlaps in chrome.overlapsByGrandparent.items():
+                for overlap in overlaps:
+                    overlapsByBest.setdefault((chr_number, gparent, overlap.sibling_kits[0]), []).append(overlap)
+        startsByBest = {}
+        for key, overlaps in overlapsByBest.items():
+            overlaps.sort(key=lambda overlap: overlap.B37_Start)
+            startsByBest[key] = [overlap.B37_Start for overlap in overlaps]
+
+        for position, match in enumerate(self.matches):
+            key = (match.Chr, match.grandparent, match.source_sibling)
+            overlaps = overlapsByBest[key]
+            i = bisect_right(startsByBest[key], match.B37_Start) - 1
+            while overlaps[i].B37_End < match.B37_End:
+                i -= 1
+            self.matchOverlaps.append(overlaps[i])
+            self.matchesByKit.setdefault(match.Kit1_Number, []).append(position)
+            self.matchesByUnit.setdefault((match.Chr, match.grandparent), []).append(position)
+
+    def sibling_kits(self, siblings: List[str]) -> Set[str]:
+        """Kits of the given siblings, each named by name or kit."""
+        kits = set()
+        for sibling in siblings:
+            if sibling in self.grand_match.siblingsByKit:
+                kits.add(sibling)
+            elif sibling in self.grand_match.siblingsByName:
+                kits.add(self.grand_match.siblingsByName[sibling].kit)
+            else:
+                raise QueryError(f"Unknown sibling {sibling!r}")
+        return kits
+
+    def find(self, chr: int = None, grandparent: str = None, siblings: List[str] = None, kit: str = None) -> List[int]:
+        """Positions of the matches on `chr` for `grandparent`, in an overlap shared by all of `siblings`, of cousin `kit`.
+
+        Every criterion is optional.
+        """
+        if grandparent is not None and grandparent not in self.grand_match.grandparentsByName:
+            raise QueryError(f"Unknown grandparent {grandparent!r}")
+        siblingKits = self.sibling_kits(siblings) if siblings else None
+
+        if kit is not None:
+            candidates = self.matchesByKit.get(kit, [])
+        elif chr is not None and grandparent is not None:
+            candidates = self.matchesByUnit.get((chr, grandparent), [])
+        else:
+            candidates = range(len(self.matches))
+
+        found = []
+        for position in candidates:
+            match = self.matches[position]
+            if chr is not None and match.Chr != chr:
+                continue
+            if grandparent is not None and match.grandparent != grandparent:
+                continue
+            if kit is not None and match.Kit1_Number != kit:
+                continue
+            if siblingKits is not None and not siblingKits.issubset(self.matchOverlaps[position].sibling_kits):
+                continue
+            found.append(position)
+        return found
+
+    def sibling_names(self, kits: List[str]) -> List[str]:
+        siblingsByKit = self.grand_match.siblingsByKit
+        return [siblingsByKit[kit].name if kit in siblingsByKit else kit for kit in kits]
+
+    def match_rows(self, positions: List[int]) -> List[dict]:
+        rows = []
+        for position in positions:
+            row = dict(vars(self.matches[position].to_triang()))
+            row["overlap_siblings"] = self.sibling_names(self.matchOverlaps[position].sibling_kits)
+            rows.append(row)
+        return rows
+
+    def cousin_rows(self, positions: List[int]) -> List[dict]:
+        """One row per (cousin kit, chromosome, grandparent), like chromosome_matches.csv."""
+        cousins: Dict[tuple, ChromosomeMatch] = {}
+        siblings: Dict[tuple, set] = {}
+        clusterIds: Dict[tuple, set] = {}
+        clusters = self.grand_match.cousin_clusters
+        for position in positions:
+            match = self.matches[position]
+            key = (match.Kit1_Number, match.Chr, match.grandparent)
+            if key not in cousins:
+                cousins[key] = ChromosomeMatch(name=match.Kit1_Name, kit=match.Kit1_Number, grandparent=match.grandparent,
+                                               chr=match.Chr, platform=KIT_PLATFORM.get(match.Kit1_Number[0], 'Unknown'))
+                siblings[key] = set()
+                clusterIds[key] = set()
+            siblings[key].update(self.sibling_names(self.matchOverlaps[position].sibling_kits))
+            if clusters is not None:
+                clusterIds[key].update(clusters.clusters_of(match.Chr, match.Kit1_Number, match.B37_Start, match.B37_End))
+        for key, cousin in cousins.items():
+            cousin.siblings = "|".join(sorted(siblings[key]))
+            cousin.clusters = "|".join(str(cluster) for cluster in sorted(clusterIds[key]))
+        return [dict(vars(cousin)) for cousin in cousins.values()]
+
+    def overlap_rows(self, chr: int = None, grandparent: str = None, siblings: List[str] = None) -> List[dict]:
+        siblingKits = self.sibling_kits(siblings) if siblings else None
+        rows = []
+        for chr_number, chrome in self.grand_match.chromosome_models.items():
+            if chr is not None and chr_number != chr:
+                continue
+            for gparent, overlaps in chrome.overlapsByGrandparent.items():
+                if grandparent is not None and gparent != grandparent:
+                    continue
+                for overlap in overlaps:
+                    if siblingKits is None or siblingKits.issubset(overlap.sibling_kits):
+                        rows.append({"Chr": overlap.Chr, "Grandparent": overlap.Grandparent,
+                                     "B37_Start": overlap.B37_Start, "B37_End": overlap.B37_End,
+                                     "siblings": self.sibling_names(overlap.sibling_kits)})
+        return rows
+
+    def status(self) -> dict:
+        return {"loaded_at": self.loaded_at, "load_seconds": round(self.load_seconds, 3),
+                "siblings": len(self.grand_match.siblingsByKit), "chromosomes": len(self.grand_match.chromosome_models),
+                "overlaps": sum(len(overlaps) for chrome in self.grand_match.chromosome_models.values()
+                                for overlaps in chrome.overlapsByGrandparent.values()),
+                "matches": len(self.matches)}
+
+
+@dataclass
+class MatchQueryService:
+    """Keeps the pipeline's results resident and answers queries from them.
+
+    `loader` builds a GrandMatch up to its overlaps. `reload` calls it again and
+    swaps the new index in once it is built; with the Excel snapshot, the
+    triangulation cache and a state_dir behind the loader, only changed inputs
+    are re-read and only changed (chromosome, grandparent) units are rematched.
+    """
+    loader: Callable[[], GrandMatch]
+    matching_workers: int = 1
+    index: Optional[MatchQueryIndex] = None
+    _reload_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def reload(self) -> MatchQueryIndex:
+        with self._reload_lock:
+            start = time.perf_counter()
+            grand_match = self.loader()
+            matches = grand_match.match_chromosomes(workers=self.matching_workers)
+            grand_match.cluster_cousins()
+            self.index = MatchQueryIndex(grand_match, matches, load_seconds=time.perf_counter() - start)
+            return self.index
+
+
+def workbook_loader(workbook: str, triangulation_directory: str, excel_cache_directory: str = None,
+                    triangulation_cache_directory: str = None, state_dir: str = None) -> Callable[[], GrandMatch]:
+    """A loader running the pipeline's import and overlap steps the way main_grand_match.py does."""
+    def load() -> GrandMatch:
+        from grand_match.excel_importer import ExcelImporter
+        excel_importer = ExcelImporter(workbook, cache_dir=excel_cache_directory)
+        excel_importer.importExcel()
+
+        grand_match = GrandMatch()
+        grand_match.siblingsByKit = excel_importer.siblingsByKit
+        grand_match.siblingsByName = excel_importer.siblingsByName
+        grand_match.grandparentsByKit = excel_importer.grandparentsByKit
+        grand_match.grandparentsByName = excel_importer.grandparentsByName
+        grand_match.cousinByName = excel_importer.cousinByName
+        grand_match.cousinByKit = excel_importer.cousinByKit
+        grand_match.grandparent_segments = excel_importer.grandparent_segments
+        grand_match.kit_registry = excel_importer.kit_registry
+        grand_match.state_dir = state_dir
+
+        enabled_chromosomes = {chr_num for chr_num, setting in excel_importer.chromosome_settings_by_chr.items()
+                               if setting.mode.strip().lower() == "yes"}
+        grand_match.get_triangulation(triangulation_directory, enabled_chromosomes, cache_dir=triangulation_cache_directory)
+        grand_match.create_chromosome_models(excel_importer.chromosome_settings_by_chr)
+        grand_match.LoopOnChromosomeData()
+        return grand_match
+    return load
+
+
+def _query_arguments(query: Dict[str, List[str]]) -> dict:
+    arguments = {}
+    unknown = set(query) - {"chr", "grandparent", "siblings", "kit"}
+    if unknown:
+        raise QueryError(f"Unknown parameter(s): {', '.join(sorted(unknown))}")
+    if "chr" in query:
+        chr_string = query["chr"][-1]
+        try:
+            arguments["chr"] = 23 if chr_string.upper() == "X" else int(chr_string)
+        except ValueError:
+            raise QueryError(f"chr must be a number or X, not {chr_string!r}")
+    if "grandparent" in query:
+        arguments["grandparent"] = query["grandparent"][-1]
+    if "siblings" in query:
+        arguments["siblings"] = [name.strip() for value in query["siblings"] for name in value.split(",") if name.strip()]
+    if "kit" in query:
+        arguments["kit"] = query["kit"][-1]
+    return arguments
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """JSON endpoints: GET /status, /matches, /cousins and /overlaps, POST /reload.
+
+    /matches and /cousins take any of chr, grandparent, siblings (comma-separated
+    names or kits) and kit; /overlaps takes chr, grandparent and siblings.
+    """
+    server: "QueryServer"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        index = self.server.service.index
+        start = time.perf_counter()
+        try:
+            arguments = _query_arguments(parse_qs(url.query))
+            if url.path == "/status":
+                body = index.status()
+            elif url.path == "/matches":
+                body = {"matches": index.match_rows(index.find(**arguments))}
+            elif url.path == "/cousins":
+                body = {"cousins": index.cousin_rows(index.find(**arguments))}
+            elif url.path == "/overlaps":
+                arguments.pop("kit", None)
+                body = {"overlaps": index.overlap_rows(**arguments)}
+            else:
+                self._send(404, {"error": f"Unknown path {url.path}"})
+                return
+        except QueryError as e:
+            self._send(400, {"error": str(e)})
+            return
+        body["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        self._send(200, body)
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/reload":
+            self._send(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            index = self.server.service.reload()
+        except Exception as e:
+            # the previous index stays in service
+            self._send(500, {"error": f"Reload failed: {e}"})
+            return
+        self._send(200, index.status())
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class QueryServer(ThreadingHTTPServer):
+    """Serves a MatchQueryService on localhost; each request runs on its own thread."""
+    daemon_threads = True
+
+    def __init__(self, service: MatchQueryService, host: str = "127.0.0.1", port: int = 8765, verbose: bool = False):
+        super().__init__((host, port), QueryRequestHandler)
+        self.service = service
+        self.verbose = verbose
+        if service.index is None:
+            service.reload()
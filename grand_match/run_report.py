@@ -0,0 +1,135 @@
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:
+    # not on Windows; resident memory isn't reported there
+    resource = None
+
+
+@dataclass
+class StageReport:
+    name: str
+    wall_seconds: float = 0.0
+    # this process and any worker processes that finished during the stage
+    cpu_seconds: float = 0.0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    # worker processes the stage was given; above 1 the memory below is the parent process's only
+    workers: int = 1
+    # always recorded where the OS reports it: this process's peak resident memory at the end of the stage,
+    # and how far the stage raised it (0 when it stayed below the peak of an earlier stage)
+    peak_rss_bytes: Optional[int] = None
+    peak_rss_growth_bytes: Optional[int] = None
+    # with trace_memory: Python/NumPy memory allocated by the stage, the most it held at once and what it still held at the end
+    peak_memory_bytes: Optional[int] = None
+    retained_memory_bytes: Optional[int] = None
+    # "process", or "parent only" when the stage ran worker processes tracemalloc can't see
+    memory_scope: Optional[str] = None
+    # with workers: the largest peak resident memory of any worker process finished so far (None where the OS doesn't report it)
+    worker_peak_rss_bytes: Optional[int] = None
+    profile_path: Optional[str] = None
+
+
+def _cpu_seconds() -> float:
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def _peak_rss_bytes(who: int = None) -> Optional[int]:
+    """Peak resident memory of this process, or of its finished children with RUSAGE_CHILDREN."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF if who is None else who).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class RunReport:
+    """Wall time, CPU time, row counts and peak memory of each pipeline stage.
+
+    Each stage records the process's peak resident memory and how much the stage
+    raised it, which costs nothing. Set `trace_memory` for the detailed mode:
+    tracemalloc's peak and retained allocations per stage, which slows the run
+    down noticeably. Both only see this process, so for a stage given several
+    `workers` the memory is marked as the parent's only and the workers' peak
+    resident memory is added where the OS reports it. With `profile_dir` set,
+    each stage is also run under cProfile and its stats dumped there as a
+    .pstats file.
+    """
+    trace_memory: bool = False
+    profile_dir: Optional[str] = None
+    started: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    stages: List[StageReport] = field(default_factory=list)
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int = None, workers: int = 1) -> Iterator[StageReport]:
+        """Measure the body of the with-block as stage `name`; set `rows_out` on the yielded report.
+
+        `workers` is the number of processes the stage may run its work in.
+        """
+        report = StageReport(name=name, rows_in=rows_in, workers=workers or 1)
+        self.stages.append(report)
+        number = len(self.stages)
+
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+        rss_before = _peak_rss_bytes()
+        profiler = cProfile.Profile() if self.profile_dir is not None else None
+
+        wall_start = time.perf_counter()
+        cpu_start = _cpu_seconds()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield report
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            report.wall_seconds = round(time.perf_counter() - wall_start, 4)
+            report.cpu_seconds = round(_cpu_seconds() - cpu_start, 4)
+            report.peak_rss_bytes = _peak_rss_bytes()
+            if report.peak_rss_bytes is not None:
+                report.peak_rss_growth_bytes = report.peak_rss_bytes - rss_before
+            if self.trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                report.peak_memory_bytes = peak - memory_before
+                report.retained_memory_bytes = current - memory_before
+            report.memory_scope = "parent only" if report.workers > 1 else "process"
+            if report.workers > 1:
+                report.worker_peak_rss_bytes = _peak_rss_bytes(resource.RUSAGE_CHILDREN) if resource else None
+            if started_tracing:
+                tracemalloc.stop()
+            if profiler is not None:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                report.profile_path = os.path.join(self.profile_dir, f"{number:02d}_{name}.pstats")
+                profiler.dump_stats(report.profile_path)
+
+    def to_dict(self) -> dict:
+        return {
+            "started": self.started,
+            "total_wall_seconds": round(sum(stage.wall_seconds for stage in self.stages), 4),
+            "total_cpu_seconds": round(sum(stage.cpu_seconds for stage in self.stages), 4),
+            "stages": [asdict(stage) for stage in self.stages],
+        }
+
+    def write(self, file_path: str):
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(file_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
@@ -0,0 +1,96 @@
+import csv
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from itertools import chain
+from operator import attrgetter
+from typing import Callable, Dict, Iterable, List, Sequence
+
+# A table to export: column name -> values, all columns the same length
+Columns = Dict[str, Sequence]
+
+EXPORT_FORMATS = ("csv", "parquet", "feather")
+
+
+def write_csv(file_path: str, columns: Sequence[str], rows: Iterable[Sequence]):
+    """Write rows the way DataFrame.to_csv(index=False) does: minimal quoting and os.linesep line endings."""
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator=os.linesep)
+        writer.writerow(columns)
+        writer.writerows(rows)
+
+
+def write_models_csv(file_path: str, models: Iterable):
+    """Stream dataclass models to CSV, one row per model, without holding them all in memory.
+
+    The header is the first model's fields. The output matches a DataFrame built
+    from the models' rows, including the lone line break written when there are none.
+    """
+    models = iter(models)
+    first = next(models, None)
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator=os.linesep)
+        if first is None:
+            writer.writerow([])
+            return
+        names = [field.name for field in fields(first)]
+        writer.writerow(names)
+        values = attrgetter(*names)
+        if len(names) == 1:
+            writer.writerows((values(model),) for model in chain((first,), models))
+        else:
+            writer.writerows(values(model) for model in chain((first,), models))
+
+
+def _require_pyarrow(file_format: str):
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(f"Writing {file_format} files requires pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+@dataclass
+class TableExporter:
+    """Writes column-oriented tables as CSV, or as Parquet/Feather when pyarrow is installed.
+
+    With `workers` > 1 the tables are written on a thread pool; file writes and
+    pyarrow's encoders release the GIL.
+    """
+    file_format: str = "csv"
+    workers: int = 1
+
+    def __post_init__(self):
+        if self.file_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format {self.file_format!r}, expected one of {EXPORT_FORMATS}")
+        if self.file_format != "csv":
+            _require_pyarrow(self.file_format)
+
+    def file_name(self, name: str) -> str:
+        return f"{name}.{self.file_format}"
+
+    def write(self, file_path: str, columns: Columns):
+        if self.file_format == "csv":
+            write_csv(file_path, list(columns), zip(*columns.values()))
+            return
+        pyarrow = _require_pyarrow(self.file_format)
+        table = pyarrow.table({name: list(values) for name, values in columns.items()})
+        if self.file_format == "parquet":
+            import pyarrow.parquet
+            pyarrow.parquet.write_table(table, file_path)
+        else:
+            import pyarrow.feather
+            pyarrow.feather.write_feather(table, file_path)
+
+    def write_all(self, directory: str, tables: Dict[str, Callable[[], Columns]]):
+        """Write each table to `directory`; tables are keyed by name (without extension) and built lazily."""
+        jobs: List[Callable[[], None]] = [
+            lambda name=name, build=build: self.write(os.path.join(directory, self.file_name(name)), build())
+            for name, build in tables.items()]
+        if self.workers is not None and self.workers > 1 and len(jobs) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for future in [executor.submit(job) for job in jobs]:
+                    future.result()
+        else:
+            for job in jobs:
+                job()
@@ -0,0 +1,127 @@
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from grand_match import KitRegistry, StringPool, TriangFilter, TriangTable
+from grand_match.models.triang_table import KIT_COLUMNS, STRING_COLUMNS, TRIANG_COLUMNS
+
+CACHE_VERSION = 4
+# the columns chromosome selection and a TriangFilter look at, read before the others
+SELECTION_COLUMNS = ["Chr", "Kit1_Number", "B37_Start", "B37_End", "cM"]
+
+
+def file_sha1(file_path: str) -> str:
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class TriangCache:
+    """On-disk cache of parsed triangulation CSVs stored as uncompressed .npz files.
+
+    An entry is keyed by the CSV's absolute path and is valid while the file's
+    size and mtime are unchanged. If only the mtime moved (e.g. the file was
+    copied again), the content hash decides and the entry is re-stamped.
+    An entry holds either the whole file or only the chromosomes it was parsed
+    for, and is only returned for requests it covers.
+    """
+    cache_dir: str
+
+    def cache_path(self, file_path: str) -> str:
+        source = os.path.abspath(file_path)
+        key = hashlib.sha1(source.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{os.path.basename(source)}.{key}.npz")
+
+    def load(self, file_path: str, chromosomes: set = None, row_filter: TriangFilter = None) -> Optional[TriangTable]:
+        """Return the cached table for `file_path`, or None when there is no valid entry holding `chromosomes` (None: all).
+
+        Only the rows on `chromosomes` that `row_filter` keeps are returned. They
+        are picked from the chromosome, kit, position and cM columns before the
+        other columns are read, and the string pools keep only their values.
+        """
+        path = self.cache_path(file_path)
+        if not os.path.exists(path):
+            return None
+        stat = os.stat(file_path)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data["version"]) != CACHE_VERSION or int(data["size"]) != stat.st_size:
+                    return None
+                cached_chromosomes = None if bool(data["whole_file"]) else set(data["chromosomes"].tolist())
+                if cached_chromosomes is not None and (chromosomes is None or not set(chromosomes) <= cached_chromosomes):
+                    return None
+                if int(data["mtime_ns"]) == stat.st_mtime_ns:
+                    return self._read_table(data, chromosomes, row_filter)
+                content_hash = file_sha1(file_path)
+                if str(data["sha1"]) != content_hash:
+                    return None
+                table = self._read_table(data)
+        except (OSError, ValueError, KeyError):
+            return None
+
+        # only the mtime moved: re-stamp the whole entry, then select from it
+        self.store(file_path, table, content_hash, cached_chromosomes)
+        if chromosomes is not None:
+            table = table.select_chromosomes(chromosomes)
+        if row_filter is not None:
+            table = row_filter.apply(table)
+        return table
+
+    def store(self, file_path: str, table: TriangTable, content_hash: str = None, chromosomes: set = None):
+        """Cache `table`, parsed from the whole of `file_path` or only from its rows on `chromosomes`."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        stat = os.stat(file_path)
+        if content_hash is None:
+            content_hash = file_sha1(file_path)
+        path = self.cache_path(file_path)
+        temp_path = path + ".tmp.npz"
+        np.savez(temp_path,
+                 version=np.int64(CACHE_VERSION),
+                 source=np.str_(os.path.abspath(file_path)),
+                 size=np.int64(stat.st_size),
+                 mtime_ns=np.int64(stat.st_mtime_ns),
+                 sha1=np.str_(content_hash),
+                 whole_file=np.bool_(chromosomes is None),
+                 chromosomes=np.array(sorted(chromosomes or ()), dtype=np.int16),
+                 strings=np.array(table.strings.values, dtype=str),
+                 kits=np.array(table.kits.values, dtype=str),
+                 **{name: getattr(table, name) for name in TRIANG_COLUMNS})
+        os.replace(temp_path, path)
+
+    def _read_table(self, data, chromosomes: set = None, row_filter: TriangFilter = None) -> TriangTable:
+        strings = StringPool(data["strings"].tolist())
+        kits = KitRegistry(data["kits"].tolist())
+        if chromosomes is None and row_filter is None:
+            return TriangTable(strings, kits, **{name: data[name] for name in TRIANG_COLUMNS})
+
+        selection = TriangTable(strings, kits, **{name: data[name] for name in SELECTION_COLUMNS})
+        kept = np.ones(len(selection), dtype=bool)
+        if chromosomes is not None:
+            kept &= np.isin(selection.Chr, list(chromosomes))
+        if row_filter is not None:
+            kept &= row_filter.mask(selection)
+        if kept.all():
+            return TriangTable(strings, kits, **{name: getattr(selection, name) if name in SELECTION_COLUMNS else data[name]
+                                                 for name in TRIANG_COLUMNS})
+
+        rows = np.flatnonzero(kept)
+        columns = {name: (getattr(selection, name) if name in SELECTION_COLUMNS else data[name])[rows]
+                   for name in TRIANG_COLUMNS}
+        return TriangTable(_used_values(StringPool, strings, columns, STRING_COLUMNS),
+                           _used_values(KitRegistry, kits, columns, KIT_COLUMNS), **columns)
+
+
+def _used_values(pool_type: type, pool: StringPool, columns: dict, names: list) -> StringPool:
+    """A pool of only the values the `names` columns use, re-coding those columns into it."""
+    used = np.unique(np.concatenate([columns[name] for name in names]))
+    mapping = np.zeros(len(pool), dtype=np.int32)
+    mapping[used] = np.arange(len(used), dtype=np.int32)
+    for name in names:
+        columns[name] = mapping[columns[name]]
+    return pool_type([pool.values[code] for code in used.tolist()])
@@ -1,23 +1,138 @@
 import csv
-from dataclasses import dataclass
-from typing import List
+import io
+import locale
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Tuple
 
-from grand_match import Triang
+import numpy as np
+
+from grand_match import KitRegistry, StringPool, Triang, TriangTable, TriangTableBuilder
+from grand_match.chromosome_offset_index import ChromosomeOffsetIndex
+
+TRIANG_CSV_COLUMNS = ("Chr", "Kit1 Number", "Kit1 Name", "Kit1 Email", "Kit2 Number",
+                      "Kit2 Name", "Kit2 Email", "B37 Start", "B37 End", "cM")
+
+
+@dataclass
+class TriangFilter:
+    """Predicates on the typed row values, pushed down into TriagImporter so rejected rows are never stored.
+
+    A row is kept when its cM is at least `min_cm`, its Kit1 is not one of
+    `exclude_kit1` and, when `windows` is set, it lies within the (start, end)
+    windows of its chromosome; chromosomes without windows keep no rows.
+    """
+    min_cm: float = None
+    exclude_kit1: FrozenSet[str] = frozenset()
+    windows: Dict[int, List[Tuple[int, int]]] = None
+    # the windows of each chromosome merged where they overlap, as sorted starts and their ends
+    _merged: Dict[int, Tuple[List[int], List[int]]] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self):
+        self.exclude_kit1 = frozenset(self.exclude_kit1)
+        for chr_number, windows in (self.windows or {}).items():
+            starts, ends = [], []
+            for start, end in sorted(windows):
+                if ends and start <= ends[-1]:
+                    ends[-1] = max(ends[-1], end)
+                else:
+                    starts.append(start)
+                    ends.append(end)
+            self._merged[chr_number] = (starts, ends)
+
+    def keeps(self, chr: int, kit1: str, start: int, end: int, cm: float) -> bool:
+        if self.min_cm is not None and cm < self.min_cm:
+            return False
+        if kit1 in self.exclude_kit1:
+            return False
+        if self.windows is not None:
+            merged = self._merged.get(chr)
+            if merged is None:
+                return False
+            starts, ends = merged
+            i = bisect_right(starts, start) - 1
+            return i >= 0 and end <= ends[i]
+        return True
+
+    def mask(self, table: TriangTable) -> np.ndarray:
+        """The rows of an already loaded table that `keeps` would keep."""
+        kept = np.ones(len(table), dtype=bool)
+        if self.min_cm is not None:
+            kept &= table.cM >= self.min_cm
+        if self.exclude_kit1:
+            kept &= ~np.isin(table.Kit1_Number, [table.kits.codes[kit] for kit in self.exclude_kit1 if kit in table.kits.codes])
+        if self.windows is not None:
+            in_window = np.zeros(len(table), dtype=bool)
+            for chr_number, (starts, ends) in self._merged.items():
+                if not starts:
+                    continue
+                rows = np.flatnonzero(table.Chr == chr_number)
+                i = np.searchsorted(starts, table.B37_Start[rows], side='right') - 1
+                in_window[rows] = (i >= 0) & (table.B37_End[rows] <= np.asarray(ends)[np.maximum(i, 0)])
+            kept &= in_window
+        return kept
+
+    def apply(self, table: TriangTable) -> TriangTable:
+        kept = self.mask(table)
+        return table if kept.all() else table.take(np.flatnonzero(kept))
 
 
 @dataclass
 class TriagImporter:
+    # When set and only some chromosomes are enabled, seek to their rows using a ChromosomeOffsetIndex sidecar
+    use_index: bool = False
+    # Rows it rejects are skipped while parsing, before their strings are interned
+    row_filter: TriangFilter = None
+
     def createList(self, file_path: str, enabled_chromosomes: set = None) -> List[Triang]:
-        triang_list = []
+        return list(self.createTable(file_path, enabled_chromosomes))
+
+    def createTable(self, file_path: str, enabled_chromosomes: set = None, strings: StringPool = None,
+                    kits: KitRegistry = None) -> TriangTable:
+        builder = TriangTableBuilder(strings, kits)
+        if self.use_index and enabled_chromosomes is not None:
+            index = ChromosomeOffsetIndex.load_or_build(file_path)
+            if index is not None:
+                self._read_indexed(file_path, index, enabled_chromosomes, builder)
+                return builder.build()
+
         with open(file_path, 'r') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                chr_string = (row["Chr"])
-                if chr_string == "X":
-                    chr_string = 23
-                chr_int = int(chr_string)
-                if enabled_chromosomes is not None and chr_int not in enabled_chromosomes:
-                    continue
-                triang = Triang(chr_int, row["Kit1 Number"], row["Kit1 Name"], row["Kit1 Email"], row["Kit2 Number"], row["Kit2 Name"], row["Kit2 Email"], int(row["B37 Start"]), int(row["B37 End"]), row["cM"])
-                triang_list.append(triang)
-        return triang_list
+            reader = csv.reader(csvfile)
+            header = next(reader, None)
+            if header is None:
+                return builder.build()
+            self._append_rows(builder, reader, header, enabled_chromosomes)
+        return builder.build()
+
+    def _read_indexed(self, file_path: str, index: ChromosomeOffsetIndex, enabled_chromosomes: set,
+                      builder: TriangTableBuilder):
+        # decode the same way open(file_path, 'r') would
+        encoding = locale.getpreferredencoding(False)
+        with open(file_path, 'rb') as f:
+            header = next(csv.reader([f.read(index.header_end).decode(encoding)]), None)
+            if header is None:
+                return
+            for start, end in index.ranges_for(enabled_chromosomes):
+                f.seek(start)
+                chunk = f.read(end - start).decode(encoding)
+                self._append_rows(builder, csv.reader(io.StringIO(chunk, newline='')), header, enabled_chromosomes)
+
+    def _append_rows(self, builder: TriangTableBuilder, reader: Iterable[List[str]], header: List[str],
+                     enabled_chromosomes: set = None):
+        columns = [header.index(name) for name in TRIANG_CSV_COLUMNS]
+        c_chr, c_kit1, c_name1, c_email1, c_kit2, c_name2, c_email2, c_start, c_end, c_cm = columns
+        row_filter = self.row_filter
+        for row in reader:
+            if not row:
+                continue
+            chr_string = row[c_chr]
+            if chr_string == "X":
+                chr_string = 23
+            chr_int = int(chr_string)
+            if enabled_chromosomes is not None and chr_int not in enabled_chromosomes:
+                continue
+            start, end, cm = int(row[c_start]), int(row[c_end]), float(row[c_cm])
+            if row_filter is not None and not row_filter.keeps(chr_int, row[c_kit1], start, end, cm):
+                continue
+            builder.append(chr_int, row[c_kit1], row[c_name1], row[c_email1], row[c_kit2], row[c_name2], row[c_email2],
+                           start, end, cm, row[c_cm])
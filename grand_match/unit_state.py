@@ -0,0 +1,71 @@
+import hashlib
+import os
+import pickle
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from grand_match import TriangTable
+
+UNIT_STATE_VERSION = 2
+
+
+def fingerprint(*parts) -> str:
+    """SHA-1 over strings, NumPy arrays and (via repr) other plain values."""
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(np.ascontiguousarray(part).tobytes())
+        elif isinstance(part, str):
+            digest.update(part.encode('utf-8'))
+        else:
+            digest.update(repr(part).encode('utf-8'))
+        digest.update(b'\x1e')
+    return digest.hexdigest()
+
+
+def table_fingerprint(table: TriangTable) -> str:
+    """Fingerprint of what matching reads from a table: both kit numbers and the positions, in row order.
+
+    Kit ids depend on interning order, so the kit numbers themselves are hashed.
+    """
+    kits = np.array(table.kits.values, dtype=object)
+    return fingerprint("\x1f".join(kits[table.Kit1_Number]), "\x1f".join(kits[table.Kit2_Number]),
+                       table.B37_Start.astype(np.int64), table.B37_End.astype(np.int64))
+
+
+@dataclass
+class UnitStateStore:
+    """Per (chromosome, grandparent) results of a previous run, pickled into `state_dir`.
+
+    A state holds the unit's overlaps and matches together with the fingerprints
+    of the inputs they were computed from; callers compare fingerprints and only
+    recompute the units whose inputs changed.
+    """
+    state_dir: str
+
+    def state_path(self, chr_number: int, grandparent: str) -> str:
+        key = hashlib.sha1(grandparent.encode('utf-8')).hexdigest()[:12]
+        return os.path.join(self.state_dir, f"unit-{chr_number}-{key}.pickle")
+
+    def load(self, chr_number: int, grandparent: str) -> Optional[dict]:
+        path = self.state_path(chr_number, grandparent)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError):
+            return None
+        if state.get("version") != UNIT_STATE_VERSION or state.get("unit") != (chr_number, grandparent):
+            return None
+        return state
+
+    def save(self, chr_number: int, grandparent: str, state: dict):
+        os.makedirs(self.state_dir, exist_ok=True)
+        state = dict(state, version=UNIT_STATE_VERSION, unit=(chr_number, grandparent))
+        path = self.state_path(chr_number, grandparent)
+        with open(path + ".tmp", 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
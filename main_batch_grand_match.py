@@ -0,0 +1,54 @@
+import json
+import os
+import sys
+from datetime import datetime
+from grand_match.batch import FamilyConfig, run_batch
+
+# Runs several workbooks (families, or alternative phasings of one family) in one go. Every distinct
+# workbook, triangulation CSV and GEDmatch matches folder is imported once and shared by all the runs.
+#
+# Pass a JSON file with a list of family configs to run those instead of the list below, e.g.
+#   python main_batch_grand_match.py batch.json
+# where batch.json holds [{"workbook": ..., "output_directory": ..., "triangulation_directory": ...,
+#                          "matches_directory": ...}, ...]
+
+input_directory = os.getcwd() + "\\inputfiles"
+
+input_triangulation_directory = os.getcwd() + "\\inputfiles\\gedmatch\\triangulation"
+
+input_matches_directory = os.getcwd() + "\\inputfiles\\gedmatch\\matches"
+
+output_root = os.getcwd() + f"\\out\\batch-{datetime.now().strftime('%Y-%m-%d_%H%M%S')}"
+
+families = [
+    FamilyConfig(workbook=os.path.join(input_directory, workbook),
+                 output_directory=output_root + "\\" + os.path.splitext(workbook)[0],
+                 triangulation_directory=input_triangulation_directory,
+                 matches_directory=input_matches_directory,
+                 excel_cache_directory=os.getcwd() + "\\cache\\excel")
+    for workbook in ["visualphasing2026.xlsx", "visualphasing.xlsx"]
+]
+
+# Parsed triangulation CSVs are cached here; set to None to always re-parse the CSVs
+triangulation_cache_directory = os.getcwd() + "\\cache\\triangulation"
+
+# Number of processes running the families (and parsing the CSVs); 1 runs them one after another
+batch_workers = os.cpu_count() or 1
+
+
+def main():
+    batch = families
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'r') as f:
+            batch = [FamilyConfig(**family) for family in json.load(f)]
+
+    print(f'Running {len(batch)} families')
+    reports = run_batch(batch, workers=batch_workers, cache_dir=triangulation_cache_directory)
+    for family, report in zip(batch, reports):
+        matching = next(stage for stage in report.stages if stage.name == "matching")
+        print(f'{family.workbook}: {matching.rows_out} matches in {report.to_dict()["total_wall_seconds"]}s '
+              f'-> {family.output_directory}')
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,60 @@
 import os
 from grand_match.excel_importer import ExcelImporter
 from grand_match.grand_match import GrandMatch
+from grand_match.run_report import RunReport
+from grand_match.triang_importer import TriangFilter
 from datetime import datetime
 
 input_directory = os.getcwd() + "\\inputfiles"
 
 input_triangulation_directory = os.getcwd() + "\\inputfiles\\gedmatch\\triangulation"
 
+# Snapshot of the imported Excel configuration, reused while the workbook is unchanged; None disables it
+excel_cache_directory = os.getcwd() + "\\cache\\excel"
+
+# Parsed triangulation CSVs are cached here; set to None to always re-parse the CSVs
+triangulation_cache_directory = os.getcwd() + "\\cache\\triangulation"
+
+# Number of processes used to parse the sibling triangulation CSVs; 1 parses them one after another.
+# The pool only starts for 64 MB of CSVs or more (PARALLEL_IMPORT_MIN_BYTES); smaller inputs are parsed serially
+triangulation_import_workers = os.cpu_count() or 1
+
+# Number of processes used to match the (chromosome, grandparent) pairs; 1 matches them one after another.
+# Serial matching takes well under a second even for millions of triangulation rows, less than starting a
+# process pool costs on Windows, so only raise this for families far larger than that
+matching_workers = 1
+
+# Per (chromosome, grandparent) overlaps and matches from the previous run; only units whose inputs
+# changed are recomputed. None always recomputes everything
+incremental_state_directory = os.getcwd() + "\\cache\\units"
+
+# Parse only the enabled chromosomes' rows using a byte-offset sidecar next to each CSV (with the cache: on a miss,
+# and the cache entry then holds just those chromosomes)
+use_chromosome_index = True
+
+# Skip the triangulation rows matching can never keep (Kit1 is a sibling, or outside every grandparent segment)
+# while parsing; the matches are the same, but the exported triangulations only hold the kept rows
+prefilter_triangulations = False
+
+# Skip triangulation rows smaller than this many cM while parsing; None keeps every size
+triangulation_min_cm = None
+
+# "legacy" keeps one file per sibling/chromosome/grandparent; "consolidated" writes triangulations/overlaps/segments once each
+export_layout = "legacy"
+
+# csv, or parquet/feather (requires pyarrow) for the overlap export tables
+export_format = "csv"
+
+# Number of threads writing the overlap export files
+export_workers = 4
+
+# run_report.json always has each stage's peak resident memory; this adds tracemalloc's detailed
+# per-stage allocations, which slows the run down noticeably
+report_memory = False
+
+# Dump a cProfile .pstats file per stage into the output folder's "profiles" directory
+profile_stages = False
+
 output_directory = os.getcwd() + f"\\out\\{datetime.now().strftime('%Y-%m-%d_%H%M%S')}"
 
 
@@ -15,35 +63,80 @@ file_name = "visualphasing2026.xlsx"
 # Join the working directory and file name to create the full path
 full_path = os.path.join(input_directory, file_name)
 
-print(f'Importing configuraton from Excel')
-excelImporter:ExcelImporter = ExcelImporter(full_path)
-excelImporter.importExcel()
-
-grandMatch = GrandMatch()
-grandMatch.siblingsByKit = excelImporter.siblingsByKit
-grandMatch.siblingsByName = excelImporter.siblingsByName
-
-grandMatch.grandparentsByKit = excelImporter.grandparentsByKit
-grandMatch.grandparentsByName = excelImporter.grandparentsByName
-
-grandMatch.cousinByName = excelImporter.cousinByName
-grandMatch.cousinByKit = excelImporter.cousinByKit
-
-grandMatch.grandparent_segments = excelImporter.grandparent_segments
-
-enabled_chromosomes = {
-    chr_num for chr_num, setting in excelImporter.chromosome_settings_by_chr.items()
-    if setting.mode.strip().lower() == "yes"
-}
-print(f'Getting triangulation data from each sibling (chromosomes: {sorted(enabled_chromosomes)})')
-grandMatch.get_triangulation(input_triangulation_directory, enabled_chromosomes)
-print(f'Creating chromosome models')
-grandMatch.create_chromosome_models(excelImporter.chromosome_settings_by_chr)
-print(f'Deriving overlaps of grandparent segments and triangulation')
-grandMatch.LoopOnChromosomeData()
-
-filteredTriang = grandMatch.match_chromosomes()
-print(f'Starting exports')
-grandMatch.export_triangs_to_csv(triangs=filteredTriang, directory=output_directory)
-grandMatch.extract_kits(triangs=filteredTriang, directory=output_directory)
-grandMatch.export_overlaps(directory=output_directory)
+def main():
+    report = RunReport(trace_memory=report_memory,
+                       profile_dir=output_directory + "\\profiles" if profile_stages else None)
+
+    print(f'Importing configuraton from Excel')
+    excelImporter:ExcelImporter = ExcelImporter(full_path, cache_dir=excel_cache_directory)
+    with report.stage("excel_import") as stage:
+        excelImporter.importExcel()
+        stage.rows_out = len(excelImporter.grandparent_segments)
+
+    grandMatch = GrandMatch()
+    grandMatch.siblingsByKit = excelImporter.siblingsByKit
+    grandMatch.siblingsByName = excelImporter.siblingsByName
+
+    grandMatch.grandparentsByKit = excelImporter.grandparentsByKit
+    grandMatch.grandparentsByName = excelImporter.grandparentsByName
+
+    grandMatch.cousinByName = excelImporter.cousinByName
+    grandMatch.cousinByKit = excelImporter.cousinByKit
+
+    grandMatch.grandparent_segments = excelImporter.grandparent_segments
+    grandMatch.kit_registry = excelImporter.kit_registry
+    grandMatch.state_dir = incremental_state_directory
+
+    enabled_chromosomes = {
+        chr_num for chr_num, setting in excelImporter.chromosome_settings_by_chr.items()
+        if setting.mode.strip().lower() == "yes"
+    }
+    row_filter = None
+    if prefilter_triangulations:
+        row_filter = grandMatch.matching_filter(min_cm=triangulation_min_cm)
+    elif triangulation_min_cm is not None:
+        row_filter = TriangFilter(min_cm=triangulation_min_cm)
+
+    print(f'Getting triangulation data from each sibling (chromosomes: {sorted(enabled_chromosomes)})')
+    with report.stage("triangulation_import", workers=triangulation_import_workers) as stage:
+        grandMatch.get_triangulation(input_triangulation_directory, enabled_chromosomes, cache_dir=triangulation_cache_directory,
+                                     workers=triangulation_import_workers, use_index=use_chromosome_index, row_filter=row_filter)
+        stage.rows_out = grandMatch.triang_graph.row_count()
+    triangulation_rows = stage.rows_out
+
+    print(f'Creating chromosome models')
+    with report.stage("model_build", rows_in=len(grandMatch.grandparent_segments) + triangulation_rows) as stage:
+        grandMatch.create_chromosome_models(excelImporter.chromosome_settings_by_chr)
+        stage.rows_out = sum(len(segments) for chrome in grandMatch.chromosome_models.values()
+                             for segments in chrome.segmentsByGrandparent.values())
+    segment_count = stage.rows_out
+
+    print(f'Deriving overlaps of grandparent segments and triangulation')
+    with report.stage("overlaps", rows_in=segment_count) as stage:
+        grandMatch.LoopOnChromosomeData()
+        stage.rows_out = sum(len(overlaps) for chrome in grandMatch.chromosome_models.values()
+                             for overlaps in chrome.overlapsByGrandparent.values())
+    overlap_count = stage.rows_out
+
+    with report.stage("matching", rows_in=triangulation_rows, workers=matching_workers) as stage:
+        filteredTriang = grandMatch.match_chromosomes(workers=matching_workers)
+        stage.rows_out = len(filteredTriang)
+
+    print(f'Clustering cousins that triangulate with each other')
+    with report.stage("clustering", rows_in=len(grandMatch.triang_graph)) as stage:
+        stage.rows_out = grandMatch.cluster_cousins().cluster_count()
+
+    print(f'Starting exports')
+    with report.stage("export_matches", rows_in=len(filteredTriang)) as stage:
+        grandMatch.export_triangs_to_csv(triangs=filteredTriang, directory=output_directory)
+        stage.rows_out = len(filteredTriang)
+    with report.stage("extract_kits", rows_in=len(filteredTriang)) as stage:
+        stage.rows_out = len(grandMatch.extract_kits(triangs=filteredTriang, directory=output_directory))
+    with report.stage("export_overlaps", rows_in=overlap_count):
+        grandMatch.export_overlaps(directory=output_directory, layout=export_layout, file_format=export_format, workers=export_workers)
+
+    report.write(output_directory + "\\run_report.json")
+
+
+if __name__ == "__main__":
+    main()
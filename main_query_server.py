@@ -0,0 +1,34 @@
+from grand_match.query_server import MatchQueryService, QueryServer, workbook_loader
+import main_grand_match as config
+
+# Loads the workbook and triangulations configured in main_grand_match.py once and answers queries on
+# http://127.0.0.1:8765 until stopped, e.g.
+#   curl "http://127.0.0.1:8765/cousins?chr=9&grandparent=PM&siblings=Joyce,Roger"
+#   curl -X POST http://127.0.0.1:8765/reload     (after editing the workbook or the triangulation CSVs)
+
+query_server_host = "127.0.0.1"
+
+query_server_port = 8765
+
+
+def main():
+    print(f'Loading {config.full_path}')
+    loader = workbook_loader(config.full_path, config.input_triangulation_directory,
+                             excel_cache_directory=config.excel_cache_directory,
+                             triangulation_cache_directory=config.triangulation_cache_directory,
+                             state_dir=config.incremental_state_directory)
+    server = QueryServer(MatchQueryService(loader, matching_workers=config.matching_workers),
+                         host=query_server_host, port=query_server_port, verbose=True)
+    status = server.service.index.status()
+    print(f'Loaded {status["matches"]} matches in {status["load_seconds"]}s; '
+          f'serving on http://{query_server_host}:{query_server_port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
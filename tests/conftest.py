@@ -4,7 +4,7 @@ from typing import Dict, List
 from grand_match import (
     Sibling, Cousin, Grandparent, GrandparentSegment,
     SiblingOverlap, Triang, ChromosomeModel, ChromosomeSetting,
-    TriangGroup, GrandMatch,
+    GrandMatch,
 )
 
 
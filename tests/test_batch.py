@@ -0,0 +1,111 @@
+"""Tests for the multi-family batch runner"""
+import os
+
+import numpy as np
+import pytest
+
+import grand_match.batch as batch
+from grand_match import GrandMatch
+from grand_match.batch import FamilyConfig, SharedInputs, run_batch
+from tests.test_excel_importer import _write_workbook
+from tests.test_triang_table import HEADER
+
+TRIANGULATIONS = {
+    "kit-A": '1,kit-x,"*X",x@example.com,kit-B,"Bob",b@example.com,300,600,11.8\n'
+             '1,kit-y,"*Y",y@example.com,kit-B,"Bob",b@example.com,150,250,7\n',
+    "kit-B": '1,kit-x,"*X",x@example.com,kit-A,"Alice",a@example.com,300,600,11.8\n',
+}
+
+
+def _families(tmp_path):
+    triangulation_dir = tmp_path / "triangulation"
+    triangulation_dir.mkdir()
+    for kit, rows in TRIANGULATIONS.items():
+        (triangulation_dir / f"{kit}.csv").write_text(HEADER + rows)
+    matches_dir = tmp_path / "matches"
+    matches_dir.mkdir()
+
+    families = []
+    for name, segment_end in (("first", 800), ("second", 280)):
+        workbook = str(tmp_path / f"{name}.xlsx")
+        _write_workbook(workbook, segment_end=segment_end)
+        families.append(FamilyConfig(workbook=workbook, output_directory=str(tmp_path / "out" / name),
+                                     triangulation_directory=str(triangulation_dir),
+                                     matches_directory=str(matches_dir)))
+    return families
+
+
+def _outputs(directory):
+    outputs = {}
+    for name in sorted(os.listdir(directory)):
+        if name != "run_report.json":
+            with open(os.path.join(directory, name), 'rb') as f:
+                outputs[name] = f.read()
+    return outputs
+
+
+def test_each_csv_is_loaded_once(tmp_path, monkeypatch):
+    families = _families(tmp_path)
+    loaded = []
+    load = batch._load_triangulation
+    monkeypatch.setattr(batch, "_load_triangulation", lambda file_path, *args: loaded.append(file_path) or load(file_path, *args))
+
+    reports = run_batch(families)
+
+    assert sorted(os.path.basename(path) for path in loaded) == ["kit-A.csv", "kit-B.csv"]
+    assert [next(s.rows_out for s in report.stages if s.name == "matching") for report in reports] == [1, 0]
+    assert os.path.exists(os.path.join(families[0].output_directory, "run_report.json"))
+
+
+def test_parallel_batch_matches_serial(tmp_path):
+    families = _families(tmp_path)
+    run_batch(families)
+    serial = [_outputs(family.output_directory) for family in families]
+
+    for family in families:
+        family.output_directory += "-parallel"
+    run_batch(families, workers=2)
+
+    assert [_outputs(family.output_directory) for family in families] == serial
+    assert b"kit-x" in serial[0]["matched_triangulations.csv"]
+
+
+def test_saved_inputs_are_memory_mapped(tmp_path):
+    families = _families(tmp_path)
+    shared = SharedInputs()
+    shared.load(families)
+
+    shared.save(str(tmp_path / "shared"))
+    opened = SharedInputs.open(str(tmp_path / "shared"))
+
+    graph = opened.triang_graph
+    assert list(graph.edge_rows) == list(shared.triang_graph.edge_rows)
+    assert not graph.edges.B37_Start.flags.writeable
+    for file_path in graph.edge_rows:
+        assert list(graph.sibling_table(file_path)) == list(shared.triang_graph.sibling_table(file_path))
+    with pytest.raises(ValueError):
+        graph.edges.B37_Start[0] = 0
+
+
+def test_family_partitions_stay_memory_mapped(tmp_path):
+    """A family's graph is built over the mapped edges, so its chromosome parts are views of the files, not copies."""
+    families = _families(tmp_path)
+    shared = SharedInputs()
+    shared.load(families)
+    shared.save(str(tmp_path / "shared"))
+    opened = SharedInputs.open(str(tmp_path / "shared"))
+    excel_importer = opened.workbooks[os.path.abspath(families[0].workbook)]
+
+    gm = GrandMatch(string_pool=opened.strings, kit_registry=opened.kits, loaded_triangulations=opened.triang_graph)
+    gm.siblingsByKit = excel_importer.siblingsByKit
+    gm.siblingsByName = excel_importer.siblingsByName
+    gm.grandparent_segments = excel_importer.grandparent_segments
+    gm.get_triangulation(families[0].triangulation_directory, {1})
+    gm.create_chromosome_models(excel_importer.chromosome_settings_by_chr)
+    gm.LoopOnChromosomeData()
+
+    assert gm.triang_graph.edges is opened.triang_graph.edges
+    assert gm.chromosome_models
+    for chrome in gm.chromosome_models.values():
+        assert all(isinstance(getattr(chrome.triang_graph.edges, name), np.memmap) for name in ["Chr", "B37_Start", "cM"])
+    assert {kit: len(gm.triang_table(kit)) for kit in gm.siblingsByKit} == {"kit-A": 2, "kit-B": 1}
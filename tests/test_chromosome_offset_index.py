@@ -0,0 +1,70 @@
+"""Tests for ChromosomeOffsetIndex and index-driven TriagImporter reads."""
+import os
+from grand_match import TriagImporter
+from grand_match.chromosome_offset_index import ChromosomeOffsetIndex
+
+HEADER = "Chr,Kit1 Number,Kit1 Name,Kit1 Email,Kit2 Number,Kit2 Name,Kit2 Email,B37 Start,B37 End,cM\n"
+
+
+def _row(chr: str, kit1: str, start: int) -> str:
+    return f'{chr},{kit1},"*{kit1}",{kit1}@example.com,kit-B,"Bob",b@example.com,{start},{start + 100},10\n'
+
+
+def _write_csv(tmp_path, rows):
+    path = tmp_path / "kit-A.csv"
+    path.write_text(HEADER + "".join(rows))
+    return str(path)
+
+
+def test_ranges_coalesce_consecutive_rows(tmp_path):
+    path = _write_csv(tmp_path, [_row("1", "a", 100), _row("1", "b", 200), _row("2", "c", 300), _row("1", "d", 400)])
+
+    index = ChromosomeOffsetIndex.build(path)
+
+    assert len(index.ranges[1]) == 2
+    assert len(index.ranges[2]) == 1
+    assert index.ranges_for({1, 2}) == [(index.header_end, os.path.getsize(path))]
+
+
+def test_indexed_read_matches_full_read(tmp_path):
+    path = _write_csv(tmp_path, [_row("1", "a", 100), _row("X", "b", 200), _row("2", "c", 300),
+                                 _row("1", "d", 400), _row("X", "e", 500)])
+
+    indexed = TriagImporter(use_index=True).createList(path, enabled_chromosomes={1, 23})
+    full = TriagImporter().createList(path, enabled_chromosomes={1, 23})
+
+    assert indexed == full
+    assert [t.Kit1_Number for t in indexed] == ["a", "b", "d", "e"]
+    assert os.path.exists(ChromosomeOffsetIndex.sidecar_path(path))
+
+
+def test_sidecar_invalidated_when_file_changes(tmp_path):
+    path = _write_csv(tmp_path, [_row("1", "a", 100)])
+    ChromosomeOffsetIndex.load_or_build(path)
+
+    with open(path, "a") as f:
+        f.write(_row("2", "b", 200))
+
+    assert ChromosomeOffsetIndex.load(path) is None
+    indexed = TriagImporter(use_index=True).createList(path, enabled_chromosomes={2})
+    assert [t.Kit1_Number for t in indexed] == ["b"]
+
+
+def test_multiline_rows_fall_back_to_full_parse(tmp_path):
+    path = _write_csv(tmp_path, [_row("1", "a", 100),
+                                 '2,b,"two\nlines",b@example.com,kit-B,"Bob",b@example.com,200,300,10\n'])
+
+    assert ChromosomeOffsetIndex.build(path) is None
+    assert [t.Kit1_Name for t in TriagImporter(use_index=True).createList(path, {2})] == ["two\nlines"]
+
+
+def test_reordered_columns_fall_back_to_full_parse(tmp_path):
+    """Without Chr as the first column the leading field can't be read as a chromosome."""
+    path = tmp_path / "kit-A.csv"
+    path.write_text("Kit1 Number,Chr,Kit1 Name,Kit1 Email,Kit2 Number,Kit2 Name,Kit2 Email,B37 Start,B37 End,cM\n"
+                    'A1,1,"*A1",a1@example.com,kit-B,"Bob",b@example.com,100,200,10\n'
+                    'A2,2,"*A2",a2@example.com,kit-B,"Bob",b@example.com,300,400,10\n')
+
+    assert ChromosomeOffsetIndex.build(str(path)) is None
+    indexed = TriagImporter(use_index=True).createList(str(path), enabled_chromosomes={2})
+    assert [t.Kit1_Number for t in indexed] == ["A2"]
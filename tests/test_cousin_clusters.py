@@ -0,0 +1,119 @@
+"""Tests for CousinClusters and the cluster outputs of GrandMatch.extract_kits()"""
+import csv
+import random
+
+from grand_match import CousinClusters, KitRegistry, StringPool, TriangGraph, TriangTable
+from tests.conftest import build_grand_match, make_segment, make_triang
+
+
+def _graph(triangsBySibling):
+    strings, kits = StringPool(), KitRegistry()
+    return TriangGraph.build({kit: TriangTable.from_triangs(triangs, strings, kits)
+                              for kit, triangs in triangsBySibling.items()})
+
+
+def test_overlapping_edges_of_a_kit_join_one_cluster():
+    graph = _graph({"kit-A": [
+        make_triang(1, "kit-p", "kit-q", 100, 200),
+        make_triang(1, "kit-q", "kit-r", 150, 300),
+        # kit-q again, but apart from its other segments
+        make_triang(1, "kit-q", "kit-s", 5000, 6000),
+        make_triang(1, "kit-t", "kit-u", 1000, 1100),
+        # with a sibling: not a cousin link
+        make_triang(1, "kit-p", "kit-B", 100, 6000),
+    ]})
+
+    clusters = CousinClusters.build(graph, ["kit-A", "kit-B"])
+
+    assert clusters.cluster_count() == 3
+    assert clusters.clusters_of(1, "kit-p", 0, 10_000) == [1]
+    assert clusters.clusters_of(1, "kit-r", 0, 10_000) == [1]
+    assert clusters.clusters_of(1, "kit-t", 0, 10_000) == [2]
+    assert clusters.clusters_of(1, "kit-q", 0, 10_000) == [1, 3]
+    assert clusters.clusters_of(1, "kit-q", 250, 4000) == [1]
+    assert clusters.clusters_of(1, "kit-q", 400, 4000) == []
+    assert clusters.clusters_of(2, "kit-q", 0, 10_000) == []
+    assert clusters.clusters_of(1, "kit-B", 0, 10_000) == []
+    assert clusters.clusters_of(1, "kit-unknown", 0, 10_000) == []
+
+
+def test_clusters_match_pairwise_components():
+    """Edges sharing a kit on a chromosome with overlapping segments end up in the same cluster, and only those."""
+    rng = random.Random(11)
+    people = [f"kit-{n}" for n in range(30)]
+    triangs = []
+    for _ in range(400):
+        kit1, kit2 = rng.sample(people, 2)
+        start = rng.randint(0, 20_000)
+        triangs.append(make_triang(rng.choice([1, 2]), kit1, kit2, start, start + rng.randint(0, 800)))
+    graph = _graph({"kit-A": triangs[:200], "kit-B": triangs[200:]})
+    clusters = CousinClusters.build(graph, ["kit-A", "kit-B"])
+
+    edges = list(range(len(graph)))
+    table = graph.edges
+    kits = table.kits.values
+    ends = [(int(table.Chr[e]), kits[table.Kit1_Number[e]], kits[table.Kit2_Number[e]],
+             int(table.B37_Start[e]), int(table.B37_End[e])) for e in edges]
+    component = list(edges)
+
+    def find(e):
+        while component[e] != e:
+            e = component[e]
+        return e
+    for e, (chr1, a1, b1, start1, end1) in enumerate(ends):
+        for f, (chr2, a2, b2, start2, end2) in enumerate(ends[:e]):
+            if chr1 == chr2 and {a1, b1} & {a2, b2} and start1 <= end2 and start2 <= end1:
+                component[find(e)] = find(f)
+
+    clusterOfEdge = []
+    for chr, kit1, kit2, start, end in ends:
+        found = clusters.clusters_of(chr, kit1, start, end)
+        assert len(found) == 1 and clusters.clusters_of(chr, kit2, start, end) == found
+        clusterOfEdge.append(found[0])
+    for e in edges:
+        for f in edges[:e]:
+            assert (find(e) == find(f)) == (clusterOfEdge[e] == clusterOfEdge[f])
+    assert clusters.cluster_count() == len({find(e) for e in edges})
+    # ids follow the clusters' first regions by chromosome and start
+    assert clusterOfEdge[0] == 1
+
+
+def test_unreported_edges_are_left_out():
+    """Edges of a larger graph that none of the graph's siblings reported don't link anyone."""
+    own = [make_triang(1, "kit-p", "kit-q", 100, 200), make_triang(1, "kit-r", "kit-s", 150, 300)]
+    larger = _graph({"kit-A": own, "kit-other": [make_triang(1, "kit-q", "kit-r", 120, 250)]})
+
+    graph = TriangGraph.from_edge_rows(larger.edges, {"kit-A": larger.edge_rows["kit-A"]})
+    clusters = CousinClusters.build(graph, ["kit-A"])
+
+    assert clusters.cluster_count() == 2
+    assert clusters.clusters_of(1, "kit-p", 0, 1000) == [1]
+    assert clusters.clusters_of(1, "kit-r", 0, 1000) == [2]
+
+
+def test_extract_kits_writes_clusters(tmp_path, siblings_by_kit, siblings_by_name, grandparents_by_name,
+                                      cousins_by_kit, cousins_by_name):
+    gm = build_grand_match(
+        siblings_by_kit, siblings_by_name, grandparents_by_name, cousins_by_kit, cousins_by_name,
+        segments=[make_segment(1, "Alice", "kit-A", "Smith", 100, 1000),
+                  make_segment(1, "Bob", "kit-B", "Smith", 100, 1000)],
+        triangulations_by_sibling={
+            "kit-A": [make_triang(1, "kit-cuz", "kit-B", 300, 600, kit1_name="Cuz"),
+                      make_triang(1, "kit-cuz", "kit-x", 300, 500, kit1_name="Cuz", kit2_name="X"),
+                      make_triang(1, "kit-x", "kit-y", 450, 700, kit1_name="X", kit2_name="Y")],
+            "kit-B": [make_triang(1, "kit-cuz", "kit-A", 300, 600, kit1_name="Cuz")],
+            "kit-C": []},
+    )
+    matches_dir = tmp_path / "matches"
+    matches_dir.mkdir()
+
+    chromosome_matches = gm.extract_kits(gm.match_chromosomes(), str(tmp_path), str(matches_dir))
+
+    assert [(m.kit, m.clusters) for m in chromosome_matches] == [("kit-cuz", "1")]
+    with open(tmp_path / "chromosome_matches.csv", newline='') as f:
+        assert next(csv.DictReader(f))["clusters"] == "1"
+    with open(tmp_path / "cousin_clusters.csv", newline='') as f:
+        rows = [(r["cluster"], r["B37_Start"], r["B37_End"], r["kit"], r["name"], r["grandparents"]) for r in csv.DictReader(f)]
+    assert rows == [("1", "300", "500", "kit-cuz", "Cuz", "Smith"),
+                    ("1", "300", "700", "kit-x", "X", ""),
+                    ("1", "450", "700", "kit-y", "Y", "")]
@@ -0,0 +1,62 @@
+"""Tests for ExcelImporter's single-pass workbook import and snapshot cache."""
+import os
+import openpyxl
+from grand_match.excel_importer import ExcelImporter
+
+
+def _write_workbook(path, segment_end=800):
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    sheets = {
+        "chromosomes": [("Chr", "Mode", "State"), (1, "Yes", None), (2, " No ", "not phased")],
+        "Siblings": [("Name", "Kit", "Order"), ("Alice", "kit-A", 2), ("Bob", " kit-B ", None)],
+        "Cousins": [("Name", "Kit", "Grandparent"), ("Cuz", "kit-cuz", "Smith")],
+        "Grandparents": [("Name", "Mode"), ("Smith", "Yes"), ("Jones", "No")],
+        "GrandparentSegments": [("Chr", "Sibling", "Kit", "Grandparent", "B37 Start", "B37 End"),
+                                (1, "Alice", "kit-A", "Smith", 100.0, 1000),
+                                (None, None, None, None, None, None),
+                                (1, "Bob", "kit-B", "Smith", 200, segment_end)],
+    }
+    for name, rows in sheets.items():
+        sheet = workbook.create_sheet(name)
+        for row in rows:
+            sheet.append(row)
+    workbook.save(path)
+
+
+def test_import_reads_all_sheets(tmp_path):
+    path = str(tmp_path / "vp.xlsx")
+    _write_workbook(path)
+
+    importer = ExcelImporter(path)
+    importer.importExcel()
+
+    assert importer.chromosome_settings_by_chr[2].mode == "No"
+    assert importer.siblingsByKit["kit-A"].order == 2
+    assert importer.siblingsByKit["kit-B"].order == 0
+    assert list(importer.grandparentsByName) == ["Smith"]
+    assert importer.cousinByKit["kit-cuz"].grandparent == "Smith"
+    assert [(s.Kit, s.B37_Start, s.B37_End) for s in importer.grandparent_segments] == [("kit-A", 100, 1000), ("kit-B", 200, 800)]
+    assert "kit-cuz" in importer.kit_registry.codes
+
+
+def test_snapshot_reused_until_workbook_changes(tmp_path):
+    path = str(tmp_path / "vp.xlsx")
+    cache_dir = str(tmp_path / "cache")
+    _write_workbook(path)
+
+    first = ExcelImporter(path, cache_dir=cache_dir)
+    first.importExcel()
+    assert os.path.exists(first.snapshot_path())
+
+    cached = ExcelImporter(path, cache_dir=cache_dir)
+    assert cached.load_snapshot()
+    assert cached.grandparent_segments == first.grandparent_segments
+
+    _write_workbook(path, segment_end=900)
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 5_000_000_000))
+
+    changed = ExcelImporter(path, cache_dir=cache_dir)
+    assert not changed.load_snapshot()
+    changed.importExcel()
+    assert changed.grandparent_segments[-1].B37_End == 900
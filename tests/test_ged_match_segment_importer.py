@@ -0,0 +1,43 @@
+"""Tests for the streaming GedMatchSegmentImporter and GedMatchSegmentIndex."""
+from grand_match import GedMatchSegmentImporter, KitRegistry
+
+HEADER = "PrimaryKit,MatchedKit,chr,B37Start,B37End,Segment cM,SNPs,MatchedName,Matched Sex,MatchedEmail\n"
+
+
+def _write_matches(tmp_path):
+    folder = tmp_path / "matches"
+    (folder / "nested").mkdir(parents=True)
+    (folder / "kit-A.csv").write_text(HEADER
+                                      + "kit-A,kit-x,2,100,200,11.5,900,X Person,F,x@example.com\n"
+                                      + "kit-A,kit-y,1,300,400,7,500,Y Person,M,y@example.com\n"
+                                      + "kit-A,kit-x,X,500,600,9.25,700,X Person,F,x@example.com\n")
+    (folder / "nested" / "kit-B.csv").write_text(HEADER
+                                                 + "kit-B,kit-x,2,150,250,12,950,X Person,F,x@example.com\n")
+    return str(folder)
+
+
+def test_segments_are_typed(tmp_path):
+    segments = GedMatchSegmentImporter().importCsv(_write_matches(tmp_path))
+
+    first = segments[0]
+    assert (first.b37_start, first.b37_end, first.segment_cm, first.snps) == (100, 200, 11.5, 900)
+    assert [s.chromosome for s in segments if s.matched_kit == "kit-x"] == [2, 23, 2]
+
+
+def test_index_groups_by_kit_and_chromosome(tmp_path):
+    registry = KitRegistry()
+    index = GedMatchSegmentImporter(kit_registry=registry).importIndex(_write_matches(tmp_path))
+
+    by_chr = index.by_chromosome(registry.intern("kit-x"))
+
+    assert list(by_chr.keys()) == [2, 23]
+    assert [s.primary_kit for s in by_chr[2]] == ["kit-A", "kit-B"]
+    assert len(index) == 4
+
+
+def test_index_keeps_only_kits_of_interest(tmp_path):
+    registry = KitRegistry()
+    index = GedMatchSegmentImporter(kit_registry=registry).importIndex(_write_matches(tmp_path), kits={"kit-y"})
+
+    assert len(index) == 1
+    assert index.by_chromosome(registry.intern("kit-x")) == {}
@@ -0,0 +1,54 @@
+"""Tests for the package's lazy imports: heavy dependencies load only when something needs them."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+import grand_match
+from tests.test_excel_importer import _write_workbook
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _loaded_after(statement: str) -> set:
+    """The heavy modules a fresh interpreter has loaded after running `statement`."""
+    probe = f"import sys\n{statement}\nprint(','.join(m for m in ('numpy', 'pandas', 'openpyxl') if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", probe], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    return set(filter(None, output.stdout.strip().split(",")))
+
+
+@pytest.mark.parametrize("statement", [
+    "import grand_match",
+    "from grand_match import Triang, Sibling, Cousin, GrandparentSegment, SiblingOverlap, CompactTriang",
+    "from grand_match import OverlapCalculator",
+])
+def test_models_load_no_heavy_dependencies(statement):
+    assert _loaded_after(statement) == set()
+
+
+def test_pipeline_does_not_load_pandas_or_openpyxl():
+    assert _loaded_after("from grand_match import GrandMatch, TriagImporter, TableExporter") == {"numpy"}
+
+
+def test_excel_snapshot_is_read_without_openpyxl(tmp_path):
+    path = str(tmp_path / "vp.xlsx")
+    cache_dir = str(tmp_path / "cache")
+    _write_workbook(path)
+    from grand_match.excel_importer import ExcelImporter
+    ExcelImporter(path, cache_dir=cache_dir).importExcel()
+
+    loaded = _loaded_after("from grand_match.excel_importer import ExcelImporter\n"
+                           f"importer = ExcelImporter({path!r}, cache_dir={cache_dir!r})\n"
+                           "importer.importExcel()\n"
+                           "assert importer.siblingsByKit")
+
+    assert "openpyxl" not in loaded
+
+
+def test_every_exported_name_resolves():
+    for name in grand_match.__all__:
+        assert getattr(grand_match, name).__name__ == name
+    assert set(grand_match.__all__) <= set(dir(grand_match))
+    with pytest.raises(AttributeError):
+        grand_match.NotAModel
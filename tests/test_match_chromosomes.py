@@ -239,3 +239,122 @@ def test_triang_not_mutated_across_overlaps():
     jones_results = [t for t in result if t.grandparent == "Jones"]
     assert len(smith_results) >= 1, "Should have Smith-attributed results"
     assert len(jones_results) >= 1, "Should have Jones-attributed results"
+
+
+def test_parallel_matching_matches_serial():
+    """Matching (chromosome, grandparent) units in a process pool gives the serial result, in the same order."""
+    siblings = {
+        "kit-A": make_sibling("Alice", "kit-A"),
+        "kit-B": make_sibling("Bob", "kit-B"),
+    }
+    grandparents = {
+        "Smith": make_grandparent("Smith"),
+        "Jones": make_grandparent("Jones"),
+    }
+    segments = [
+        make_segment(1, "Alice", "kit-A", "Smith", 100, 1000),
+        make_segment(1, "Bob", "kit-B", "Smith", 200, 800),
+        make_segment(2, "Alice", "kit-A", "Jones", 100, 1000),
+        make_segment(2, "Bob", "kit-B", "Jones", 200, 800),
+    ]
+    triangs = [
+        make_triang(1, "kit-x", "kit-B", 300, 600),
+        make_triang(2, "kit-y", "kit-B", 300, 600),
+        make_triang(2, "kit-x", "kit-B", 250, 700),
+    ]
+
+    results = []
+    for workers in (1, 2):
+        gm = build_grand_match(
+            siblings_by_kit=siblings,
+            siblings_by_name={s.name: s for s in siblings.values()},
+            grandparents_by_name=grandparents,
+            cousins_by_kit={},
+            cousins_by_name={},
+            segments=segments,
+            triangulations_by_sibling={"kit-A": list(triangs), "kit-B": []},
+        )
+        results.append(gm.match_chromosomes(workers=workers))
+
+    assert len(results[0]) == 3
+    assert results[0] == results[1]
+
+
+def test_matches_reference_table_rows():
+    """Matches point at the chromosome's graph edges rather than copying the row."""
+    gm = _setup_two_sibling_overlap(
+        triangulations_for_alice=[make_triang(1, "kit-stranger", "kit-B", 300, 600, cm="12.5")],
+    )
+    result = gm.match_chromosomes()
+
+    assert len(result) == 1
+    match = result[0]
+    assert match.table is gm.chromosome_models[1].triang_graph.edges
+    assert (match.Kit1_Number, match.B37_Start, match.cM) == ("kit-stranger", 300, "12.5")
+    triang = match.to_triang()
+    assert (triang.grandparent, triang.source_sibling) == ("Smith", "kit-A")
+    assert match == triang
+
+
+def _reference_matches(gm):
+    """The per-group rules of match_chromosomes, applied one group at a time."""
+    expected = []
+    for chr_number, chrome in gm.chromosome_models.items():
+        for gparent in gm.grandparentsByName:
+            excluded = {c.kit for c in gm.cousinByKit.values() if c.grandparent != gparent}
+            for overlap in chrome.overlapsByGrandparent.get(gparent, []):
+                best = overlap.sibling_kits[0]
+                if best not in gm.siblingsByKit:
+                    continue
+                rows = [t for t in chrome.triang_graph.sibling_table(best)
+                        if overlap.B37_Start <= t.B37_Start <= overlap.B37_End and t.B37_End <= overlap.B37_End]
+                rows.sort(key=lambda t: (t.Kit1_Number, t.B37_Start, t.B37_End))
+                groups = {}
+                for t in rows:
+                    groups.setdefault(t.Kit1_Number, []).append(t)
+                for kit1, group in groups.items():
+                    siblings_seen = {t.Kit2_Number for t in group if t.Kit2_Number in gm.siblingsByKit}
+                    if (set(overlap.sibling_kits) - {best} <= siblings_seen <= set(overlap.sibling_kits)
+                            and not any(t.Kit2_Number in excluded for t in group)
+                            and kit1 not in excluded and kit1 not in gm.siblingsByKit):
+                        for t in group:
+                            t.grandparent = gparent
+                            t.source_sibling = best
+                            expected.append(t)
+    return expected
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_group_filter_matches_reference(seed):
+    """Random families: the bitmask group filter keeps exactly the groups the per-group rules keep."""
+    import random
+    rng = random.Random(seed)
+    siblings = {f"kit-{n}": make_sibling(f"Sib{n}", f"kit-{n}") for n in range(4)}
+    grandparents = {"Smith": make_grandparent("Smith"), "Jones": make_grandparent("Jones")}
+    cousins = [make_cousin("CuzS", "kit-cuz-s", "Smith"), make_cousin("CuzJ", "kit-cuz-j", "Jones")]
+    # "kit-extra" has grandparent segments but is not a sibling
+    segment_kits = list(siblings) + ["kit-extra"]
+    segments = [make_segment(rng.randint(1, 2), kit, kit, rng.choice(list(grandparents)), start, start + rng.randint(50, 500))
+                for kit in segment_kits for start in rng.sample(range(0, 1000, 10), 3)]
+    kit1s = ["kit-s1", "kit-s2", "kit-s3", "kit-cuz-s", "kit-cuz-j", "kit-1"]
+    kit2s = list(siblings) + ["kit-cuz-s", "kit-cuz-j", "kit-s9"]
+    triangulations = {}
+    for kit in siblings:
+        triangs = []
+        for _ in range(60):
+            start = rng.randint(0, 1400)
+            triangs.append(make_triang(rng.randint(1, 2), rng.choice(kit1s), rng.choice(kit2s), start,
+                                       start + rng.randint(1, 100), cm="7"))
+        triangulations[kit] = triangs
+
+    gm = build_grand_match(
+        siblings_by_kit=siblings,
+        siblings_by_name={s.name: s for s in siblings.values()},
+        grandparents_by_name=grandparents,
+        cousins_by_kit={c.kit: c for c in cousins},
+        cousins_by_name={c.name: c for c in cousins},
+        segments=segments,
+        triangulations_by_sibling=triangulations,
+    )
+
+    assert gm.match_chromosomes() == _reference_matches(gm)
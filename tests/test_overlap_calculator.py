@@ -1,8 +1,91 @@
 """Tests for OverlapCalculator.calculate_overlaps()"""
-from grand_match import OverlapCalculator
+import random
+from dataclasses import dataclass
+from enum import Enum
+from typing import List
+
+import pytest
+
+from grand_match import GrandparentSegment, OverlapCalculator, SiblingOverlap
 from tests.conftest import make_segment
 
 
+class MilestoneType(Enum):
+    START = 1
+    END = 2
+
+
+@dataclass
+class Milestone:
+    segment: GrandparentSegment
+    milestone_type: MilestoneType
+    event_number: int = 0
+    is_active: bool = False
+
+
+def reference_overlaps(segment_list: List[GrandparentSegment]) -> List[SiblingOverlap]:
+    """The original milestone-rescanning algorithm, kept as the oracle for the sweep-line version."""
+    non_active_milestones: List[Milestone] = []
+    largest: int = 0
+    for segment in segment_list:
+        non_active_milestones.append(Milestone(segment=segment, milestone_type=MilestoneType.START, event_number=segment.B37_Start))
+        non_active_milestones.append(Milestone(segment=segment, milestone_type=MilestoneType.END, event_number=segment.B37_End))
+        largest = max(segment.B37_End, largest)
+
+    sorted_milestones = sorted(non_active_milestones, key=lambda m: m.event_number)
+    overlaps = []
+    activated_segments: List[GrandparentSegment] = []
+    active_event_number: int = 0
+    while active_event_number < largest:
+        for m in sorted_milestones:
+            if m.event_number > active_event_number:
+                break
+            if not m.is_active and m.event_number == active_event_number:
+                m.is_active = True
+                activated_segments.append(m.segment)
+
+        overlap_end = next(m.event_number for m in sorted_milestones if not m.is_active)
+        milestones_to_deactivate: List[Milestone] = []
+        for m in sorted_milestones:
+            if m.milestone_type == MilestoneType.END and m.event_number == overlap_end:
+                m.is_active = True
+                milestones_to_deactivate.append(m)
+
+        if len(activated_segments) > 0:
+            overlap_start = max(max(seg.B37_Start for seg in activated_segments), active_event_number)
+            overlap_segments = activated_segments[:]
+            overlaps.append(SiblingOverlap(segments=overlap_segments, B37_Start=overlap_start, B37_End=overlap_end,
+                                           Chr=activated_segments[0].Chr, Grandparent=activated_segments[0].Grandparent,
+                                           sibling_kits=[s.Kit for s in overlap_segments]))
+            for m in milestones_to_deactivate:
+                for seg in activated_segments:
+                    if seg == m.segment:
+                        activated_segments.remove(seg)
+
+        active_event_number = overlap_end
+
+    return overlaps
+
+
+def random_segments(rng: random.Random) -> List[GrandparentSegment]:
+    # a small coordinate range forces shared boundaries, duplicates and zero-length segments
+    segments = []
+    for _ in range(rng.randint(0, 12)):
+        start = rng.randint(1, 40)
+        end = start + rng.choice([0, rng.randint(1, 5), rng.randint(1, 40)])
+        kit = rng.choice(["kit-A", "kit-B", "kit-C", "kit-D"])
+        segments.append(make_segment(1, kit.upper(), kit, "Smith", start, end))
+    return segments
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_matches_reference_algorithm(seed):
+    """The sweep-line overlaps equal the original algorithm's for random segment sets."""
+    segments = random_segments(random.Random(seed))
+
+    assert OverlapCalculator(segments).calculate_overlaps() == reference_overlaps(segments)
+
+
 def test_two_overlapping_segments():
     """Two siblings share an overlapping region → one overlap covering the intersection."""
     segments = [
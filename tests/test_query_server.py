@@ -0,0 +1,114 @@
+"""Scripted client for the local query server"""
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from grand_match.query_server import MatchQueryService, QueryServer
+from tests.conftest import build_grand_match, make_cousin, make_grandparent, make_segment, make_sibling, make_triang
+
+
+def _loader(inputs):
+    """Builds the family from `inputs`, so a test can change them before a reload."""
+    def load():
+        siblings = {"kit-A": make_sibling("Alice", "kit-A"), "kit-B": make_sibling("Bob", "kit-B"),
+                    "kit-C": make_sibling("Carol", "kit-C")}
+        cousins = [make_cousin("Cuz", "kit-cuz", "Smith")]
+        return build_grand_match(
+            siblings_by_kit=siblings,
+            siblings_by_name={s.name: s for s in siblings.values()},
+            grandparents_by_name={"Smith": make_grandparent("Smith"), "Jones": make_grandparent("Jones")},
+            cousins_by_kit={c.kit: c for c in cousins},
+            cousins_by_name={c.name: c for c in cousins},
+            segments=[make_segment(9, "Alice", "kit-A", "Smith", 100, 1000),
+                      make_segment(9, "Bob", "kit-B", "Smith", 200, inputs["bob_end"]),
+                      make_segment(9, "Carol", "kit-C", "Jones", 100, 1000),
+                      make_segment(2, "Alice", "kit-A", "Jones", 100, 1000),
+                      make_segment(2, "Carol", "kit-C", "Jones", 100, 1000)],
+            triangulations_by_sibling={
+                "kit-A": [make_triang(9, "kit-cuz", "kit-B", 300, 600, kit1_name="Cuz"),
+                          make_triang(9, "kit-x", "kit-B", 700, 750, kit1_name="X"),
+                          make_triang(2, "kit-y", "kit-C", 300, 600, kit1_name="Y")],
+                "kit-B": [], "kit-C": [make_triang(9, "kit-cuz", "kit-z", 300, 500, kit1_name="Cuz")]},
+        )
+    return load
+
+
+@pytest.fixture
+def server():
+    inputs = {"bob_end": 650}
+    service = MatchQueryService(_loader(inputs))
+    server = QueryServer(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.inputs = inputs
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get(server, path):
+    with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}{path}") as response:
+        return json.load(response)
+
+
+def _post(server, path):
+    request = urllib.request.Request(f"http://127.0.0.1:{server.server_address[1]}{path}", method="POST")
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)
+
+
+def test_cousins_by_chromosome_grandparent_and_siblings(server):
+    answer = _get(server, "/cousins?chr=9&grandparent=Smith&siblings=Alice,Bob")
+
+    assert [(c["kit"], c["chr"], c["grandparent"], c["siblings"]) for c in answer["cousins"]] == \
+           [("kit-cuz", 9, "Smith", "Alice|Bob")]
+    assert _get(server, "/cousins?chr=9&grandparent=Smith&siblings=Carol")["cousins"] == []
+    assert answer["cousins"][0]["clusters"] == "1"
+
+
+def test_matches_by_kit_and_sibling_kit(server):
+    by_kit = _get(server, "/matches?kit=kit-y")["matches"]
+    by_sibling_kit = _get(server, "/matches?siblings=kit-C")["matches"]
+
+    assert [(m["Chr"], m["grandparent"], m["B37_Start"], m["overlap_siblings"]) for m in by_kit] == \
+           [(2, "Jones", 300, ["Alice", "Carol"])]
+    assert by_sibling_kit == by_kit
+
+
+def test_overlaps_and_status(server):
+    overlaps = _get(server, "/overlaps?chr=9&grandparent=Smith")["overlaps"]
+    shared = _get(server, "/overlaps?chr=9&grandparent=Smith&siblings=Bob")["overlaps"]
+    status = _get(server, "/status")
+
+    assert [(o["B37_Start"], o["B37_End"], sorted(o["siblings"])) for o in overlaps] == \
+           [(100, 200, ["Alice"]), (200, 650, ["Alice", "Bob"]), (650, 1000, ["Alice"])]
+    assert shared == overlaps[1:2]
+    assert status["matches"] == 2
+
+
+def test_reload_picks_up_changed_inputs(server):
+    assert _get(server, "/matches?kit=kit-x")["matches"] == []
+
+    server.inputs["bob_end"] = 800
+    status = _post(server, "/reload")
+
+    assert status["matches"] == 3
+    assert [m["B37_Start"] for m in _get(server, "/matches?kit=kit-x")["matches"]] == [700]
+
+
+@pytest.mark.parametrize("path, status", [
+    ("/matches?siblings=Nobody", 400),
+    ("/cousins?grandparent=Nobody", 400),
+    ("/matches?chr=nine", 400),
+    ("/matches?colour=red", 400),
+    ("/nowhere", 404),
+])
+def test_bad_requests(server, path, status):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        _get(server, path)
+
+    assert error.value.code == status
+    assert "error" in json.load(error.value)
@@ -0,0 +1,86 @@
+"""Tests for RunReport stage instrumentation"""
+import json
+import pstats
+import sys
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from grand_match import RunReport
+
+
+def test_stage_records_rows_time_and_memory():
+    report = RunReport(trace_memory=True)
+
+    with report.stage("allocate", rows_in=10) as stage:
+        kept = np.ones(1_000_000, dtype=np.int64)
+        stage.rows_out = len(kept)
+
+    stage = report.stages[0]
+    assert (stage.name, stage.rows_in, stage.rows_out) == ("allocate", 10, 1_000_000)
+    assert stage.wall_seconds >= 0 and stage.cpu_seconds >= 0
+    assert stage.peak_memory_bytes >= kept.nbytes
+    assert stage.retained_memory_bytes >= kept.nbytes
+    assert not tracemalloc.is_tracing()
+
+
+def test_stage_with_workers_reports_parent_memory_only():
+    report = RunReport(trace_memory=True)
+
+    with report.stage("pooled", workers=2):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            list(executor.map(abs, [-1, -2]))
+    with report.stage("serial"):
+        pass
+
+    pooled, serial = report.stages
+    assert (pooled.workers, pooled.memory_scope) == (2, "parent only")
+    assert serial.memory_scope == "process" and serial.worker_peak_rss_bytes is None
+    if sys.platform != "win32":
+        assert pooled.worker_peak_rss_bytes > 0
+
+
+def test_resident_memory_is_recorded_without_tracing():
+    report = RunReport()
+
+    with report.stage("quiet"):
+        pass
+    with report.stage("allocate"):
+        np.ones(50_000_000, dtype=np.int8)
+
+    quiet, allocate = report.stages
+    assert quiet.peak_memory_bytes is None and not tracemalloc.is_tracing()
+    if sys.platform != "win32":
+        # the high-water mark only grows once the stage passes the peak of everything run before it
+        assert allocate.peak_rss_bytes >= quiet.peak_rss_bytes > 0
+        assert allocate.peak_rss_growth_bytes == allocate.peak_rss_bytes - quiet.peak_rss_bytes
+
+
+def test_failed_stage_is_still_recorded():
+    report = RunReport()
+
+    with pytest.raises(ValueError):
+        with report.stage("broken"):
+            raise ValueError("bad input")
+
+    assert [stage.name for stage in report.stages] == ["broken"]
+    assert not tracemalloc.is_tracing()
+
+
+def test_write_json_with_profiles(tmp_path):
+    report = RunReport(profile_dir=str(tmp_path / "profiles"))
+    with report.stage("first"):
+        sorted(range(1000), reverse=True)
+    with report.stage("second"):
+        pass
+
+    report.write(str(tmp_path / "out" / "run_report.json"))
+
+    with open(str(tmp_path / "out" / "run_report.json")) as f:
+        data = json.load(f)
+    assert [stage["name"] for stage in data["stages"]] == ["first", "second"]
+    assert data["total_wall_seconds"] == pytest.approx(sum(stage["wall_seconds"] for stage in data["stages"]))
+    assert data["stages"][0]["profile_path"].endswith("01_first.pstats")
+    assert pstats.Stats(data["stages"][0]["profile_path"]).total_calls > 0
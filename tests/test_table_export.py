@@ -0,0 +1,117 @@
+"""Tests for TableExporter, the streaming CSV writers and GrandMatch.export_overlaps() layouts"""
+import csv
+import os
+from dataclasses import asdict, fields
+
+import pandas as pd
+import pytest
+
+from grand_match import CompactTriang, TableExporter
+from grand_match.table_export import write_models_csv
+from tests.conftest import make_grandparent, make_segment, make_sibling, make_triang, build_grand_match
+
+
+def _grand_match():
+    siblings = {"kit-A": make_sibling("Alice", "kit-A"), "kit-B": make_sibling("Bob", "kit-B")}
+    return build_grand_match(
+        siblings_by_kit=siblings,
+        siblings_by_name={s.name: s for s in siblings.values()},
+        grandparents_by_name={"Smith": make_grandparent("Smith")},
+        cousins_by_kit={},
+        cousins_by_name={},
+        segments=[make_segment(1, "Alice", "kit-A", "Smith", 100, 1000),
+                  make_segment(2, "Bob", "kit-B", "Smith", 200, 800)],
+        triangulations_by_sibling={"kit-A": [make_triang(1, "kit-x", "kit-B", 300, 600, kit1_name='Smith, "Jr"')],
+                                   "kit-B": [make_triang(2, "kit-y", "kit-A", 300, 600)]},
+    )
+
+
+def test_csv_matches_pandas(tmp_path):
+    """CSV output is byte-identical to DataFrame.to_csv(index=False)."""
+    columns = {"Chr": [1, 23], "Name": ['Smith, "Jr"', ""], "kits": [["kit-A", "kit-B"], []], "cM": ["11.8", "7"]}
+    path = str(tmp_path / "table.csv")
+
+    TableExporter().write(path, columns)
+    pd.DataFrame(columns).to_csv(str(tmp_path / "pandas.csv"), index=False)
+
+    with open(path, 'rb') as ours, open(str(tmp_path / "pandas.csv"), 'rb') as theirs:
+        assert ours.read() == theirs.read()
+
+
+def test_streamed_matches_csv_matches_pandas(tmp_path):
+    """Streaming matched triangulations from a generator writes what the DataFrame export wrote."""
+    siblings = {"kit-A": make_sibling("Alice", "kit-A"), "kit-B": make_sibling("Bob", "kit-B")}
+    gm = build_grand_match(
+        siblings_by_kit=siblings,
+        siblings_by_name={s.name: s for s in siblings.values()},
+        grandparents_by_name={"Smith": make_grandparent("Smith")},
+        cousins_by_kit={},
+        cousins_by_name={},
+        segments=[make_segment(1, "Alice", "kit-A", "Smith", 100, 1000),
+                  make_segment(1, "Bob", "kit-B", "Smith", 200, 800)],
+        triangulations_by_sibling={"kit-A": [make_triang(1, "kit-x", "kit-B", 300, 600, kit1_name='Smith, "Jr"'),
+                                             make_triang(1, "kit-y", "kit-B", 400, 500, cm="7")],
+                                   "kit-B": []},
+    )
+    matches = [triang.to_triang() for triang in gm.match_chromosomes()]
+    assert len(matches) == 2
+
+    gm.export_triangs_to_csv(gm.iter_matches(), str(tmp_path))
+    pd.DataFrame([asdict(t) for t in matches]).to_csv(str(tmp_path / "pandas.csv"), index=False)
+
+    with open(str(tmp_path / "matched_triangulations.csv"), 'rb') as ours, open(str(tmp_path / "pandas.csv"), 'rb') as theirs:
+        assert ours.read() == theirs.read()
+
+
+def test_streamed_csv_without_rows_matches_pandas(tmp_path):
+    """No rows at all writes a lone line break, like an empty DataFrame."""
+    path = str(tmp_path / "empty.csv")
+
+    write_models_csv(path, iter([]))
+
+    with open(path, 'rb') as f:
+        assert f.read() == pd.DataFrame([]).to_csv(index=False).encode()
+
+
+def test_compact_models_write_the_same_csv(tmp_path):
+    """A Compact variant has no __dict__ but the same fields, so it streams to the same CSV."""
+    triang = make_triang(1, "kit-x", "kit-B", 300, 600, kit1_name='Smith, "Jr"')
+    compact = CompactTriang(**vars(triang))
+
+    assert not hasattr(compact, "__dict__")
+    assert [f.name for f in fields(compact)] == list(vars(triang))
+
+    write_models_csv(str(tmp_path / "dict.csv"), [triang])
+    write_models_csv(str(tmp_path / "compact.csv"), [compact])
+    with open(str(tmp_path / "dict.csv"), 'rb') as ours, open(str(tmp_path / "compact.csv"), 'rb') as theirs:
+        assert ours.read() == theirs.read()
+
+
+def test_consolidated_layout_writes_each_table_once(tmp_path):
+    gm = _grand_match()
+
+    gm.export_overlaps(str(tmp_path), layout="consolidated", workers=2)
+
+    assert sorted(os.listdir(tmp_path)) == ["overlaps.csv", "segments.csv", "triangulations.csv"]
+    with open(tmp_path / "triangulations.csv", newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [(r["sibling_kit"], r["Chr"], r["Kit1_Number"]) for r in rows] == [("kit-A", "1", "kit-x"), ("kit-B", "2", "kit-y")]
+    assert rows[0]["Kit1_Name"] == 'Smith, "Jr"'
+    with open(tmp_path / "overlaps.csv", newline='') as f:
+        assert [(r["Chr"], r["Grandparent"], r["sibling_kits"]) for r in csv.DictReader(f)] == [("1", "Smith", "kit-A"), ("2", "Smith", "kit-B")]
+
+
+def test_legacy_layout_keeps_per_file_csvs(tmp_path):
+    gm = _grand_match()
+
+    gm.export_overlaps(str(tmp_path))
+
+    assert sorted(os.listdir(tmp_path)) == sorted([
+        "triangs-kit-A.csv", "triangs-kit-B.csv", "all_overlaps.csv",
+        "overlaps-1-Smith.csv", "segments-1-Smith.csv", "overlaps-2-Smith.csv", "segments-2-Smith.csv",
+        "triangs-1-kit-A.csv", "triangs-1-kit-B.csv", "triangs-2-kit-A.csv", "triangs-2-kit-B.csv"])
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        TableExporter("xlsx")
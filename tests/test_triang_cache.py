@@ -0,0 +1,88 @@
+"""Tests for the on-disk TriangCache."""
+import os
+from grand_match import TriangCache, TriangFilter, TriagImporter
+from grand_match.chromosome_offset_index import ChromosomeOffsetIndex
+from grand_match.grand_match import _load_triangulation
+
+HEADER = "Chr,Kit1 Number,Kit1 Name,Kit1 Email,Kit2 Number,Kit2 Name,Kit2 Email,B37 Start,B37 End,cM\n"
+ROW_1 = '1,kit-x,"*X",x@example.com,kit-B,"Bob",b@example.com,100,200,11.8\n'
+ROW_2 = '2,kit-y,"*Y",y@example.com,kit-B,"Bob",b@example.com,300,400,24\n'
+ROW_3 = '3,kit-z,"*Z",z@example.com,kit-B,"Bob",b@example.com,500,600,30.0\n'
+
+
+def _write_and_cache(tmp_path, content):
+    csv_path = tmp_path / "kit-A.csv"
+    csv_path.write_text(content)
+    cache = TriangCache(str(tmp_path / "cache"))
+    cache.store(str(csv_path), TriagImporter().createTable(str(csv_path)))
+    return csv_path, cache
+
+
+def test_load_returns_stored_table(tmp_path):
+    csv_path, cache = _write_and_cache(tmp_path, HEADER + ROW_1 + ROW_2)
+
+    table = cache.load(str(csv_path))
+
+    assert table is not None
+    assert list(table) == TriagImporter().createList(str(csv_path))
+
+
+def test_missing_entry_returns_none(tmp_path):
+    csv_path = tmp_path / "kit-A.csv"
+    csv_path.write_text(HEADER + ROW_1)
+
+    assert TriangCache(str(tmp_path / "cache")).load(str(csv_path)) is None
+
+
+def test_changed_file_invalidates_entry(tmp_path):
+    csv_path, cache = _write_and_cache(tmp_path, HEADER + ROW_1)
+
+    csv_path.write_text(HEADER + ROW_1 + ROW_2)
+
+    assert cache.load(str(csv_path)) is None
+
+
+def test_touched_file_with_same_content_stays_valid(tmp_path):
+    csv_path, cache = _write_and_cache(tmp_path, HEADER + ROW_1)
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+    table = cache.load(str(csv_path))
+
+    assert table is not None
+    assert len(table) == 1
+
+
+def test_entry_of_some_chromosomes_only_serves_those(tmp_path):
+    csv_path = tmp_path / "kit-A.csv"
+    csv_path.write_text(HEADER + ROW_1 + ROW_2)
+    cache = TriangCache(str(tmp_path / "cache"))
+    cache.store(str(csv_path), TriagImporter().createTable(str(csv_path), {1}), chromosomes={1})
+
+    assert len(cache.load(str(csv_path), {1})) == 1
+    assert cache.load(str(csv_path), {1, 2}) is None
+    assert cache.load(str(csv_path)) is None
+
+
+def test_cache_miss_with_index_parses_enabled_chromosomes(tmp_path):
+    csv_path = tmp_path / "kit-A.csv"
+    csv_path.write_text(HEADER + ROW_1 + ROW_2)
+    cache_dir = str(tmp_path / "cache")
+
+    table = _load_triangulation(str(csv_path), {2}, cache_dir, use_index=True)
+
+    assert table.Chr.tolist() == [2]
+    assert os.path.exists(ChromosomeOffsetIndex.sidecar_path(str(csv_path)))
+    assert TriangCache(cache_dir).load(str(csv_path), {2}) is not None
+    assert _load_triangulation(str(csv_path), None, cache_dir, use_index=True).Chr.tolist() == [1, 2]
+    assert len(TriangCache(cache_dir).load(str(csv_path))) == 2
+
+
+def test_load_applies_the_filter_before_reading_the_rest(tmp_path):
+    csv_path, cache = _write_and_cache(tmp_path, HEADER + ROW_1 + ROW_2 + ROW_3)
+    row_filter = TriangFilter(min_cm=12)
+
+    table = cache.load(str(csv_path), {1, 2}, row_filter)
+
+    assert list(table) == TriagImporter(row_filter=row_filter).createList(str(csv_path), {1, 2})
+    assert "*X" not in table.strings.codes and "kit-x" not in table.kits.codes
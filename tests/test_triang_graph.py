@@ -0,0 +1,150 @@
+"""Tests for the deduplicated TriangGraph and its TriangGraphIndex"""
+import random
+
+import numpy as np
+import pytest
+
+from grand_match import KitRegistry, StringPool, TriangGraph, TriangGraphIndex, TriangTable
+from tests.conftest import build_grand_match, make_segment, make_triang
+
+
+def _tables(triangsBySibling):
+    strings, kits = StringPool(), KitRegistry()
+    return {kit: TriangTable.from_triangs(triangs, strings, kits) for kit, triangs in triangsBySibling.items()}
+
+
+def _edge(graph, edge):
+    return graph.edges.row(edge)
+
+
+def _random_triangs(rng, count, chromosomes=(1,), max_start=1000):
+    # few kits and positions, so rows repeat within and across the files
+    triangs = []
+    for _ in range(count):
+        start = rng.randint(1, max_start)
+        triangs.append(make_triang(rng.choice(chromosomes), rng.choice(["kit-z", "kit-a", "kit-m"]),
+                                   rng.choice(["kit-A", "kit-B", "kit-C"]), start, start + rng.randint(0, 3) * 50,
+                                   cm=rng.choice(["10", "12.5"])))
+    return triangs
+
+
+def test_rows_in_several_files_are_one_edge():
+    """A segment exported by two siblings is stored once, and both siblings' rows map to it."""
+    shared = make_triang(9, "A007726", "CY3190461", 100, 200, cm="11.8")
+    tables = _tables({"kit-A": [shared, make_triang(9, "kit-x", "kit-B", 300, 400)],
+                      "kit-B": [make_triang(2, "kit-y", "kit-A", 50, 60), shared]})
+
+    graph = TriangGraph.build(tables)
+
+    assert len(graph) == 3 and graph.row_count() == 4
+    edge = graph.edge_rows["kit-A"][0]
+    assert graph.edge_rows["kit-B"][1] == edge
+    assert _edge(graph, edge) == shared
+    assert graph.edge_rows["kit-B"].tolist() == [0, edge]
+    assert graph.edges.B37_Start.dtype == graph.edges.B37_End.dtype == np.int32
+    # edges are ordered by chromosome and start
+    assert [(int(chr), int(start)) for chr, start in zip(graph.edges.Chr, graph.edges.B37_Start)] == [(2, 50), (9, 100), (9, 300)]
+    # one bit per sibling that reported the edge
+    assert graph.reporters.tolist() == [0b10, 0b11, 0b01]
+    assert (graph.reporter_bit("kit-B"), graph.reporter_bit("kit-Z")) == (0b10, 0)
+
+
+@pytest.mark.parametrize("max_start", [1000, 1 << 30])
+def test_edge_rows_rebuild_each_file(max_start):
+    """Every sibling's table reads back from the graph in file order, and equal rows share an edge;
+    positions too large for the sort key go through the exact sort."""
+    rng = random.Random(3)
+    triangsBySibling = {kit: _random_triangs(rng, 400, chromosomes=(1, 2, 23), max_start=max_start)
+                        for kit in ["kit-A", "kit-B", "kit-C"]}
+    graph = TriangGraph.build(_tables(triangsBySibling))
+
+    edgeByRow = {}
+    for kit, triangs in triangsBySibling.items():
+        assert list(graph.sibling_table(kit)) == triangs
+        for t, edge in zip(triangs, graph.edge_rows[kit].tolist()):
+            assert edgeByRow.setdefault(tuple(vars(t).values()), edge) == edge
+    assert len(graph) == len(edgeByRow)
+
+
+def test_rows_differing_in_any_column_are_different_edges():
+    """Rows differing only in how the cM is spelled or in a name stay apart, so each file reads back unchanged."""
+    rows = [make_triang(1, "kit-x", "kit-y", 100, 200, cm="12.5"),
+            make_triang(1, "kit-x", "kit-y", 100, 200, cm="12.50"),
+            make_triang(1, "kit-x", "kit-y", 100, 200, cm="12.5")]
+    rows[2].Kit1_Name = "Other spelling"
+
+    graph = TriangGraph.build(_tables({"kit-A": rows, "kit-B": rows[:1]}))
+
+    assert len(graph) == 3
+    assert list(graph.sibling_table("kit-A")) == rows
+    assert graph.edge_rows["kit-B"].tolist() == graph.edge_rows["kit-A"][:1].tolist()
+
+
+def test_partition_lines_up_with_sibling_tables():
+    """Each chromosome's part is a view of the edges, with every sibling's rows on it in file order."""
+    rng = random.Random(5)
+    triangsBySibling = {kit: _random_triangs(rng, 300, chromosomes=(1, 5, 23)) for kit in ["kit-A", "kit-B"]}
+    graph = TriangGraph.build(_tables(triangsBySibling))
+
+    parts = graph.partition_by_chromosome([1, 5, 7, 23])
+
+    assert len(parts[7]) == 0 and parts[7].edge_rows["kit-A"].tolist() == []
+    for chr_number in (1, 5, 23):
+        part = parts[chr_number]
+        assert part.edges.B37_Start.base is graph.edges.B37_Start
+        for kit, triangs in triangsBySibling.items():
+            assert list(part.sibling_table(kit)) == [t for t in triangs if t.Chr == chr_number]
+            assert (part.reporters[part.edge_rows[kit]] & part.reporter_bit(kit) != 0).all()
+
+
+def test_more_than_64_siblings():
+    tables = _tables({f"kit-{n}": [make_triang(1, "kit-x", "kit-y", 100, 200)] for n in range(70)})
+
+    graph = TriangGraph.build(tables)
+
+    assert len(graph) == 1
+    assert all(rows.tolist() == [0] for rows in graph.edge_rows.values())
+    assert graph.reporters.dtype == object and graph.reporters[0] == (1 << 70) - 1
+
+
+def test_contained_matches_full_scan():
+    """The shared index finds the rows a full (Kit1, start, end)-sorted scan of each sibling's table keeps,
+    in that order, an edge in the file twice included twice."""
+    rng = random.Random(7)
+    triangsBySibling = {kit: _random_triangs(rng, 300) for kit in ["kit-A", "kit-B", "kit-C"]}
+    tables = _tables(triangsBySibling)
+    kit_ranks = next(iter(tables.values())).kits.sort_ranks()
+    graph = TriangGraph.build(tables)
+    index = TriangGraphIndex(graph, kit_ranks)
+    sortedRows = {kit: np.lexsort((table.B37_End, table.B37_Start, kit_ranks[table.Kit1_Number])).tolist()
+                  for kit, table in tables.items()}
+
+    for _ in range(200):
+        start = rng.randint(0, 1100)
+        end = start + rng.randint(0, 400)
+        for kit, table in tables.items():
+            expected = [triangsBySibling[kit][i] for i in sortedRows[kit]
+                        if start <= table.B37_Start[i] <= end and table.B37_End[i] <= end]
+            assert [graph.edges.row(edge) for edge in index.contained(kit, start, end).tolist()] == expected
+
+
+def test_contained_on_empty_graph():
+    index = TriangGraphIndex(TriangGraph.build({"kit-A": TriangTable()}), np.empty(0, dtype=np.int64))
+
+    assert index.contained("kit-A", 100, 200).tolist() == []
+
+
+def test_grand_match_builds_the_graph(siblings_by_kit, siblings_by_name, grandparents_by_name,
+                                      cousins_by_kit, cousins_by_name):
+    shared = make_triang(1, "kit-x", "kit-C", 300, 600)
+    gm = build_grand_match(
+        siblings_by_kit, siblings_by_name, grandparents_by_name, cousins_by_kit, cousins_by_name,
+        segments=[make_segment(1, "Alice", "kit-A", "Smith", 100, 1000)],
+        triangulations_by_sibling={"kit-A": [shared], "kit-B": [shared], "kit-C": []},
+    )
+
+    assert len(gm.triang_graph) == 1
+    assert gm.triang_graph.edge_rows["kit-A"].tolist() == gm.triang_graph.edge_rows["kit-B"].tolist() == [0]
+    assert len(gm.chromosome_models[1].triang_graph) == 1
+    # the graph is the only copy of the rows
+    assert gm.triangulationBySiblingKit == {}
@@ -0,0 +1,202 @@
+"""Tests for the columnar TriangTable and TriagImporter.createTable()"""
+import numpy as np
+from grand_match import ChromosomeSetting, GrandMatch, KitRegistry, StringPool, TriangFilter, TriangTable, TriagImporter
+from tests.conftest import build_grand_match, make_grandparent, make_segment, make_sibling, make_triang
+
+HEADER = "Chr,Kit1 Number,Kit1 Name,Kit1 Email,Kit2 Number,Kit2 Name,Kit2 Email,B37 Start,B37 End,cM\n"
+
+
+def test_round_trip_from_triangs():
+    """Rows materialized from the table equal the Triang objects it was built from."""
+    triangs = [
+        make_triang(1, "kit-x", "kit-B", 100, 200, cm="11.8"),
+        make_triang(23, "kit-y", "kit-x", 300, 400, cm="24"),
+    ]
+    table = TriangTable.from_triangs(triangs)
+
+    assert len(table) == 2
+    assert list(table) == triangs
+
+
+def test_kit_columns_share_registry_ids():
+    """The same kit appearing as Kit1 and Kit2 is interned to one registry id."""
+    table = TriangTable.from_triangs([make_triang(1, "kit-x", "kit-B", 100, 200),
+                                      make_triang(1, "kit-B", "kit-x", 100, 200)])
+
+    assert table.Kit1_Number[0] == table.Kit2_Number[1]
+    assert table.Kit2_Number[0] == table.Kit1_Number[1]
+
+
+def test_rebind_translates_codes():
+    """Rebinding into another pool keeps the decoded values unchanged."""
+    table = TriangTable.from_triangs([make_triang(1, "kit-x", "kit-B", 100, 200)])
+    other_strings = StringPool(["unrelated"])
+    other_kits = KitRegistry(["kit-B", "kit-other"])
+
+    rebound = table.rebind(other_strings, other_kits)
+
+    assert rebound.strings is other_strings
+    assert rebound.kits is other_kits
+    assert rebound.Kit2_Number[0] == 0
+    assert list(rebound) == list(table)
+
+
+def test_kit_registry_mask():
+    """A registry mask is indexed by kit id and marks only the requested kits."""
+    registry = KitRegistry()
+    ids = registry.ids(["kit-A", "kit-B", "kit-C"])
+
+    mask = registry.mask(["kit-C", "kit-A"])
+
+    assert ids == [0, 1, 2]
+    assert mask.tolist() == [True, False, True]
+
+
+def test_create_table_reads_csv(tmp_path):
+    """The importer converts X to 23, filters disabled chromosomes and types the columns."""
+    path = tmp_path / "kit-A.csv"
+    path.write_text(HEADER
+                    + '1,kit-x,"*X",x@example.com,kit-B,"Bob",b@example.com,100,200,11.8\n'
+                    + 'X,kit-y,"*Y",y@example.com,kit-B,"Bob",b@example.com,300,400,24\n'
+                    + '2,kit-z,"*Z",z@example.com,kit-B,"Bob",b@example.com,500,600,7\n')
+
+    table = TriagImporter().createTable(str(path), enabled_chromosomes={1, 23})
+
+    assert table.Chr.tolist() == [1, 23]
+    assert table.B37_Start.dtype == np.int64
+    assert table.row(1).Kit1_Name == "*Y"
+    assert table.row(1).cM == "24"
+
+
+def test_cm_keeps_its_original_text(tmp_path):
+    """cM is filtered on its value but read back and written out exactly as the CSV spelled it."""
+    path = tmp_path / "kit-A.csv"
+    path.write_text(HEADER
+                    + '1,kit-x,"*X",x@example.com,kit-B,"Bob",b@example.com,100,200,11.0\n'
+                    + '1,kit-y,"*Y",y@example.com,kit-B,"Bob",b@example.com,300,400,7.50\n'
+                    + '1,kit-z,"*Z",z@example.com,kit-B,"Bob",b@example.com,500,600,4.90\n')
+
+    table = TriagImporter(row_filter=TriangFilter(min_cm=5)).createTable(str(path))
+
+    assert table.cM.tolist() == [11.0, 7.5]
+    assert [t.cM for t in table] == ["11.0", "7.50"]
+    assert table.columns()["cM"].tolist() == ["11.0", "7.50"]
+    assert "cM_Text" not in table.columns()
+
+
+def test_row_filter_skips_rows_while_parsing(tmp_path):
+    """Rows below min_cm, with an excluded Kit1 or outside the windows are never interned."""
+    path = tmp_path / "kit-A.csv"
+    path.write_text(HEADER
+                    + '1,kit-x,"*X",x@example.com,kit-B,"Bob",b@example.com,100,200,11.8\n'
+                    + '1,kit-B,"Bob",b@example.com,kit-C,"Carol",c@example.com,100,200,30\n'
+                    + '1,kit-y,"*Y",y@example.com,kit-B,"Bob",b@example.com,150,400,24\n'
+                    + '1,kit-w,"*W",w@example.com,kit-B,"Bob",b@example.com,300,500,3.5\n'
+                    + '2,kit-z,"*Z",z@example.com,kit-B,"Bob",b@example.com,500,600,7\n')
+    row_filter = TriangFilter(min_cm=5, exclude_kit1={"kit-B"}, windows={1: [(0, 250), (200, 450)], 3: [(0, 1000)]})
+
+    table = TriagImporter(row_filter=row_filter).createTable(str(path))
+
+    assert [t.Kit1_Number for t in table] == ["kit-x", "kit-y"]
+    assert "*W" not in table.strings.codes and "Carol" not in table.strings.codes
+    assert row_filter.mask(TriagImporter().createTable(str(path))).tolist() == [True, False, True, False, False]
+
+
+def test_matching_filter_keeps_the_matches(tmp_path):
+    """Dropping rows of a sibling Kit1 or outside every grandparent segment changes no match."""
+    rows = {
+        "kit-A": '1,kit-x,"*X",x@example.com,kit-B,"Bob",b@example.com,100,200,11.8\n'
+                 '1,kit-B,"Bob",b@example.com,kit-x,"*X",x@example.com,100,200,11.8\n'
+                 '1,kit-y,"*Y",y@example.com,kit-B,"Bob",b@example.com,900,1200,24\n',
+        "kit-B": '1,kit-x,"*X",x@example.com,kit-A,"Alice",a@example.com,100,200,11.8\n'
+                 '2,kit-y,"*Y",y@example.com,kit-A,"Alice",a@example.com,300,400,24\n',
+    }
+    for kit, content in rows.items():
+        (tmp_path / f"{kit}.csv").write_text(HEADER + content)
+
+    results = []
+    for prefilter in (False, True):
+        gm = GrandMatch()
+        gm.siblingsByKit = {"kit-A": make_sibling("Alice", "kit-A"), "kit-B": make_sibling("Bob", "kit-B")}
+        gm.siblingsByName = {s.name: s for s in gm.siblingsByKit.values()}
+        gm.grandparentsByName = {"Smith": make_grandparent("Smith")}
+        gm.grandparent_segments = [make_segment(1, "Alice", "kit-A", "Smith", 50, 1000),
+                                   make_segment(1, "Bob", "kit-B", "Smith", 50, 1000)]
+        gm.get_triangulation(str(tmp_path), row_filter=gm.matching_filter() if prefilter else None)
+        gm.create_chromosome_models({1: ChromosomeSetting(chr=1, mode="Yes"), 2: ChromosomeSetting(chr=2, mode="Yes")})
+        gm.LoopOnChromosomeData()
+        results.append(([len(gm.triang_table(kit)) for kit in gm.siblingsByKit],
+                        [t.to_triang() for t in gm.match_chromosomes()]))
+
+    assert results[0][0] == [3, 2] and results[1][0] == [1, 1]
+    assert results[0][1] == results[1][1] and len(results[1][1]) == 1
+
+
+def test_parallel_import_matches_serial(tmp_path):
+    """Worker-pool import yields the same tables, in the same sibling order, as a serial import."""
+    rows = {
+        "kit-A": '1,kit-x,"*X",x@example.com,kit-B,"Bob",b@example.com,100,200,11.8\n',
+        "kit-B": '2,kit-y,"*Y",y@example.com,kit-A,"Alice",a@example.com,300,400,24\n'
+                 '1,kit-x,"*X",x@example.com,kit-A,"Alice",a@example.com,100,200,11.8\n',
+    }
+    for kit, content in rows.items():
+        (tmp_path / f"{kit}.csv").write_text(HEADER + content)
+
+    results = []
+    for workers in (1, 2):
+        gm = GrandMatch()
+        gm.siblingsByName = {"Alice": make_sibling("Alice", "kit-A"), "Bob": make_sibling("Bob", "kit-B")}
+        gm.get_triangulation(str(tmp_path), workers=workers, min_parallel_bytes=0)
+        results.append({kit: list(gm.triang_table(kit)) for kit in gm.triang_graph.edge_rows})
+
+    assert list(results[0].keys()) == list(results[1].keys())
+    assert results[0] == results[1]
+
+
+def test_small_imports_skip_the_process_pool(tmp_path, monkeypatch):
+    """Below min_parallel_bytes the CSVs are parsed in this process, whatever `workers` says."""
+    for kit in ("kit-A", "kit-B"):
+        (tmp_path / f"{kit}.csv").write_text(HEADER + '1,kit-x,"*X",x@example.com,kit-C,"C",c@example.com,100,200,11.8\n')
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("a process pool was started")
+    monkeypatch.setattr("grand_match.grand_match.ProcessPoolExecutor", no_pool)
+    gm = GrandMatch()
+    gm.siblingsByName = {"Alice": make_sibling("Alice", "kit-A"), "Bob": make_sibling("Bob", "kit-B")}
+    gm.get_triangulation(str(tmp_path), workers=4)
+
+    assert [len(gm.triang_table(kit)) for kit in gm.triang_graph.edge_rows] == [1, 1]
+
+
+def test_loop_on_chromosome_data_keeps_one_copy_of_each_table(siblings_by_kit, siblings_by_name, grandparents_by_name,
+                                                              cousins_by_kit, cousins_by_name):
+    """The graph is the only copy of the rows: chromosome parts are views of its edges, and a sibling's
+    table is gathered from it in file order."""
+    triangs = [
+        make_triang(2, "kit-x", "kit-B", 100, 200, cm="12"),
+        make_triang(1, "kit-y", "kit-B", 300, 400, cm="12"),
+        make_triang(1, "kit-z", "kit-B", 50, 90, cm="12"),
+    ]
+    gm = build_grand_match(siblings_by_kit, siblings_by_name, grandparents_by_name, cousins_by_kit, cousins_by_name,
+                           segments=[make_segment(1, "Alice", "kit-A", "Smith", 0, 1000),
+                                     make_segment(2, "Alice", "kit-A", "Smith", 0, 1000)],
+                           triangulations_by_sibling={"kit-A": triangs, "kit-B": [], "kit-C": []})
+
+    edges = gm.triang_graph.edges
+    assert gm.triangulationBySiblingKit == {}
+    assert list(edges) == [triangs[2], triangs[1], triangs[0]]
+    assert all(chrome.triang_graph.edges.B37_Start.base is edges.B37_Start for chrome in gm.chromosome_models.values())
+    assert list(gm.triang_table("kit-A")) == triangs
+    assert list(gm.triang_table("kit-B")) == []
+
+
+def test_kit_registry_bits():
+    """Each given kit gets its own bit; other kits get 0. More than 64 kits fall back to Python ints."""
+    registry = KitRegistry(["kit-other"])
+
+    bits = registry.bits(["kit-A", "kit-B"])
+
+    assert bits.dtype == np.uint64
+    assert bits.tolist() == [0, 1, 2]
+    many = registry.bits([f"kit-{n}" for n in range(70)])
+    assert many[registry.intern("kit-69")] == 1 << 69
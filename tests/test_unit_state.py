@@ -0,0 +1,65 @@
+"""Tests for incremental matching through GrandMatch.state_dir"""
+from grand_match import GrandMatch
+from tests.conftest import make_cousin, make_grandparent, make_segment, make_sibling, make_triang, build_grand_match
+
+
+def _build(state_dir, cousin_grandparent="Smith"):
+    siblings = {"kit-A": make_sibling("Alice", "kit-A"), "kit-B": make_sibling("Bob", "kit-B")}
+    cousin = make_cousin("Cuz", "kit-cuz", cousin_grandparent)
+    gm = build_grand_match(
+        siblings_by_kit=siblings,
+        siblings_by_name={s.name: s for s in siblings.values()},
+        grandparents_by_name={"Smith": make_grandparent("Smith"), "Jones": make_grandparent("Jones")},
+        cousins_by_kit={cousin.kit: cousin},
+        cousins_by_name={cousin.name: cousin},
+        segments=[
+            make_segment(1, "Alice", "kit-A", "Smith", 100, 1000),
+            make_segment(1, "Bob", "kit-B", "Smith", 200, 800),
+            make_segment(2, "Alice", "kit-A", "Jones", 100, 1000),
+            make_segment(2, "Bob", "kit-B", "Jones", 200, 800),
+        ],
+        triangulations_by_sibling={"kit-A": [make_triang(1, "kit-x", "kit-B", 300, 600),
+                                             make_triang(1, "kit-cuz", "kit-B", 300, 600),
+                                             make_triang(2, "kit-y", "kit-B", 300, 600)],
+                                   "kit-B": []},
+    )
+    gm.state_dir = state_dir
+    gm.LoopOnChromosomeData()
+    return gm
+
+
+def _count_matched_units(monkeypatch):
+    calls = []
+    original = GrandMatch._match_unit
+
+    def counting(self, chr_number, gparent, *args):
+        calls.append((chr_number, gparent))
+        return original(self, chr_number, gparent, *args)
+
+    monkeypatch.setattr(GrandMatch, "_match_unit", counting)
+    return calls
+
+
+def test_unchanged_units_are_reused(tmp_path, monkeypatch):
+    """A second run over the same inputs reuses every unit's matches."""
+    first = _build(str(tmp_path)).match_chromosomes()
+    calls = _count_matched_units(monkeypatch)
+
+    second = _build(str(tmp_path)).match_chromosomes()
+
+    assert calls == []
+    assert second == first
+    assert [t.Kit1_Number for t in second] == ["kit-cuz", "kit-x", "kit-y"]
+
+
+def test_only_changed_units_are_recomputed(tmp_path, monkeypatch):
+    """Moving a cousin to another grandparent recomputes just the affected units, with a fresh run's result."""
+    _build(str(tmp_path)).match_chromosomes()
+    calls = _count_matched_units(monkeypatch)
+
+    result = _build(str(tmp_path), cousin_grandparent="Jones").match_chromosomes()
+
+    # both grandparents' excluded-cousin lists changed
+    assert sorted(calls) == [(1, "Smith"), (2, "Jones")]
+    assert result == _build(None, cousin_grandparent="Jones").match_chromosomes()
+    assert "kit-cuz" not in [t.Kit1_Number for t in result]